@@ -0,0 +1,117 @@
+"""
+Çıkarım (inference) kabul kontrolü.
+Çalışan transkripsiyonlar ve kuyrukta bekleyen job'lar birlikte backlog sayılır; backlog eşiği
+aştığında yeni işler 429 + Retry-After ile reddedilir. Retry-After, son transkripsiyonların
+ortalama süresinden tahmin edilir. Sunucu kapanırken (drain) yeni iş kabul edilmez.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Ortalama süre için üstel hareketli ortalama katsayısı
+DURATION_SMOOTHING = 0.2
+
+RETRY_AFTER_MIN_SECONDS = 1
+RETRY_AFTER_MAX_SECONDS = 600
+
+
+class Overloaded(Exception):
+    """Backlog eşiği aşıldığında, sunucu kapanırken veya işi alacak düğüm yokken (unavailable) fırlatılır"""
+
+    def __init__(self, message, retry_after, draining=False, unavailable=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.draining = draining
+        self.unavailable = unavailable
+
+
+class AdmissionController:
+    """Backlog sınırlı kabul kontrolü.
+
+    queued: kuyrukta bekleyen iş sayısını döndüren fonksiyon (job kuyruğu).
+    max_backlog 0 ise sınır yoktur (sadece kapanış sırasında reddedilir).
+    """
+
+    def __init__(self, max_backlog, workers=1, queued=None, default_seconds=30.0):
+        self.max_backlog = max_backlog
+        self.workers = max(1, workers)
+        self.queued = queued or (lambda: 0)
+        self.average_seconds = default_seconds
+        self.active = 0
+        self.rejected = 0
+        self.draining = False
+        # check() admit() içinde lock altında da çağrılır
+        self._lock = threading.RLock()
+
+    def backlog(self):
+        """Çalışan transkripsiyonlar + kuyrukta bekleyen job'lar"""
+        return self.active + self.queued()
+
+    def retry_after(self, backlog=None):
+        """Backlog eşiğin altına inene kadar tahmini bekleme süresi (saniye)"""
+        backlog = self.backlog() if backlog is None else backlog
+        excess = max(1, backlog - self.max_backlog + 1)
+        seconds = math.ceil(excess / self.workers * self.average_seconds)
+        return min(max(seconds, RETRY_AFTER_MIN_SECONDS), RETRY_AFTER_MAX_SECONDS)
+
+    def check(self):
+        """Yeni iş kabul edilebilir mi; edilemezse Overloaded fırlatır"""
+        if self.draining:
+            raise Overloaded("Sunucu kapanıyor", self.retry_after(), draining=True)
+        with self._lock:
+            if self.max_backlog:
+                backlog = self.backlog()
+                if backlog >= self.max_backlog:
+                    self.rejected += 1
+                    raise Overloaded(f"Sunucu yoğun ({backlog} iş bekliyor)", self.retry_after(backlog))
+
+    @contextmanager
+    def admit(self):
+        """Kabul kontrolünden geçir ve transkripsiyon süresince çalışan iş olarak say"""
+        with self._lock:
+            # Kontrol ve sayaç artışı aynı lock altında: eşzamanlı istekler eşiği birlikte aşamaz
+            self.check()
+            self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._finish(started)
+
+    @contextmanager
+    def inference(self):
+        """Önceden kabul edilmiş işi (ör. kuyruktan gelen job) çalışan iş olarak say"""
+        with self._lock:
+            self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._finish(started)
+
+    def _finish(self, started):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.active -= 1
+            self.average_seconds += DURATION_SMOOTHING * (elapsed - self.average_seconds)
+
+    def start_draining(self):
+        """Kapanış: bundan sonra yeni iş kabul edilmez"""
+        self.draining = True
+        logger.info(f"Kapanış başladı: yeni işler reddediliyor (backlog: {self.backlog()})")
+
+    def stats(self):
+        """Kabul kontrolü istatistikleri"""
+        return {
+            "max_backlog": self.max_backlog,
+            "backlog": self.backlog(),
+            "active": self.active,
+            "rejected": self.rejected,
+            "average_seconds": round(self.average_seconds, 2),
+            "draining": self.draining
+        }
@@ -1,19 +1,57 @@
-from flask import Flask, request, jsonify, send_file
+import time
+IMPORT_STARTED_AT = time.time()
+
+from flask import Flask, Request, request, jsonify, Response, g
 from flask_cors import CORS
+import io
+import json
 import os
 import tempfile
-import whisper
-from faster_whisper import WhisperModel
-import srt
 from datetime import timedelta
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import logging
+import multiprocessing
+import threading
 import traceback
+from contextlib import ExitStack, contextmanager, nullcontext
+import numpy as np
 from logging.handlers import RotatingFileHandler
+from admission import AdmissionController, Overloaded
+from audio import AudioDecodeError, AudioFileReader, accepted_formats, decode_audio_bytes, probe_duration, wav_duration
+from batching import MicroBatcher
+from cluster import ClusterJobQueue, ClusterStore, ClusterTimeout, ClusterWorker
+from coalescing import RequestCoalescer
+from cache import TranscriptCache, hash_bytes, hash_file, is_cache_key, make_cache_key
+from incremental import (
+    SequenceStore, compute_fingerprints, merge_region_segments, plan_incremental, shift_segment
+)
+from jobs import JobQueue, JobQueueFull
+from jobstore import JobStore
+from language import AUTO, LanguageCache, detect_language, parse_language
+from longform import carry_prompt, iter_windows
+from metrics import (
+    REQUEST_SECONDS, REQUESTS_IN_FLIGHT, REQUESTS_TOTAL, current_timings, record_stage, record_transcription,
+    registry as metrics_registry, server_timing_header, stage, start_timings
+)
+from models import ModelRegistry, ModelUnavailable, variant_name
+from parallel import ParallelTranscriber, SAMPLE_RATE, find_split_points
+from scheduler import InferenceScheduler, Ticket, parse_priority
+from profiles import (
+    is_low_confidence, load_profiles, parse_profile, profile_decode_options, redecode_summary, redecode_window
+)
+from segmentation import parse_caption_style, resegment
+from uploads import UploadError, UploadStore
+from subtitles import iter_document, segment_to_dict, subtitle_writer
+
+class MemoryRequest(Request):
+    """Upload'ları diske (SpooledTemporaryFile) taşımadan bellekte tutan request sınıfı"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
-CORS(app)
+app.request_class = MemoryRequest
+CORS(app, expose_headers=["X-Cache", "X-Transcript-Key", "X-Incremental", "X-Model", "X-Language",
+                          "X-Language-Detection", "X-Profile", "X-Redecode", "Upload-Offset", "Server-Timing"])
 
 # Logging ayarları
 if not os.path.exists('logs'):
@@ -41,143 +79,1335 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 # Whisper model seçimi (tiny, base, small, medium, large)
+# WHISPER_MODEL varsayılan modeldir; istekler 'model' alanı ile AVAILABLE_MODELS içinden seçebilir
 WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
 USE_FASTER_WHISPER = os.getenv('USE_FASTER_WHISPER', 'true').lower() == 'true'
+AVAILABLE_MODELS = [name.strip() for name in os.getenv('AVAILABLE_MODELS', 'tiny,base,small,medium,large').split(',') if name.strip()]
+if WHISPER_MODEL not in AVAILABLE_MODELS:
+    AVAILABLE_MODELS.append(WHISPER_MODEL)
+# Yüklü modellerin toplam bellek bütçesi; aşıldığında boştaki modeller LRU sırasıyla boşaltılır
+MODEL_MEMORY_BUDGET_MB = int(os.getenv('MODEL_MEMORY_BUDGET_MB', 4096))
+# Bu süre boyunca kullanılmayan modeller boşaltılır (0: kapalı, varsayılan model hiç boşaltılmaz)
+MODEL_IDLE_TIMEOUT = int(os.getenv('MODEL_IDLE_TIMEOUT', 900))
+# Model başına ayarlar, örn. {"large": {"compute_type": "int8_float16", "cpu_threads": 8}}
+WHISPER_MODEL_CONFIG = json.loads(os.getenv('WHISPER_MODEL_CONFIG', '{}'))
+# Yüklenemeyen model bu kadar saniye sonra bir sonraki istekte tekrar yüklenmeye çalışılır
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv('MODEL_LOAD_RETRY_SECONDS', 30))
+
+# Decode ayarları: transkripsiyon ve önbellek anahtarı aynı ayarları kullanır
+DECODE_OPTIONS = {
+    "language": "tr",  # Türkçe
+    "beam_size": 5,
+    "word_timestamps": True
+}
+
+# İstekte dil verilmezse kullanılan dil; 'auto' ise ses boyunca örneklenen pencerelerden tespit edilir
+DEFAULT_LANGUAGE = parse_language(os.getenv('DEFAULT_LANGUAGE'), DECODE_OPTIONS["language"])
+# Otomatik tespitte örneklenen pencere sayısı ve uzunluğu (saniye)
+LANGUAGE_DETECT_WINDOWS = int(os.getenv('LANGUAGE_DETECT_WINDOWS', 3))
+LANGUAGE_DETECT_WINDOW_SECONDS = float(os.getenv('LANGUAGE_DETECT_WINDOW_SECONDS', 10))
+# Parça bazında dil değiştirmede (language_switching) parça uzunluğu (saniye)
+LANGUAGE_CHUNK_SECONDS = float(os.getenv('LANGUAGE_CHUNK_SECONDS', 120))
+
+# Kalite / hız profilleri (draft, balanced, final, adaptive); DECODE_PROFILES ile değiştirilir veya eklenir,
+# örn. {"final": {"model": "medium"}, "review": {"beam_size": 3}}
+DECODE_PROFILES = load_profiles(json.loads(os.getenv('DECODE_PROFILES', '{}')))
+# İstekte profil verilmezse kullanılan profil (balanced: DECODE_OPTIONS ile aynı decode)
+DEFAULT_PROFILE = parse_profile(os.getenv('DEFAULT_PROFILE'), DECODE_PROFILES, 'balanced')
+
+# Transkripsiyon önbelleği ayarları
+CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_DIR = os.getenv('CACHE_DIR', 'cache')
+CACHE_MAX_MB = int(os.getenv('CACHE_MAX_MB', 512))
+
+# Artımlı (incremental) transkripsiyon: aynı sequence'in önceki export'uyla karşılaştırma
+INCREMENTAL_ENABLED = os.getenv('INCREMENTAL_ENABLED', 'true').lower() == 'true'
+
+# Eşzamanlı aynı istekler (aynı ses ve decode ayarları) tek decode'u paylaşır
+COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'true').lower() == 'true'
+
+# Yönetim endpoint'leri için token (boşsa kontrol yapılmaz)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# Parçalı (resumable) upload ayarları
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', 'uploads')
+UPLOAD_MAX_MB = int(os.getenv('UPLOAD_MAX_MB', 2048))
+UPLOAD_CHUNK_MB = int(os.getenv('UPLOAD_CHUNK_MB', 8))
+UPLOAD_RETENTION_SECONDS = int(os.getenv('UPLOAD_RETENTION_SECONDS', 3600))
+
+# Asenkron iş kuyruğu ayarları
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 1))
+JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', 100))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 3600))
+# Kalıcı job deposu: job'lar ve decode checkpoint'leri diske yazılır, yeniden başlatmada devam edilir
+JOB_STORE_ENABLED = os.getenv('JOB_STORE_ENABLED', 'true').lower() == 'true'
+JOB_STORE_DIR = os.getenv('JOB_STORE_DIR', 'jobs')
+# Decode edilen segmentler bu kadar saniyelik ses biriktikçe kaydedilir (çökmede kaybedilen en fazla iş)
+JOB_CHECKPOINT_SECONDS = float(os.getenv('JOB_CHECKPOINT_SECONDS', 60))
+# Bu kadar kez yarıda kalan job tekrar denenmez (ör. her seferinde process'i çökerten dosya)
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# Öncelikli zamanlama: interactive (kısa klipler) bulk işlerden (uzun timeline'lar, toplu işler) önce çalışır
+# Aynı anda decode edilen iş sayısı (varsayılan JOB_WORKERS)
+SCHEDULER_SLOTS = int(os.getenv('SCHEDULER_SLOTS', JOB_WORKERS))
+# Çalışan iş en az bu kadar saniye çalışmadan kesilmez
+SCHEDULER_QUANTUM_SECONDS = float(os.getenv('SCHEDULER_QUANTUM_SECONDS', 10))
+# Bu süreden uzun ses (saniye) interactive istense de bulk sınıfında çalışır
+INTERACTIVE_MAX_SECONDS = float(os.getenv('INTERACTIVE_MAX_SECONDS', 300))
+# Kesilen job'lar beklerken kısa job'ların başlayabilmesi için ek job worker thread'i
+SCHEDULER_EXTRA_WORKERS = int(os.getenv('SCHEDULER_EXTRA_WORKERS', 2))
+# Stream'de sırada beklerken 'queued' olayı gönderme aralığı (saniye)
+SCHEDULER_REPORT_SECONDS = float(os.getenv('SCHEDULER_REPORT_SECONDS', 2))
+# Süresi başlıktan okunamayan (sıkıştırılmış) seste süre boyuttan tahmin edilir (~128 kbit/s)
+ESTIMATED_BYTES_PER_SECOND = 16000
+
+# Paralel (çok çekirdekli) transkripsiyon ayarları
+# PARALLEL_WORKERS x PARALLEL_CPU_THREADS toplam çekirdek sayısını geçmemeli
+PARALLEL_WORKERS = int(os.getenv('PARALLEL_WORKERS', 0))
+PARALLEL_CPU_THREADS = int(os.getenv('PARALLEL_CPU_THREADS', 4))
+PARALLEL_MIN_DURATION = float(os.getenv('PARALLEL_MIN_DURATION', 600))
+
+# Uzun kayıtlar: bu süreden uzun job dosyaları belleğe alınmadan pencere pencere işlenir (saniye, 0 = kapalı)
+LONGFORM_MIN_SECONDS = float(os.getenv('LONGFORM_MIN_SECONDS', 1800))
+LONGFORM_WINDOW_SECONDS = float(os.getenv('LONGFORM_WINDOW_SECONDS', 300))
+
+# Mikro-batch ayarları: eşzamanlı kısa isteklerin pencereleri tek encoder/decoder çağrısında işlenir
+# (istekler aynı anda gelmeli: JOB_WORKERS > 1 veya eşzamanlı /transcribe istekleri)
+BATCH_ENABLED = os.getenv('BATCH_ENABLED', 'false').lower() == 'true'
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 8))
+BATCH_MAX_WAIT_MS = int(os.getenv('BATCH_MAX_WAIT_MS', 50))
+BATCH_MAX_DURATION = float(os.getenv('BATCH_MAX_DURATION', 300))
+
+# Altyazı indirme yanıtlarında tek seferde gönderilen parça büyüklüğü (karakter)
+RESPONSE_CHUNK_CHARS = int(os.getenv('RESPONSE_CHUNK_CHARS', 64 * 1024))
+
+# Kabul kontrolü: çalışan + kuyrukta bekleyen transkripsiyon sayısı bu eşiğe ulaşınca
+# yeni işler 429 + Retry-After ile reddedilir (0: sınır yok)
+ADMISSION_MAX_BACKLOG = int(os.getenv('ADMISSION_MAX_BACKLOG', 16))
+# Kapanışta (SIGTERM) çalışan ve kuyruktaki job'ların bitmesi için beklenen en uzun süre (saniye)
+DRAIN_TIMEOUT = int(os.getenv('DRAIN_TIMEOUT', 300))
+# Arka plan servisleri (job worker'ları, model ısıtma) import sırasında başlasın mı;
+# gunicorn preload modunda fork sonrası worker process'inde başlatılır
+AUTOSTART_SERVICES = os.getenv('AUTOSTART_SERVICES', 'true').lower() == 'true'
 
-# Model yükleme
-model = None
-try:
-    logger.info(f"Whisper model yükleniyor: {WHISPER_MODEL}")
+# Yatay ölçekleme: standalone (tek process), frontend (API ön yüzü, model yüklemez) veya
+# worker (inference düğümü, worker.py ile başlatılır). Ön yüz ve düğümler CLUSTER_DIR'i paylaşır.
+CLUSTER_ROLE = os.getenv('CLUSTER_ROLE', 'standalone').lower()
+CLUSTER_DIR = os.getenv('CLUSTER_DIR', 'cluster')
+# Bu süre heartbeat göndermeyen düğüm kapanmış sayılır, çalışan işleri tekrar kuyruğa alınır
+CLUSTER_WORKER_TIMEOUT = float(os.getenv('CLUSTER_WORKER_TIMEOUT', 15))
+# Başka düğüme atanmış ama bu kadar saniye bekleyen işi boş düğüm alabilir
+CLUSTER_STEAL_SECONDS = float(os.getenv('CLUSTER_STEAL_SECONDS', 30))
+# Ön yüzde senkron istek (/transcribe, stream) düğümün işi bitirmesini en fazla bu kadar bekler (saniye)
+CLUSTER_WAIT_SECONDS = float(os.getenv('CLUSTER_WAIT_SECONDS', 600))
+# Düğüm başlarken yüklenecek ek modeller (virgülle ayrılmış; varsayılan model her zaman yüklenir)
+WORKER_MODELS = [name.strip() for name in os.getenv('WORKER_MODELS', '').split(',') if name.strip()]
+
+# Paralel transkripsiyon worker process'leri (spawn) ana modülü tekrar import eder;
+# model ve job kuyruğu sadece ana process'te başlatılır
+IS_MAIN_PROCESS = multiprocessing.parent_process() is None
+
+def load_whisper_model(name, compute_type="int8", cpu_threads=0, model=None):
+    """Registry model yükleyicisi.
+
+    Sadece seçili backend import edilir: openai-whisper torch'u da yüklediğinden
+    Faster Whisper kullanılırken hiç import edilmez.
+    model: compute_type varyantlarında (ör. small@float32) yüklenecek asıl model adı.
+    """
     if USE_FASTER_WHISPER:
-        model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
-        logger.info(f"Faster Whisper model yüklendi: {WHISPER_MODEL}")
-    else:
-        model = whisper.load_model(WHISPER_MODEL)
-        logger.info(f"OpenAI Whisper model yüklendi: {WHISPER_MODEL}")
-    logger.info("Model başarıyla yüklendi!")
-except Exception as e:
-    logger.error(f"Model yükleme hatası: {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    logger.error("Lütfen model dosyalarının doğru konumda olduğundan emin olun.")
-    logger.error("Faster Whisper kullanmayı deneyin: USE_FASTER_WHISPER=true")
+        from faster_whisper import WhisperModel
+        # num_workers: aynı model üzerinde paralel transcribe çağrısı sayısı
+        return WhisperModel(model or name, device="cpu", compute_type=compute_type,
+                            cpu_threads=cpu_threads, num_workers=JOB_WORKERS)
+    import whisper
+    return whisper.load_model(model or name)
+
+# Model havuzu: modeller ilk istekte yüklenir, varsayılan model başlangıçta yüklenir
+model_registry = ModelRegistry(
+    load_whisper_model,
+    AVAILABLE_MODELS,
+    WHISPER_MODEL,
+    MODEL_MEMORY_BUDGET_MB,
+    idle_timeout_seconds=MODEL_IDLE_TIMEOUT,
+    model_config=WHISPER_MODEL_CONFIG,
+    retry_seconds=MODEL_LOAD_RETRY_SECONDS
+)
+
+# Başlangıç süreleri (saniye); /health ile raporlanır
+startup_stats = {
+    "import_seconds": None,
+    "model_load_seconds": None,
+    "warmup_seconds": None,
+    "time_to_ready_seconds": None
+}
+model_ready_event = threading.Event()
+
+# Listede olmayan modeli seçen profil varsayılan modelle çalışır
+for profile_name, profile_settings in DECODE_PROFILES.items():
+    for settings in (profile_settings, profile_settings.get("redecode") or {}):
+        if settings.get("model") and not model_registry.is_available(settings["model"]):
+            logger.warning(f"Profil '{profile_name}': model listede yok ({settings['model']}), "
+                           f"varsayılan model kullanılacak")
+            settings["model"] = None
+
+def model_variant(name, compute_type=None):
+    """Modelin compute_type ile yüklenen varyantı (modelin kendi ayarıysa modelin kendisi)"""
+    if not compute_type or compute_type == model_registry.entry(name).config.get("compute_type"):
+        return name
+    return variant_name(name, compute_type)
 
-def format_timestamp(seconds):
-    """Saniyeyi SRT formatına çevir (00:00:00,000)"""
+def resolve_model_name(value, profile=None):
+    """'model' form alanı: boşsa profilin modeli (o da yoksa varsayılan model), listede yoksa None.
+
+    Profil compute_type belirtiyorsa modelin o compute_type ile yüklenen varyantı döner.
+    """
+    settings = DECODE_PROFILES[profile or DEFAULT_PROFILE]
+    name = value or settings.get("model") or WHISPER_MODEL
+    if not model_registry.is_available(name):
+        return None
+    return model_variant(name, settings.get("compute_type"))
+
+def redecode_model_name(redecode, model_name):
+    """Adaptive profilde düşük güvenli bölgeleri tekrar decode eden model (yoksa ilk geçişin modeli)"""
+    return model_variant(redecode.get("model") or model_name, redecode.get("compute_type"))
+
+def model_ready(name):
+    """Model yüklü mü veya yüklenebilir mi (son yükleme hatasından bu yana MODEL_LOAD_RETRY_SECONDS geçtiyse
+    tekrar denenir)"""
+    return model_registry.ready(name)
+
+def decode_options(language=None, settings=None):
+    """İsteğin dili ve profil ayarlarıyla decode ayarları (varsayılanlarda DECODE_OPTIONS'ın kendisi)"""
+    overrides = {}
+    if language and language != DECODE_OPTIONS["language"]:
+        overrides["language"] = language
+    if settings:
+        overrides.update({key: value for key, value in profile_decode_options(settings).items()
+                          if DECODE_OPTIONS.get(key) != value})
+    return {**DECODE_OPTIONS, **overrides} if overrides else DECODE_OPTIONS
+
+def transcribe_stream(audio, model_name=None, language=None, settings=None, prompt=None):
+    """16 kHz mono float32 ses dizisini transkribe et: (segment iterator, bilgi sözlüğü).
+
+    Faster Whisper segmentleri lazy üretilir; iterator tüketildikçe decode ilerler.
+    Model, iterator tükenene veya kapatılana kadar kullanımda sayılır (bellekten atılmaz).
+    settings: profil ayarları (beam, sıcaklık, VAD; sadece Faster Whisper'da uygulanır).
+    prompt: initial_prompt (uzun kayıtlarda önceki pencerenin son metni).
+    """
+    prompt_options = {"initial_prompt": prompt} if prompt else {}
+    usage = model_registry.acquire(model_name)
+    model = usage.__enter__()
     try:
-        td = timedelta(seconds=seconds)
-        hours, remainder = divmod(td.total_seconds(), 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = int((seconds % 1) * 1000)
-        return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d},{milliseconds:03d}"
-    except Exception as e:
-        logger.error(f"Timestamp format hatası: {e}")
-        return "00:00:00,000"
+        if USE_FASTER_WHISPER:
+            # Özellik çıkarımı ve dil tespiti transcribe() çağrısında, decode iterator tüketilirken yapılır
+            with stage("prepare"):
+                segments_iter, info = model.transcribe(audio, **decode_options(language, settings), **prompt_options)
+            info = {"language": info.language, "duration": info.duration}
+        else:
+            result = model.transcribe(audio, language=decode_options(language)["language"], **prompt_options)
+            segments_iter = iter(result["segments"])
+            info = {"language": result.get("language"), "duration": len(audio) / SAMPLE_RATE}
+    except BaseException:
+        usage.__exit__(None, None, None)
+        raise
+    
+    def release_when_done():
+        try:
+            yield from segments_iter
+        finally:
+            usage.__exit__(None, None, None)
+    
+    return release_when_done(), info
+
+def transcribe_profile_stream(audio, model_name=None, language=None, settings=None, redecode_stats=None,
+                              prompt=None):
+    """transcribe_stream + profil: adaptive profilde iterator düşük güvenli bölgeleri tekrar decode
+    edilmiş segment sözlükleri üretir, istatistikler redecode_stats'a eklenir (bkz. adaptive_segments)
+    """
+    segments_iter, info = transcribe_stream(audio, model_name, language, settings, prompt)
+    if settings and settings.get("redecode") and USE_FASTER_WHISPER:
+        segments_iter = adaptive_segments(segments_iter, audio, model_name, language, settings["redecode"],
+                                          redecode_stats if redecode_stats is not None else {})
+    return segments_iter, info
+
+def adaptive_segments(first_pass, audio, model_name, language, redecode, stats):
+    """Greedy ilk geçişin segmentlerini akıt; ardışık düşük güvenli segmentler (avg_logprob /
+    compression_ratio) sonraki güvenli segment geldiğinde (veya ses bitince) redecode ayarlarıyla
+    (daha geniş beam, daha büyük model) tekrar decode edilip yerlerine konur.
+
+    stats: segments, redecoded_segments, redecoded_seconds (tekrar decode edilen ses), seconds, model
+    """
+    refine_model = redecode_model_name(redecode, model_name or WHISPER_MODEL)
+    padding = redecode.get("padding", 0.5)
+    duration = len(audio) / SAMPLE_RATE
+    for key in ("segments", "redecoded_segments", "redecoded_seconds", "seconds"):
+        stats.setdefault(key, 0)
+    stats["model"] = refine_model
+    
+    def refine(pending, lower, upper):
+        start, end = redecode_window(pending, lower, upper, padding)
+        started = time.perf_counter()
+        segments_iter, _ = transcribe_stream(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)],
+                                             refine_model, language, redecode)
+        replacement = []
+        for segment in segments_iter:
+            segment = shift_segment(segment_to_dict(segment), start)
+            segment["end"] = min(segment["end"], end)
+            if segment["text"] and segment["start"] < end:
+                replacement.append(segment)
+        stats["redecoded_segments"] += len(pending)
+        stats["redecoded_seconds"] += end - start
+        stats["seconds"] += time.perf_counter() - started
+        # Tekrar decode bir şey bulamazsa ilk geçişin metni korunur
+        return replacement or pending
+    
+    pending = []
+    last_end = 0.0
+    for segment in first_pass:
+        stats["segments"] += 1
+        low_confidence = is_low_confidence(segment, redecode)
+        segment = segment_to_dict(segment)
+        if low_confidence:
+            pending.append(segment)
+            continue
+        if pending:
+            yield from refine(pending, last_end, segment["start"])
+            pending = []
+        last_end = segment["end"]
+        yield segment
+    if pending:
+        yield from refine(pending, last_end, duration)
+
+# Ses hash'i + model başına dil tespiti sonuçları
+language_cache = LanguageCache()
+
+def parse_request_language(values):
+    """'language' ve 'language_switching' alanları: (dil, parça bazında dil değiştirme).
+
+    language_switching sadece 'auto' ile anlamlıdır; geçersiz dilde ValueError.
+    """
+    language = parse_language(values.get('language'), DEFAULT_LANGUAGE)
+    switching = language == AUTO and (values.get('language_switching') or '').lower() == 'true'
+    return language, switching
+
+def detect_window_language(model, samples):
+    """Tek pencere için {dil: olasılık}"""
+    if USE_FASTER_WHISPER:
+        # Segment iterator tüketilmez: transcribe() dili tespit etmek için encoder'ı bir kez çalıştırır
+        _, info = model.transcribe(samples, language=None, beam_size=1)
+        return dict(info.all_language_probs or [(info.language, info.language_probability)])
+    import whisper
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(samples)).to(model.device)
+    _, probabilities = model.detect_language(mel)
+    return probabilities
+
+def detect_audio_language(audio, model_name=None, audio_hash=None, windows=None):
+    """Ses boyunca örneklenen pencerelerden dil tespiti (audio: dizi veya AudioFileReader).
+
+    audio_hash verilirse sonuç ses + model başına önbelleğe alınır. Dönen sözlük language,
+    confidence, windows, seconds ve cached (önbellekten geldiyse True) alanlarını içerir.
+    """
+    key = f"{model_name or WHISPER_MODEL}:{audio_hash}" if audio_hash else None
+    detection = language_cache.get(key) if key else None
+    if detection is not None:
+        return {**detection, "cached": True}
+    with stage("language_detect"), model_registry.acquire(model_name) as model:
+        detection = detect_language(
+            audio, lambda samples: detect_window_language(model, samples),
+            windows or LANGUAGE_DETECT_WINDOWS, LANGUAGE_DETECT_WINDOW_SECONDS
+        )
+    logger.info(f"Dil tespit edildi: {detection['language']} (güven {detection['confidence']}, "
+                f"{len(detection['windows'])} pencere, {detection['seconds']}s)")
+    if key:
+        language_cache.put(key, detection)
+    return {**detection, "cached": False}
+
+def cached_language_detection(audio_hash, model_name=None):
+    """Önbellekteki dil tespiti (transkript önbellekten döndüğünde raporlamak için) veya None"""
+    detection = language_cache.get(f"{model_name or WHISPER_MODEL}:{audio_hash}") if audio_hash else None
+    return {**detection, "cached": True} if detection else None
 
-def create_srt_subtitles(segments):
-    """Whisper segments'lerinden SRT formatında altyazı oluştur"""
+def warm_up_default_model():
+    """Varsayılan modeli arka planda yükle ve kısa bir decode ile ısıt.
+
+    İlk gerçek istek model yükleme ve ilk çağrı maliyetini (bellek ayırma, çekirdek
+    seçimi) ödemez. Sunucu bu sırada istek kabul etmeye devam eder.
+    """
     try:
-        subtitles = []
-        for i, segment in enumerate(segments, 1):
-            start_time = format_timestamp(segment.start)
-            end_time = format_timestamp(segment.end)
-            text = segment.text.strip()
-            
-            subtitle = srt.Subtitle(
-                index=i,
-                start=timedelta(seconds=segment.start),
-                end=timedelta(seconds=segment.end),
-                content=text
-            )
-            subtitles.append(subtitle)
+        load_started_at = time.time()
+        model_registry.load(WHISPER_MODEL)
+        startup_stats["model_load_seconds"] = round(time.time() - load_started_at, 2)
         
-        return srt.compose(subtitles)
+        warmup_started_at = time.time()
+        # 1 saniyelik hafif gürültü: sessizlikte VAD/decode erken dönebilir
+        warmup_audio = (np.random.default_rng(0).standard_normal(SAMPLE_RATE) * 0.01).astype(np.float32)
+        segments_iter, _ = transcribe_stream(warmup_audio)
+        for _ in segments_iter:
+            pass
+        startup_stats["warmup_seconds"] = round(time.time() - warmup_started_at, 2)
+        startup_stats["time_to_ready_seconds"] = round(time.time() - IMPORT_STARTED_AT, 2)
+        model_ready_event.set()
+        logger.info(f"Model hazır: {WHISPER_MODEL} (yükleme {startup_stats['model_load_seconds']}s, "
+                    f"ısıtma {startup_stats['warmup_seconds']}s, "
+                    f"toplam {startup_stats['time_to_ready_seconds']}s)")
+    except ModelUnavailable:
+        logger.error("Lütfen model dosyalarının doğru konumda olduğundan emin olun.")
+        logger.error("Faster Whisper kullanmayı deneyin: USE_FASTER_WHISPER=true")
     except Exception as e:
-        logger.error(f"SRT oluşturma hatası: {e}")
-        raise
+        logger.error(f"Model ısıtma hatası: {e}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+
+def startup_status():
+    """Varsayılan modelin hazır olma durumu: loading, ready veya error.
+
+    Ön yüzde model yüklenmez; en az bir canlı düğüm varsa hazır sayılır.
+    """
+    if CLUSTER_ROLE == 'frontend':
+        return "ready" if cluster_store.workers() else "loading"
+    # Başlangıçta yüklenemeyen model sonradan bir istekte yüklenmiş olabilir
+    if model_ready_event.is_set() or model_registry.entry(WHISPER_MODEL).state == "loaded":
+        return "ready"
+    if model_registry.entry(WHISPER_MODEL).state == "error":
+        return "error"
+    return "loading"
+
+# Paralel transkripsiyon havuzu (sadece Faster Whisper ve varsayılan model ile, ilk kullanımda başlar)
+parallel_transcriber = None
+if USE_FASTER_WHISPER and PARALLEL_WORKERS > 1:
+    # Kopyalar seri modelle aynı compute_type ile yüklenir (aynı ses için aynı metin ve cache);
+    # WHISPER_MODEL_CONFIG'te cpu_threads verilmediyse PARALLEL_CPU_THREADS kullanılır
+    parallel_config = model_registry.entry(WHISPER_MODEL).config
+    parallel_transcriber = ParallelTranscriber(
+        WHISPER_MODEL,
+        PARALLEL_WORKERS,
+        parallel_config.get("cpu_threads") or PARALLEL_CPU_THREADS,
+        compute_type=parallel_config.get("compute_type", "int8")
+    )
+
+# Model başına mikro-batch zamanlayıcıları (sadece Faster Whisper ile, ilk kullanımda oluşturulur)
+batchers = {}
+batchers_lock = threading.Lock()
+
+def get_batcher(model_name, language=None, profile=None):
+    # Batch içindeki pencereler aynı dil token'ı ve beam ile decode edilir: model + dil + profil başına bir zamanlayıcı
+    profile = profile or DEFAULT_PROFILE
+    key = (model_name, language or DECODE_OPTIONS["language"], profile)
+    with batchers_lock:
+        if key not in batchers:
+            batchers[key] = MicroBatcher(
+                model_registry, model_name, decode_options(language, DECODE_PROFILES[profile]),
+                max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS
+            )
+        return batchers[key]
+
+def batching_stats():
+    if not (BATCH_ENABLED and USE_FASTER_WHISPER):
+        return None
+    with batchers_lock:
+        return {
+            "max_batch_size": BATCH_MAX_SIZE,
+            "max_wait_ms": BATCH_MAX_WAIT_MS,
+            "max_duration": BATCH_MAX_DURATION,
+            "models": [batcher.stats() for batcher in batchers.values()]
+        }
+
+def parse_parallel_mode(value):
+    """'parallel' form alanı: true, false veya auto (varsayılan)"""
+    value = (value or 'auto').lower()
+    return value if value in ('true', 'false') else 'auto'
+
+def transcribe_file(audio, progress_callback=None, parallel='auto', model_name=None, checkpoint=None,
+                    language=None, detections=None, profile=None, redecode_stats=None):
+    """16 kHz mono float32 ses dizisini transkribe et, segment sözlüklerinin listesini döndür.
+
+    progress_callback(segments_decoded, audio_seconds_processed, audio_duration)
+    her segment decode edildiğinde çağrılır.
+    parallel='auto' iken PARALLEL_MIN_DURATION'dan uzun sesler paralel işlenir.
+    Mikro-batch açıksa BATCH_MAX_DURATION'dan kısa sesler batch kuyruğundan geçer.
+    checkpoint (jobstore.Checkpoint) verilirse önceki çalışmada kaydedilen parçalar tekrar decode
+    edilmez, ses son kaydedilen segmentin sonundan itibaren işlenir ve yeni segmentler kaydedilir.
+    language='auto' ise dil parça bazında tespit edilir (bkz. transcribe_language_chunks).
+    profile: kalite / hız profili; adaptive profilde tekrar decode istatistikleri redecode_stats'a yazılır.
+    """
+    if checkpoint is None:
+        return decode_segments(audio, progress_callback, parallel, model_name, language=language,
+                               detections=detections, profile=profile, redecode_stats=redecode_stats)
+    
+    duration = len(audio) / SAMPLE_RATE
+    if checkpoint.resume_at:
+        logger.info(f"Transkripsiyon kaldığı yerden devam ediyor: {checkpoint.resume_at:.1f}s / {duration:.1f}s "
+                    f"({len(checkpoint.segments)} segment kayıtlı)")
+        audio = audio[int(checkpoint.resume_at * SAMPLE_RATE):]
+    segments = decode_segments(audio, checkpoint.progress(progress_callback, duration), parallel, model_name,
+                               on_segment=checkpoint.add, language=language, detections=detections,
+                               profile=profile, redecode_stats=redecode_stats)
+    checkpoint.flush()
+    return checkpoint.merge(segments)
+
+def decode_segments(audio, progress_callback=None, parallel='auto', model_name=None, on_segment=None,
+                    language=None, detections=None, profile=None, redecode_stats=None):
+    """transcribe_file'ın decode yolu seçimi; on_segment sıralı decode'da her segment için çağrılır"""
+    model_name = model_name or WHISPER_MODEL
+    settings = DECODE_PROFILES[profile or DEFAULT_PROFILE]
+    if language == AUTO:
+        return transcribe_language_chunks(audio, progress_callback, model_name, on_segment, detections,
+                                          settings, redecode_stats)
+    duration = len(audio) / SAMPLE_RATE
+    start_time = time.perf_counter()
+    # Adaptive profil segment güvenine bakar: paralel ve batch yolları kullanılmaz
+    adaptive = bool(settings.get("redecode")) and USE_FASTER_WHISPER
+    if parallel_transcriber and parallel != 'false' and model_name == WHISPER_MODEL and not adaptive:
+        if parallel == 'true' or duration >= PARALLEL_MIN_DURATION:
+            with stage("model_decode"):
+                segments = parallel_transcriber.transcribe(audio, decode_options(language, settings),
+                                                           progress_callback=progress_callback)
+            record_transcription(model_name, duration, time.perf_counter() - start_time)
+            return segments
 
-def create_premiere_xml(segments, sequence_name="AI Generated Subtitles"):
-    """Whisper segments'lerinden Premiere Pro XML formatında altyazı oluştur"""
+    if BATCH_ENABLED and USE_FASTER_WHISPER and duration <= BATCH_MAX_DURATION and not adaptive:
+        with stage("model_decode"):
+            segments = get_batcher(model_name, language, profile).transcribe(audio, progress_callback=progress_callback)
+        record_transcription(model_name, duration, time.perf_counter() - start_time)
+        logger.info(f"Transkripsiyon tamamlandı (batch): {len(segments)} segment")
+        return segments
+    
+    segments_iter, info = transcribe_profile_stream(audio, model_name, language, settings, redecode_stats)
+    segments = []
+    with stage("model_decode"):
+        for segment in segments_iter:
+            segments.append(segment_to_dict(segment))
+            if on_segment:
+                on_segment(segments[-1])
+            if progress_callback:
+                progress_callback(len(segments), segments[-1]["end"], info["duration"])
+            # Öncelikli iş bekliyorsa slot burada bırakılır (decode iterator'ı sıra gelene kadar duraklar)
+            scheduler.preemption_point(segments[-1]["end"])
+    record_transcription(model_name, duration, time.perf_counter() - start_time)
+    logger.info(f"Transkripsiyon tamamlandı: {len(segments)} segment")
+    return segments
+
+def transcribe_language_chunks(audio, progress_callback=None, model_name=None, on_segment=None, detections=None,
+                               settings=None, redecode_stats=None):
+    """Karışık dilli ses (ör. iki dilli röportaj): ses sessizlik noktalarından yaklaşık
+    LANGUAGE_CHUNK_SECONDS'lık parçalara bölünür, her parçanın dili ayrı tespit edilip parça o dille
+    transkribe edilir. Segmentlere 'language' alanı eklenir; detections listesine parça başına
+    tespit sonucu (start, end, language, confidence, seconds) yazılır.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    chunk_count = max(1, round(duration / LANGUAGE_CHUNK_SECONDS))
+    if chunk_count > 1 and USE_FASTER_WHISPER:
+        chunks = find_split_points(audio, chunk_count)
+    else:
+        bounds = np.linspace(0, len(audio), chunk_count + 1).astype(int)
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+    
+    segments = []
+    start_time = time.perf_counter()
+    previous_end = 0
+    for start, end in chunks:
+        # Sert kesim örtüşmesi kullanılmaz: her parça bir öncekinin bittiği yerden başlar
+        start, previous_end = max(start, previous_end), end
+        offset = start / SAMPLE_RATE
+        chunk = audio[start:end]
+        # Parça içinde iki pencere: parçanın başı ya da sonu tek başına yanıltıcı olabilir
+        detection = detect_audio_language(chunk, model_name, windows=2)
+        if detections is not None:
+            detections.append({
+                "start": round(offset, 2),
+                "end": round(end / SAMPLE_RATE, 2),
+                "language": detection["language"],
+                "confidence": detection["confidence"],
+                "seconds": detection["seconds"]
+            })
+        segments_iter, _ = transcribe_profile_stream(chunk, model_name, detection["language"], settings,
+                                                     redecode_stats)
+        with stage("model_decode"):
+            for segment in segments_iter:
+                segment = shift_segment(segment_to_dict(segment), offset)
+                segment["language"] = detection["language"]
+                segments.append(segment)
+                if on_segment:
+                    on_segment(segment)
+                if progress_callback:
+                    progress_callback(len(segments), segment["end"], duration)
+                scheduler.preemption_point(segment["end"])
+    record_transcription(model_name, duration, time.perf_counter() - start_time)
+    logger.info(f"Transkripsiyon tamamlandı: {len(segments)} segment, {len(chunks)} parça, "
+                f"diller: {sorted({segment['language'] for segment in segments})}")
+    return segments
+
+def summarize_language_detections(detections):
+    """Parça bazında tespitlerin özeti: ses süresine göre baskın dil, toplam tespit süresi"""
+    durations = {}
+    for detection in detections:
+        length = detection["end"] - detection["start"]
+        durations[detection["language"]] = durations.get(detection["language"], 0.0) + length
+    return {
+        "language": max(durations, key=durations.get) if durations else None,
+        "mode": "chunks",
+        "chunks": detections,
+        "seconds": round(sum(detection.get("seconds") or 0.0 for detection in detections), 3)
+    }
+
+def language_runs(segments):
+    """Segmentlerin 'language' alanından ardışık aynı dilli bölgeler (önbellekten dönen sonuçlar için)"""
+    runs = []
+    for segment in segments:
+        language = segment.get("language")
+        if runs and runs[-1]["language"] == language:
+            runs[-1]["end"] = round(segment["end"], 2)
+        else:
+            runs.append({"start": round(segment["start"], 2), "end": round(segment["end"], 2),
+                         "language": language, "confidence": None, "seconds": None})
+    return runs
+
+# Transkripsiyon önbelleği (ham segmentler, formatdan bağımsız)
+transcript_cache = None
+if CACHE_ENABLED:
+    transcript_cache = TranscriptCache(CACHE_DIR, CACHE_MAX_MB * 1024 * 1024)
+
+# Çalışmakta olan decode'lar (anahtar: coalescing_key)
+# Liderin kabul kontrolünde reddedilmesi (Overloaded) bağlı isteklere geçmez, diğer hatalar geçer
+coalescer = RequestCoalescer(retry_errors=(Overloaded,)) if COALESCE_ENABLED else None
+
+def decode_audio(audio_data, suffix=''):
+    """Upload baytlarını 16 kHz mono float32'ye çöz (süre 'decode' aşamasına yazılır)"""
+    with stage("decode"):
+        return decode_audio_bytes(audio_data, suffix)
+
+def transcript_cache_key(audio_data, model_name=None, language=None, audio_hash=None, profile=None):
+    """Ses içeriği (upload baytları) ve decode ayarlarından önbellek anahtarı.
+
+    language istenen dildir ('auto' ve parça bazında 'auto:chunks' dahil); varsayılan dil ve
+    balanced profilde anahtar dil / profil parametreleri eklenmeden önceki anahtarla aynıdır.
+    """
+    model_name = model_name or WHISPER_MODEL
+    settings = DECODE_PROFILES[profile or DEFAULT_PROFILE]
+    options = {
+        "model": model_name,
+        "faster_whisper": USE_FASTER_WHISPER,
+        **decode_options(language, settings)
+    }
+    if settings.get("redecode"):
+        options["redecode"] = {**settings["redecode"], "model": redecode_model_name(settings["redecode"], model_name)}
+    return make_cache_key(audio_hash or hash_bytes(audio_data), options)
+
+# Sequence başına son export'un parmak izleri (sadece Faster Whisper ile)
+sequence_store = None
+if INCREMENTAL_ENABLED and USE_FASTER_WHISPER:
+    sequence_store = SequenceStore(os.path.join(CACHE_DIR, 'sequences'))
+
+def transcribe_incremental(audio, previous, fingerprints, silent, progress_callback=None, model_name=None,
+                           language=None, profile=None, redecode_stats=None):
+    """Önceki export ile eşleşen bölgelerin segmentlerini kullan, sadece değişen bölgeleri transkribe et"""
+    previous_fingerprints, previous_segments = previous
+    duration = len(audio) / SAMPLE_RATE
+    reused, regions = plan_incremental(previous_fingerprints, previous_segments, fingerprints, silent, duration)
+    
+    retranscribed_seconds = sum(end - start for start, end in regions)
+    logger.info(f"Artımlı transkripsiyon: {len(reused)} segment tekrar kullanıldı, "
+                f"{len(regions)} bölge ({retranscribed_seconds:.1f}s) transkribe edilecek")
+    
+    processed_seconds = duration - retranscribed_seconds
+    region_results = []
+    start_time = time.perf_counter()
+    for start, end in regions:
+        segments_iter, _ = transcribe_profile_stream(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)],
+                                                     model_name, language, DECODE_PROFILES[profile or DEFAULT_PROFILE],
+                                                     redecode_stats)
+        region_segments = []
+        with stage("model_decode"):
+            for segment in segments_iter:
+                segment = shift_segment(segment_to_dict(segment), start)
+                segment["end"] = min(segment["end"], end)
+                region_segments.append(segment)
+        region_results.append(((start, end), region_segments))
+        processed_seconds += end - start
+        if progress_callback:
+            progress_callback(len(reused) + sum(len(r) for _, r in region_results), processed_seconds, duration)
+        scheduler.preemption_point(processed_seconds)
+    
+    if regions:
+        record_transcription(model_name or WHISPER_MODEL, retranscribed_seconds, time.perf_counter() - start_time)
+    segments = merge_region_segments(reused, region_results)
+    return segments, {
+        "reused_segments": len(reused),
+        "regions": len(regions),
+        "retranscribed_seconds": round(retranscribed_seconds, 2),
+        "audio_duration": round(duration, 2)
+    }
+
+def coalescing_key(audio_hash, model_name, language, profile, sequence_id=None):
+    """Eşzamanlı aynı isteklerin birleştirme anahtarı: önbellek anahtarı (ses hash'i + decode ayarları).
+
+    Artımlı transkripsiyonda sonuç sequence'in önceki export'una da bağlı olduğu için sequence eklenir.
+    """
+    key = transcript_cache_key(None, model_name, language, audio_hash, profile)
+    return f"{key}:{sequence_id}" if sequence_store and sequence_id else key
+
+def coalesced(key, transcribe, progress_callback=None):
+    """transcribe(progress_callback) -> (segmentler, meta) tek decode olarak çalıştırılır.
+
+    Aynı anahtarlı decode çalışıyorsa transcribe çağrılmaz, o decode'un sonucu döner (meta'da
+    coalesced: True); progress_callback o decode'un ilerlemesini alır. key None ise doğrudan çağrılır.
+    """
+    if key is None:
+        return transcribe(progress_callback)
+    (segments, meta), shared = coalescer.run(key, transcribe, progress_callback)
+    return segments, ({**meta, "coalesced": True} if shared else meta)
+
+def transcribe_remote(audio_data, suffix='', parallel='auto', sequence_id=None, model_name=None, language=None,
+                      language_switching=False, profile=None, ticket=None):
+    """Ön yüz: sesi paylaşılan kuyruğa ver ve bir düğümün işi bitirmesini bekle: (segmentler, meta).
+
+    Düğümün aşama süreleri bu isteğin süre kayıtlarına eklenir (Server-Timing). ticket'ın istemcisi,
+    önceliği ve süresi job'a yazılır (düğümde aynı sınıfta sıraya girer). Kuyruk doluysa veya canlı
+    düğüm yoksa Overloaded, düğüm CLUSTER_WAIT_SECONDS içinde bitirmezse ClusterTimeout fırlatır.
+    """
+    if not cluster_store.workers():
+        # Job kuyrukta sonsuza kadar bekler, istek thread'i asılı kalırdı
+        raise Overloaded("Canlı inference düğümü yok", max(1, round(CLUSTER_WORKER_TIMEOUT)), unavailable=True)
+    with stage("temp_write"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_file.write(audio_data)
     try:
-        # Premiere Pro XML yapısı - Caption track olarak
-        root = ET.Element("xmeml")
-        root.set("version", "4")
-        
-        # Project element
-        project = ET.SubElement(root, "project")
-        
-        # Sequence element
-        sequence = ET.SubElement(project, "sequence")
-        sequence.set("id", "sequence-1")
-        
-        # Sequence name
-        name = ET.SubElement(sequence, "name")
-        name.text = sequence_name
-        
-        # Media element
-        media = ET.SubElement(sequence, "media")
-        
-        # Caption tracks
-        captions = ET.SubElement(media, "captions")
-        
-        # Caption track
-        caption_track = ET.SubElement(captions, "caption_track")
-        caption_track.set("id", "caption-track-1")
+        job = job_queue.submit(audio_path=temp_file.name, filename=f"audio{suffix}", parallel=parallel,
+                               sequence_id=sequence_id, model=model_name, language=language,
+                               language_switching=language_switching, profile=profile,
+                               **(ticket_params(ticket) if ticket else {}))
+    except JobQueueFull as e:
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+        raise Overloaded(str(e), admission.retry_after()) from e
+    with stage("cluster_wait"):
+        job = job_queue.wait(job.id, CLUSTER_WAIT_SECONDS)
+    if job is None or job.status != "done":
+        raise RuntimeError(job.error if job else "Job bulunamadı")
+    timings = current_timings()
+    if timings is not None:
+        for name, seconds in job.meta.pop("timings", {}).items():
+            timings[name] = timings.get(name, 0.0) + seconds
+    return job.segments, job.meta
+
+def lookup_transcript(meta, audio_data, audio_hash, language, switching):
+    """Önbellekteki transkript veya None; anahtar, isabet ve önbellekten gelen dil bilgisi meta'ya yazılır"""
+    model_name, profile = meta["model"], meta["profile"]
+    meta["transcript_key"] = transcript_cache_key(
+        audio_data, model_name, f"{AUTO}:chunks" if switching else language, audio_hash, profile
+    )
+    segments = transcript_cache.get(meta["transcript_key"])
+    if segments is not None:
+        meta["cache_hit"] = True
+        logger.info(f"Önbellekten alındı: {meta['transcript_key'][:12]} ({len(segments)} segment)")
+        if switching:
+            meta["language_detection"] = summarize_language_detections(language_runs(segments))
+            meta["language"] = meta["language_detection"]["language"]
+        elif language == AUTO:
+            meta["language_detection"] = cached_language_detection(audio_hash, model_name)
+            meta["language"] = (meta["language_detection"] or {}).get("language")
+    return segments
+
+def transcribe_cached(audio_data, progress_callback=None, parallel='auto', sequence_id=None, model_name=None,
+                      suffix='', admit=False, checkpoint=None, language=None, language_switching=False, profile=None,
+                      ticket=None):
+    """Önbellek ve artımlı transkripsiyon destekli transkripsiyon: (segmentler, meta bilgisi).
+
+    audio_data upload edilen dosyanın baytlarıdır; ses sadece gerektiğinde bellekte çözülür.
+    admit=True ise önbellekte olmayan ses decode edilmeden önce kabul kontrolünden geçer
+    (backlog doluysa Overloaded); job'lar kuyruğa alınırken kontrol edildiği için False ile çağrılır.
+    checkpoint: job'un decode checkpoint'i (artımlı transkripsiyon bölgeleri checkpoint'lenmez).
+    language: dil kodu veya 'auto' (varsayılan DEFAULT_LANGUAGE); language_switching ile 'auto'
+    dili parça bazında tespit eder.
+    profile: kalite / hız profili (varsayılan DEFAULT_PROFILE).
+    ticket: zamanlayıcı bileti (scheduler.Ticket); verilirse decode sırası öncelik zamanlayıcısında beklenir.
+    Aynı ses ve ayarlarla eşzamanlı gelen istekler tek decode'u paylaşır (bkz. coalesced).
+
+    meta: model, transcript_key (önbellek anahtarı), cache_hit, incremental (artımlı istatistikler),
+    language ve otomatik tespitte language_detection (güven, pencereler / parçalar, süre),
+    profile ve adaptive profilde redecode (tekrar decode edilen segment / ses oranı); çalışan bir
+    decode'un sonucunu alan istekte coalesced
+    """
+    model_name = model_name or WHISPER_MODEL
+    language = language or DEFAULT_LANGUAGE
+    profile = profile or DEFAULT_PROFILE
+    switching = language == AUTO and language_switching
+    meta = {"model": model_name, "transcript_key": None, "cache_hit": False, "incremental": None,
+            "language": None if language == AUTO else language, "profile": profile, "redecode": None}
+    
+    # Otomatik dil tespiti ses hash'i başına önbelleklenir; hash önbellek ve birleştirme anahtarlarıyla paylaşılır
+    audio_hash = hash_bytes(audio_data) if transcript_cache or language == AUTO or coalescer else None
+    segments = lookup_transcript(meta, audio_data, audio_hash, language, switching) if transcript_cache else None
+    flight_key = (coalescing_key(audio_hash, model_name, f"{AUTO}:chunks" if switching else language, profile,
+                                 sequence_id) if coalescer and segments is None else None)
+    
+    if segments is None and CLUSTER_ROLE == 'frontend':
+        # Decode, artımlı transkripsiyon ve önbelleğe yazma işi alan düğümde yapılır
+        return coalesced(flight_key, lambda progress: transcribe_remote(
+            audio_data, suffix, parallel, sequence_id, model_name, language, language_switching, profile, ticket
+        ))
+    
+    # Birleştirmede sadece aynı anahtarla ilk gelen istek çalıştırır; diğerleri sonucunu alır
+    def transcribe(progress_callback):
+        nonlocal segments, language, sequence_id
+        # Önbellek isabetinde decode yapılmaz, kabul kontrolüne ve backlog'a girmez
+        if segments is not None:
+            slot = nullcontext()
+        else:
+            slot = admission.admit() if admit else admission.inference()
         
-        # Her segment için caption oluştur
-        for i, segment in enumerate(segments):
-            caption = ET.SubElement(caption_track, "caption")
-            caption.set("id", f"caption-{i+1}")
-            
-            # Start time (Premiere timebase: 254016000000 ticks per second)
-            start = ET.SubElement(caption, "start")
-            start.text = str(int(segment.start * 254016000000))
-            
-            # End time
-            end = ET.SubElement(caption, "end")
-            end.text = str(int(segment.end * 254016000000))
-            
-            # Text content
-            text = ET.SubElement(caption, "text")
-            text.text = segment.text.strip()
-            
-            # Caption properties
-            properties = ET.SubElement(caption, "properties")
+        with slot, scheduled(ticket if segments is None else None):
+            audio = None
+            if segments is None or (sequence_store and sequence_id):
+                audio = decode_audio(audio_data, suffix)
+            detections = [] if switching else None
+            redecode_stats = {}
+            if segments is None and language == AUTO and not switching:
+                detection = detect_audio_language(audio, model_name, audio_hash)
+                language = meta["language"] = detection["language"]
+                meta["language_detection"] = detection
             
-            # Font properties
-            font_prop = ET.SubElement(properties, "property")
-            font_prop.set("id", "font")
-            font_prop.text = "Arial"
+            if sequence_store and sequence_id:
+                # Farklı model ve dillerin segmentleri birbirinin yerine kullanılmaz
+                sequence_language = f"{AUTO}:chunks" if switching else meta["language"]
+                sequence_id = f"{model_name}:{sequence_id}"
+                if profile != 'balanced':
+                    sequence_id = f"{profile}:{sequence_id}"
+                if sequence_language != DECODE_OPTIONS["language"]:
+                    sequence_id = f"{sequence_language}:{sequence_id}"
+                fingerprints, silent = compute_fingerprints(audio)
+                if segments is None:
+                    previous = sequence_store.load(sequence_id)
+                    if previous is not None:
+                        region_language = language
+                        if switching:
+                            # Parça bazında dilde değişen bölgeler tüm sesin tespit edilen diliyle transkribe edilir
+                            region_language = meta["language"] = detect_audio_language(
+                                audio, model_name, audio_hash
+                            )["language"]
+                        segments, meta["incremental"] = transcribe_incremental(
+                            audio, previous, fingerprints, silent, progress_callback, model_name, region_language,
+                            profile, redecode_stats
+                        )
+                    else:
+                        segments = transcribe_file(audio, progress_callback, parallel, model_name, checkpoint,
+                                                   language, detections, profile, redecode_stats)
+                # Bir sonraki export bu sürümle karşılaştırılır
+                sequence_store.save(sequence_id, fingerprints, segments)
+            elif segments is None:
+                segments = transcribe_file(audio, progress_callback, parallel, model_name, checkpoint,
+                                           language, detections, profile, redecode_stats)
             
-            # Size properties
-            size_prop = ET.SubElement(properties, "property")
-            size_prop.set("id", "size")
-            size_prop.text = "24"
-            
-            # Color properties
-            color_prop = ET.SubElement(properties, "property")
-            color_prop.set("id", "color")
-            color_prop.text = "FFFFFF"
+            if detections:
+                meta["language_detection"] = summarize_language_detections(detections)
+                meta["language"] = meta["language_detection"]["language"]
+            if redecode_stats:
+                meta["redecode"] = redecode_summary(redecode_stats, len(audio) / SAMPLE_RATE)
+                logger.info(f"Adaptive decode: {meta['redecode']['redecoded_segments']}/{meta['redecode']['segments']} "
+                            f"segment tekrar decode edildi (sesin %{meta['redecode']['redecoded_fraction'] * 100:.1f}'i)")
         
-        # XML'i güzel formatla
-        rough_string = ET.tostring(root, 'utf-8')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
-    except Exception as e:
-        logger.error(f"XML oluşturma hatası: {e}")
-        raise
+        if transcript_cache and not meta["cache_hit"]:
+            transcript_cache.put(meta["transcript_key"], segments, model=model_name)
+        return segments, meta
+    
+    # Aynı ses ve ayarlarla çalışan decode varsa ikinci decode başlatılmaz, onun sonucu beklenir
+    return coalesced(flight_key, transcribe, progress_callback)
+
+def transcribe_long_file(path, progress_callback=None, model_name=None, checkpoint=None, language=None,
+                         language_switching=False, profile=None, ticket=None):
+    """Uzun kaydı (saatlerce süren konferans / toplantı) sınırlı bellekle transkribe et: (segmentler, meta).
+
+    Ses dosyadan parça parça çözülür ve LONGFORM_WINDOW_SECONDS'lık pencerelerde decode edilir
+    (bkz. longform); bellekte tüm ses değil en fazla bir pencere bulunur. Önbellek anahtarı dosyanın
+    hash'inden üretilir ve aynı sesin transcribe_cached anahtarıyla aynıdır. Paralel, batch ve artımlı
+    transkripsiyon kullanılmaz; pencereler içindeki segmentler arasında zamanlayıcı kesme noktası vardır.
+    meta: transcribe_cached ile aynı alanlar + longform (pencere sayısı).
+    """
+    model_name = model_name or WHISPER_MODEL
+    language = language or DEFAULT_LANGUAGE
+    profile = profile or DEFAULT_PROFILE
+    switching = language == AUTO and language_switching
+    meta = {"model": model_name, "transcript_key": None, "cache_hit": False, "incremental": None,
+            "language": None if language == AUTO else language, "profile": profile, "redecode": None}
+    
+    # Hash dosyadan blok blok hesaplanır (hash_bytes ile aynı)
+    audio_hash = hash_file(path) if transcript_cache or language == AUTO or coalescer else None
+    segments = lookup_transcript(meta, None, audio_hash, language, switching) if transcript_cache else None
+    if segments is not None:
+        return segments, meta
+    # Anahtar transcribe_cached ile aynı: aynı sesin senkron isteği de bu decode'a bağlanır
+    flight_key = (coalescing_key(audio_hash, model_name, f"{AUTO}:chunks" if switching else language, profile)
+                  if coalescer else None)
+    return coalesced(flight_key, lambda progress: decode_long_transcript(
+        path, meta, audio_hash, progress, model_name, checkpoint, language, switching, profile, ticket
+    ), progress_callback)
+
+def decode_long_transcript(path, meta, audio_hash, progress_callback, model_name, checkpoint, language, switching,
+                           profile, ticket):
+    """transcribe_long_file'ın önbellekte olmayan ses için decode adımı: (segmentler, meta)"""
+    reader = AudioFileReader(path)
+    with admission.inference(), scheduled(ticket):
+        detections = [] if switching else None
+        redecode_stats = {}
+        if language == AUTO and not switching:
+            # Sadece örneklenen pencereler dosyadan okunur
+            detection = detect_audio_language(reader, model_name, audio_hash)
+            language = meta["language"] = detection["language"]
+            meta["language_detection"] = detection
+        segments, meta["longform"] = decode_long_file(reader, progress_callback, model_name, checkpoint, language,
+                                                      detections, DECODE_PROFILES[profile], redecode_stats)
+        if detections:
+            meta["language_detection"] = summarize_language_detections(detections)
+            meta["language"] = meta["language_detection"]["language"]
+        if redecode_stats:
+            meta["redecode"] = redecode_summary(redecode_stats, meta["longform"]["audio_duration"])
+    
+    if transcript_cache:
+        transcript_cache.put(meta["transcript_key"], segments, model=model_name)
+    return segments, meta
+
+def decode_long_file(reader, progress_callback=None, model_name=None, checkpoint=None, language=None,
+                     detections=None, settings=None, redecode_stats=None):
+    """transcribe_long_file'ın pencere pencere decode döngüsü: (segmentler, pencere istatistikleri).
+
+    Her pencereye önceki pencerenin son metni initial_prompt olarak verilir. Segmentler decode
+    edildikçe checkpoint'e ve progress_callback'e iletilir; checkpoint varsa kayıtlı son segmentin
+    sonundan devam edilir. detections verilirse (parça bazında dil) her pencerenin dili ayrı tespit edilir.
+    """
+    model_name = model_name or WHISPER_MODEL
+    duration = reader.duration or 0.0
+    resume_at = checkpoint.resume_at if checkpoint else 0.0
+    prompt = None
+    if checkpoint:
+        if resume_at:
+            logger.info(f"Transkripsiyon kaldığı yerden devam ediyor: {resume_at:.1f}s / {duration:.1f}s "
+                        f"({len(checkpoint.segments)} segment kayıtlı)")
+            prompt = carry_prompt(checkpoint.segments)
+        progress_callback = checkpoint.progress(progress_callback, duration)
+    
+    # Zamanlar resume_at'e göre göreli (checkpoint.merge ile global zamana çevrilir)
+    segments = []
+    windows = 0
+    processed = 0.0
+    start_time = time.perf_counter()
+    for offset, window in iter_windows(reader.chunks(resume_at), LONGFORM_WINDOW_SECONDS):
+        window_language = language
+        if detections is not None:
+            detection = detect_audio_language(window, model_name, windows=2)
+            window_language = detection["language"]
+            detections.append({
+                "start": round(resume_at + offset, 2),
+                "end": round(resume_at + offset + len(window) / SAMPLE_RATE, 2),
+                "language": window_language,
+                "confidence": detection["confidence"],
+                "seconds": detection["seconds"]
+            })
+        segments_iter, _ = transcribe_profile_stream(window, model_name, window_language, settings, redecode_stats,
+                                                     prompt)
+        first = len(segments)
+        with stage("model_decode"):
+            for segment in segments_iter:
+                segment = shift_segment(segment_to_dict(segment), offset)
+                if detections is not None:
+                    segment["language"] = window_language
+                segments.append(segment)
+                if checkpoint:
+                    checkpoint.add(segment)
+                if progress_callback:
+                    progress_callback(len(segments), segment["end"], duration)
+                scheduler.preemption_point(resume_at + segment["end"])
+        processed = offset + len(window) / SAMPLE_RATE
+        prompt = carry_prompt(segments[first:]) or prompt
+        windows += 1
+    
+    record_transcription(model_name, processed, time.perf_counter() - start_time)
+    logger.info(f"Uzun kayıt transkripsiyonu tamamlandı: {len(segments)} segment, {windows} pencere, "
+                f"{resume_at + processed:.1f}s ses")
+    if checkpoint:
+        checkpoint.flush()
+        segments = checkpoint.merge(segments)
+    return segments, {
+        "windows": windows,
+        "window_seconds": LONGFORM_WINDOW_SECONDS,
+        "audio_duration": round(duration or resume_at + processed, 2)
+    }
+
+def set_result_headers(response, meta):
+    """Model, profil, dil, önbellek, birleştirme ve artımlı transkripsiyon bilgisini yanıt header'larına ekle"""
+    if meta.get("model"):
+        response.headers['X-Model'] = meta["model"]
+    if meta.get("profile"):
+        response.headers['X-Profile'] = meta["profile"]
+    if meta.get("redecode"):
+        response.headers['X-Redecode'] = json.dumps(meta["redecode"])
+    if meta.get("language"):
+        response.headers['X-Language'] = meta["language"]
+    detection = meta.get("language_detection")
+    if detection:
+        # Pencere / parça listesi header'a konmaz (job bilgisinde ve JSON yanıtlarında tam hali var)
+        summary = {key: detection[key] for key in ("confidence", "seconds", "cached", "mode") if key in detection}
+        if detection.get("chunks"):
+            summary["languages"] = sorted({chunk["language"] for chunk in detection["chunks"]})
+        response.headers['X-Language-Detection'] = json.dumps(summary)
+    if meta.get("transcript_key"):
+        response.headers['X-Cache'] = 'HIT' if meta["cache_hit"] else 'MISS'
+        response.headers['X-Transcript-Key'] = meta["transcript_key"]
+    if meta.get("coalesced"):
+        response.headers['X-Coalesced'] = 'true'
+    if meta.get("incremental"):
+        response.headers['X-Incremental'] = json.dumps(meta["incremental"])
+    return response
+
+def subtitle_response(segments, output_format, caption_style=None):
+    """Altyazıyı parça parça üretip gönderen (chunked) indirme yanıtı.
+
+    Doküman bellekte tek string olarak birleştirilmez; writer çıktısı RESPONSE_CHUNK_CHARS
+    büyüklüğünde parçalar halinde gönderilir. Render süresi gönderim beklemeleri hariç ölçülür.
+    caption_style verilirse segmentler önce satır / süre sınırlarına göre yeniden bölünür.
+    """
+    writer = subtitle_writer(output_format)
+    if caption_style:
+        with stage("resegment"):
+            segments = resegment(segments, caption_style)
+    
+    def generate():
+        render_seconds = 0.0
+        sent_bytes = 0
+        buffer, buffered = [], 0
+        start_time = time.perf_counter()
+        for chunk in iter_document(writer, segments):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= RESPONSE_CHUNK_CHARS:
+                data = "".join(buffer).encode('utf-8')
+                buffer, buffered = [], 0
+                render_seconds += time.perf_counter() - start_time
+                sent_bytes += len(data)
+                yield data
+                start_time = time.perf_counter()
+        data = "".join(buffer).encode('utf-8')
+        render_seconds += time.perf_counter() - start_time
+        record_stage("render", render_seconds)
+        sent_bytes += len(data)
+        yield data
+        logger.info(f"Altyazı dosyası gönderildi: {writer.filename} ({sent_bytes} bayt)")
+    
+    response = Response(generate(), mimetype=writer.mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={writer.filename}'
+    return response
+
+def request_client():
+    """İsteği gönderen istemci (adil paylaşım için): 'client_id' alanı, X-Client-Id header'ı veya IP"""
+    client = request.form.get('client_id') or request.headers.get('X-Client-Id') or request.remote_addr
+    return (client or "anonymous")[:64]
+
+def audio_duration_hint(audio_data):
+    """Sıralama için ses süresi (saniye): WAV başlığından, diğer formatlarda boyuttan kaba tahmin"""
+    duration = wav_duration(audio_data)
+    return duration if duration is not None else len(audio_data) / ESTIMATED_BYTES_PER_SECOND
+
+def request_ticket(audio_data):
+    """İstekteki ses için zamanlayıcı bileti ('priority' alanı, istemci ve ses süresi)"""
+    duration = audio_duration_hint(audio_data)
+    return Ticket(request_client(), parse_priority(request.form.get('priority'), duration, INTERACTIVE_MAX_SECONDS),
+                  duration)
+
+def ticket_params(ticket):
+    """Job parametrelerine yazılan zamanlama bilgisi (job_ticket ile tekrar bilete çevrilir)"""
+    return {"client": ticket.client, "priority": ticket.priority, "duration": ticket.duration}
+
+def job_ticket(job):
+    """Job'un zamanlayıcı bileti (kuyrukta sıralama ve decode sırası için; job başına bir kez oluşturulur)"""
+    ticket = getattr(job, "ticket", None)
+    if ticket is None:
+        duration = job.params.get("duration")
+        ticket = job.ticket = Ticket(job.params.get("client"), job.params.get("priority"), duration)
+    return ticket
+
+@contextmanager
+def scheduled(ticket):
+    """Blok süresince zamanlayıcıda slot tut (ticket None ise sıra beklenmez, ör. önbellek isabeti)"""
+    if ticket is None:
+        yield
+        return
+    try:
+        with scheduler.run(ticket):
+            yield
+    finally:
+        record_stage("queue_wait", ticket.waited_seconds)
+
+def job_status(job):
+    """Job durumu; sırada bekleyen job'lar için sıra bilgisi (queue: sıra, tahmini başlama) eklenir"""
+    data = job.to_dict()
+    if CLUSTER_ROLE == 'frontend':
+        return data
+    data["priority"] = job.params.get("priority")
+    ticket = job_ticket(job)
+    # Worker'ın aldığı job da zamanlayıcıda slot bekliyor (veya kesilmiş) olabilir; çalışan bir decode'a
+    # bağlanan job'un bileti sıraya girmez, ilerlemesi o decode'dan gelir
+    waiting = ticket.state == "waiting" or (ticket.state == "new" and not job.segments_decoded)
+    if job.status == "queued" or (job.status == "running" and waiting):
+        data["queue"] = scheduler.queue_info(ticket, [job_ticket(queued) for queued in job_queue.queued()])
+    return data
+
+def run_transcription_job(job):
+    """Job kuyruğu worker'ı: kaydedilmiş ses dosyasını transkribe et"""
+    audio_path = job.params["audio_path"]
+    # Worker thread'inde aşama süreleri job bilgisine yazılır (panel ve sonuç header'ı için)
+    timings = start_timings()
+    # Önceki çalışmada (process çökmesi / düğüm kaybı) kaydedilmiş parçalar tekrar decode edilmez
+    checkpoint = job_store.checkpoint(job.id, JOB_CHECKPOINT_SECONDS) if job_store else None
+    try:
+        duration = probe_duration(audio_path) if LONGFORM_MIN_SECONDS else None
+        if duration and duration >= LONGFORM_MIN_SECONDS:
+            # Uzun kayıt: dosya belleğe okunmaz, pencere pencere decode edilir (artımlı ve paralel yollar kullanılmaz)
+            segments, job.meta = transcribe_long_file(
+                audio_path,
+                progress_callback=job.update_progress,
+                model_name=job.params.get("model"),
+                checkpoint=checkpoint,
+                language=job.params.get("language"),
+                language_switching=job.params.get("language_switching", False),
+                profile=job.params.get("profile"),
+                ticket=job_ticket(job)
+            )
+        else:
+            with open(audio_path, 'rb') as f:
+                audio_data = f.read()
+            segments, job.meta = transcribe_cached(
+                audio_data,
+                suffix=os.path.splitext(job.params.get("filename") or audio_path)[1],
+                progress_callback=job.update_progress,
+                parallel=job.params.get("parallel", "auto"),
+                sequence_id=job.params.get("sequence_id"),
+                model_name=job.params.get("model"),
+                checkpoint=checkpoint,
+                language=job.params.get("language"),
+                language_switching=job.params.get("language_switching", False),
+                profile=job.params.get("profile"),
+                ticket=job_ticket(job)
+            )
+        job.meta["timings"] = {name: round(seconds, 4) for name, seconds in timings.items()}
+        if checkpoint and checkpoint.resume_at:
+            job.meta["resumed_at"] = round(checkpoint.resume_at, 2)
+        if job_store:
+            job_store.clear_chunks(job.id)
+        return segments
+    finally:
+        try:
+            if os.path.exists(audio_path):
+                os.unlink(audio_path)
+                logger.debug(f"Job ses dosyası silindi: {audio_path}")
+        except Exception as cleanup_error:
+            logger.warning(f"Job ses dosyası silinemedi: {cleanup_error}")
+
+scheduler = InferenceScheduler(SCHEDULER_SLOTS, SCHEDULER_QUANTUM_SECONDS)
+cluster_store = ClusterStore(CLUSTER_DIR, CLUSTER_WORKER_TIMEOUT) if CLUSTER_ROLE in ('frontend', 'worker') else None
+cluster_worker = None
+job_store = None
+if JOB_STORE_ENABLED and CLUSTER_ROLE != 'frontend':
+    # Düğümlerin checkpoint'leri paylaşılan dizinde: kapanan düğümün işini alan düğüm kaldığı yerden devam eder
+    job_store = JobStore(
+        os.path.join(CLUSTER_DIR, 'jobs') if CLUSTER_ROLE == 'worker' else JOB_STORE_DIR,
+        max_attempts=JOB_MAX_ATTEMPTS
+    )
+if CLUSTER_ROLE == 'frontend':
+    # İşler düğümlerde çalışır; /jobs endpoint'leri aynı arayüzle paylaşılan kuyruğu kullanır
+    job_queue = ClusterJobQueue(cluster_store, max_queued=JOB_MAX_QUEUED, retention_seconds=JOB_RETENTION_SECONDS)
+else:
+    job_queue = JobQueue(
+        run_transcription_job,
+        max_queued=JOB_MAX_QUEUED,
+        retention_seconds=JOB_RETENTION_SECONDS,
+        # Düğümde job kayıtları cluster kuyruğundadır, depo sadece checkpoint için kullanılır
+        store=job_store if CLUSTER_ROLE == 'standalone' else None,
+        # Ek worker'lar kesilen işler sırada beklerken kısa işlerin başlamasını sağlar; kuyruk öncelik sırasıyla
+        # boşaltılır ve iş ancak zamanlayıcıda başlayabilecekse (boş slot veya kesebileceği iş varsa) alınır
+        workers=JOB_WORKERS + SCHEDULER_EXTRA_WORKERS,
+        rank=lambda job: scheduler.rank(job_ticket(job)),
+        ready=lambda job: scheduler.can_start(job_ticket(job))
+    )
+if CLUSTER_ROLE == 'worker':
+    cluster_worker = ClusterWorker(
+        cluster_store,
+        run_transcription_job,
+        loaded_models=lambda: [entry["name"] for entry in model_registry.status() if entry["state"] == "loaded"],
+        slots=JOB_WORKERS,
+        steal_after_seconds=CLUSTER_STEAL_SECONDS
+    )
+admission = AdmissionController(
+    ADMISSION_MAX_BACKLOG,
+    workers=JOB_WORKERS,
+    queued=lambda: job_queue.stats()["queued"]
+)
+services_started = False
+
+def start_background_services():
+    """Job worker'larını, model ısıtmayı ve boştaki model temizleyicisini başlat (process başına bir kez).
+
+    Thread'ler fork'tan sonra kopyalanmadığı için gunicorn preload modunda worker process'inde çağrılır.
+    """
+    global services_started
+    if services_started:
+        return
+    services_started = True
+    job_queue.start()
+    if CLUSTER_ROLE == 'frontend':
+        return
+    # Model yüklemesi sunucunun port açmasını bekletmez
+    threading.Thread(target=warm_up_default_model, name="model-warmup", daemon=True).start()
+    model_registry.start_idle_reaper()
+    if cluster_worker:
+        if job_store:
+            job_store.purge_expired(JOB_RETENTION_SECONDS)
+        for name in WORKER_MODELS:
+            if name != WHISPER_MODEL and model_registry.is_available(name):
+                threading.Thread(target=model_registry.load, args=(name,), name=f"model-load-{name}",
+                                 daemon=True).start()
+        cluster_worker.start()
+
+def begin_shutdown():
+    """Kapanış başladı: yeni transkripsiyonlar reddedilir, /ready 503 döner"""
+    admission.start_draining()
+
+def drain_and_stop(timeout=DRAIN_TIMEOUT):
+    """Çalışan ve kuyruktaki job'ların bitmesini bekle, paralel havuzu kapat.
+
+    Biten job'ların segmentleri önbelleğe yazıldığından, yeniden başlatma sonrası
+    aynı ses tekrar gönderildiğinde decode edilmeden döner.
+    """
+    begin_shutdown()
+    started = time.time()
+    if cluster_worker:
+        # Düğüm yeni iş almayı bırakır, çalışan işlerini bitirip kaydını siler
+        drained = cluster_worker.stop(timeout)
+    else:
+        drained = job_queue.drain(timeout)
+    if parallel_transcriber:
+        parallel_transcriber.shutdown()
+    logger.info(f"Kapanış: job kuyruğu {'boşaltıldı' if drained else 'boşaltılamadı'} "
+                f"({time.time() - started:.1f}s)")
+    return drained
+
+if IS_MAIN_PROCESS and AUTOSTART_SERVICES:
+    start_background_services()
+
+startup_stats["import_seconds"] = round(time.time() - IMPORT_STARTED_AT, 2)
+logger.info(f"Uygulama import edildi: {startup_stats['import_seconds']}s")
+
+# Scrape sırasında okunan metrikler
+metrics_registry.gauge(
+    "subem_job_queue_depth", "Kuyrukta bekleyen job sayısı",
+    callback=lambda: job_queue.stats()["queued"]
+)
+metrics_registry.gauge(
+    "subem_jobs_running", "İşlenmekte olan job sayısı",
+    callback=lambda: job_queue.stats()["running"]
+)
+metrics_registry.gauge(
+    "subem_inference_backlog", "Çalışan ve kuyrukta bekleyen transkripsiyon sayısı (kabul kontrolü)",
+    callback=admission.backlog
+)
+metrics_registry.gauge(
+    "subem_scheduler_waiting", "Zamanlayıcıda slot bekleyen transkripsiyon sayısı", ["priority"],
+    callback=lambda: {(priority,): count for priority, count in scheduler.stats()["waiting"].items()}
+)
+metrics_registry.gauge(
+    "subem_scheduler_preemptions", "Öncelikli iş için kesilen transkripsiyon sayısı (başlangıçtan beri)",
+    callback=lambda: scheduler.preemptions
+)
+metrics_registry.gauge(
+    "subem_coalesced_requests", "Çalışan bir decode'a bağlanan istek sayısı (başlangıçtan beri)",
+    callback=lambda: coalescer.coalesced if coalescer else 0
+)
+metrics_registry.gauge(
+    "subem_coalescing_in_flight", "Bağlanılabilir çalışan decode sayısı",
+    callback=lambda: coalescer.stats()["in_flight"] if coalescer else 0
+)
+metrics_registry.gauge(
+    "subem_model_memory_mb", "Yüklü modellerin yaklaşık bellek kullanımı (MB)", ["model"],
+    callback=lambda: {
+        (entry["name"],): entry["resident_mb"] or 0.0
+        for entry in model_registry.status() if entry["state"] == "loaded"
+    }
+)
+metrics_registry.gauge(
+    "subem_model_in_use", "Modeli kullanan istek / job sayısı", ["model"],
+    callback=lambda: {(entry["name"],): entry["in_use"] for entry in model_registry.status()}
+)
+
+@app.before_request
+def start_request_metrics():
+    """İstek süresi ve aşama sürelerini başlat; form gövdesini 'upload' aşaması olarak oku"""
+    g.request_started = time.perf_counter()
+    start_timings()
+    REQUESTS_IN_FLIGHT.inc()
+    if request.method == 'POST' and request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        with stage("upload"):
+            request.form
+
+@app.after_request
+def finish_request_metrics(response):
+    """İstek metriklerini kaydet, aşama sürelerini Server-Timing header'ı olarak ekle"""
+    if 'request_started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method)
+    REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    
+    timings = current_timings()
+    if timings:
+        response.headers['Server-Timing'] = server_timing_header({**timings, "total": elapsed})
+    
+    # Yanıt gövdesinin gönderimi (ve streaming yanıtlarda üretimi) kapanışta ölçülür
+    started = g.request_started
+    def on_close():
+        record_stage("send", time.perf_counter() - started - elapsed)
+        REQUESTS_IN_FLIGHT.dec()
+    response.call_on_close(on_close)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text formatında metrikler"""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def cluster_status():
+    """Cluster rolü, bu düğümün kimliği ve canlı düğümler (yüklü modeller, boş kapasite)"""
+    if not cluster_store:
+        return {"role": CLUSTER_ROLE}
+    return {
+        "role": CLUSTER_ROLE,
+        "node": cluster_worker.id if cluster_worker else None,
+        "workers": cluster_store.workers()
+    }
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """API sağlık kontrolü"""
     try:
-        model_status = "loaded" if model else "error"
-        status = "healthy" if model else "error"
+        model_status = model_registry.entry(WHISPER_MODEL).state
+        readiness = startup_status()
+        status = {"ready": "healthy", "loading": "loading"}.get(readiness, "error")
         
         response_data = {
             "status": status,
+            "ready": readiness == "ready",
             "model": WHISPER_MODEL,
             "faster_whisper": USE_FASTER_WHISPER,
             "model_status": model_status,
+            "startup": startup_stats,
+            "loaded_models": [entry["name"] for entry in model_registry.status() if entry["state"] == "loaded"],
+            "jobs": job_queue.stats(),
+            "admission": admission.stats(),
+            "scheduler": scheduler.stats(),
+            "parallel_workers": PARALLEL_WORKERS if parallel_transcriber else 0,
+            "batching": batching_stats(),
+            "upload": upload_capabilities(),
+            "cache": transcript_cache.stats() if transcript_cache else None,
+            "coalescing": coalescer.stats() if coalescer else None,
+            "cluster": cluster_status(),
+            "language": {"default": DEFAULT_LANGUAGE, "detection_cache": language_cache.stats()},
+            "profiles": {"default": DEFAULT_PROFILE, "available": DECODE_PROFILES},
             "timestamp": str(timedelta())
         }
         
@@ -187,108 +1417,572 @@ def health_check():
         logger.error(f"Health check hatası: {e}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Hazır olma kontrolü: varsayılan model yüklenip ısıtılana kadar ve kapanış sırasında 503 döner"""
+    readiness = "draining" if admission.draining else startup_status()
+    if readiness == "ready":
+        return jsonify({"status": readiness, "startup": startup_stats})
+    response = jsonify({"status": readiness, "startup": startup_stats})
+    response.status_code = 503
+    if readiness == "loading":
+        response.headers['Retry-After'] = '5'
+    return response
+
+# Parçalı upload deposu
+upload_store = UploadStore(UPLOAD_DIR, UPLOAD_MAX_MB * 1024 * 1024, UPLOAD_RETENTION_SECONDS)
+
+def upload_capabilities():
+    """İstemcinin upload formatını seçmesi için /health ile bildirilen ayarlar"""
+    return {
+        "formats": accepted_formats(),
+        "preferred": {"format": "wav", "sample_rate": SAMPLE_RATE, "channels": 1, "bits_per_sample": 16},
+        "chunked": True,
+        "chunk_bytes": UPLOAD_CHUNK_MB * 1024 * 1024,
+        "max_bytes": UPLOAD_MAX_MB * 1024 * 1024
+    }
+
+def upload_error_response(error):
+    """UploadError için JSON hata yanıtı (güncel ofset ile)"""
+    data = {"error": str(error)}
+    if error.offset is not None:
+        data["offset"] = error.offset
+    return jsonify(data), error.status
+
+def overloaded_response(error):
+    """Overloaded için 429 (backlog dolu) veya 503 (kapanıyor / canlı düğüm yok) yanıtı, Retry-After ile"""
+    logger.warning(f"İstek reddedildi: {error}")
+    response = jsonify({"error": str(error), "retry_after": error.retry_after})
+    response.status_code = 503 if error.draining or error.unavailable else 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def request_audio(label):
+    """İstekteki ses: 'audio' dosya alanı veya tamamlanmış parçalı upload ('upload_id' alanı).
+
+    Dönen değer (ses baytları, dosya adı, hata yanıtı); hata yanıtı varsa endpoint onu döndürür.
+    Upload burada silinmez: transkripsiyon başarılı olunca finish_upload ile silinir, reddedilen
+    veya başarısız olan istek aynı upload_id ile tekrar denenebilir.
+    """
+    upload_id = request.form.get('upload_id')
+    if upload_id:
+        try:
+            upload_path, filename = upload_store.get(upload_id)
+            with stage("upload"), open(upload_path, 'rb') as f:
+                return f.read(), filename, None
+        except UploadError as e:
+            logger.warning(f"{label} isteği: {e}")
+            return None, None, upload_error_response(e)
+        except FileNotFoundError:
+            # Aynı upload ile eşzamanlı bir istek bitip upload'ı silmiş olabilir
+            logger.warning(f"{label} isteği: Upload bulunamadı ({upload_id})")
+            return None, None, (jsonify({"error": "Upload bulunamadı"}), 404)
+    
+    if 'audio' not in request.files:
+        logger.warning(f"{label} isteği: Ses dosyası bulunamadı")
+        return None, None, (jsonify({"error": "Ses dosyası bulunamadı"}), 400)
+    
+    audio_file = request.files['audio']
+    if audio_file.filename == '':
+        logger.warning(f"{label} isteği: Dosya seçilmedi")
+        return None, None, (jsonify({"error": "Dosya seçilmedi"}), 400)
+    
+    return read_upload(audio_file), audio_file.filename, None
+
+def finish_upload(upload_id):
+    """Transkripsiyonu başarıyla biten isteğin parçalı upload'ını sil"""
+    if not upload_id:
+        return
+    try:
+        upload_store.delete(upload_id)
+    except UploadError:
+        # Aynı upload ile eşzamanlı bir istek silmiş olabilir
+        pass
+
+def read_upload(audio_file):
+    """Upload edilen dosyanın baytları.
+
+    MemoryRequest ile upload zaten bellektedir; BytesIO.getvalue() tamponu kopyalamadan döndürür.
+    """
+    if isinstance(audio_file.stream, io.BytesIO):
+        return audio_file.stream.getvalue()
+    return audio_file.read()
+
+def sse_event(event, data):
+    """Server-Sent Events formatında tek bir olay"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_transcription_events(audio_data, output_format, model_name=None, suffix='', language=None, profile=None,
+                                ticket=None, upload_id=None):
+    """Segmentleri decode edildikleri anda SSE olayı olarak gönder.
+
+    Her olaydaki 'chunk' alanları sırayla birleştirildiğinde tam altyazı dosyası oluşur.
+    Segmentler bellekte biriktirilmez. language='auto' ise dil decode öncesinde tüm sesten
+    tespit edilir (parça bazında dil değiştirme stream'de desteklenmez). Adaptive profilde
+    düşük güvenli segmentler tekrar decode edildikten sonra gönderilir; oran 'done' olayındadır.
+    Aynı ses için çalışan bir decode varsa (ör. job) onun sonucu gönderilir; stream'in kendi decode'u
+    segmentleri decode edildikçe gönderdiği için başka isteklerle paylaşılmaz.
+    ticket verilirse decode öncesinde zamanlayıcıda sıra beklenir; beklerken 'queued' olayı (sıra ve
+    tahmini başlama) gönderilir, öncelikli bir iş geldiğinde segmentler arasında duraklanabilir.
+    upload_id verilirse parçalı upload stream başarıyla bitince silinir.
+    """
+    with ExitStack() as inference:
+        try:
+            writer = subtitle_writer(output_format)
+            
+            model_name = model_name or WHISPER_MODEL
+            language = language or DEFAULT_LANGUAGE
+            profile = profile or DEFAULT_PROFILE
+            audio_hash = hash_bytes(audio_data) if transcript_cache or language == AUTO else None
+            cache_key = (transcript_cache_key(audio_data, model_name, language, audio_hash, profile)
+                         if transcript_cache else None)
+            cached = transcript_cache.get(cache_key) if cache_key else None
+            shared = None
+            if cached is None and coalescer:
+                # Aynı ses ve ayarlarla çalışan decode (ör. aynı dosyanın job'u) varsa sonucu beklenir
+                shared = coalescer.join(coalescing_key(audio_hash or hash_bytes(audio_data), model_name, language,
+                                                       profile))
+            detection = None
+            redecode = None
+            redecode_stats = {}
+            if cached is not None:
+                logger.info(f"Önbellekten alındı: {cache_key[:12]} ({len(cached)} segment)")
+                segments_iter = iter(cached)
+                if language == AUTO:
+                    detection = cached_language_detection(audio_hash, model_name)
+                    language = (detection or {}).get("language")
+                info = {"language": language, "duration": cached[-1]["end"] if cached else 0.0}
+            elif shared is not None:
+                shared_segments, shared_meta = shared
+                segments_iter = iter(shared_segments)
+                detection = shared_meta.get("language_detection")
+                redecode = shared_meta.get("redecode")
+                info = {"language": shared_meta.get("language"),
+                        "duration": shared_segments[-1]["end"] if shared_segments else 0.0}
+            elif CLUSTER_ROLE == 'frontend':
+                # Düğümler segment akıtmaz: olaylar iş bittikten sonra gönderilir
+                remote_segments, remote_meta = transcribe_remote(audio_data, suffix, model_name=model_name,
+                                                                 language=language, profile=profile, ticket=ticket)
+                segments_iter = iter(remote_segments)
+                detection = remote_meta.get("language_detection")
+                redecode = remote_meta.get("redecode")
+                info = {"language": remote_meta.get("language"),
+                        "duration": remote_segments[-1]["end"] if remote_segments else 0.0}
+            else:
+                # Decode süresince backlog'a sayılır (kabul kontrolü endpoint'te yapıldı)
+                inference.enter_context(admission.inference())
+                if ticket:
+                    # İstemci beklerken ayrılırsa (generator kapanır) bilet sıradan çıkarılır
+                    scheduler.submit(ticket)
+                    inference.callback(scheduler.release, ticket)
+                    while not scheduler.wait(ticket, SCHEDULER_REPORT_SECONDS):
+                        yield sse_event("queued", scheduler.queue_info(ticket))
+                    inference.enter_context(scheduler.running(ticket))
+                    record_stage("queue_wait", ticket.waited_seconds)
+                audio = decode_audio(audio_data, suffix)
+                if language == AUTO:
+                    detection = detect_audio_language(audio, model_name, audio_hash)
+                    language = detection["language"]
+                segments_iter, info = transcribe_profile_stream(audio, model_name, language, DECODE_PROFILES[profile],
+                                                                redecode_stats)
+            
+            yield sse_event("info", {
+                **info,
+                "language_detection": detection,
+                "model": model_name,
+                "profile": profile,
+                "format": output_format,
+                "filename": writer.filename,
+                "cache": "HIT" if cached is not None else "MISS",
+                "coalesced": shared is not None,
+                "transcript_key": cache_key,
+                "chunk": writer.header()
+            })
+            
+            # Önbelleğe yazmak için sadece hafif segment sözlükleri tutulur (ön yüzde düğüm yazar)
+            local = cached is None and shared is None and CLUSTER_ROLE != 'frontend'
+            decoded = [] if cache_key and local else None
+            count = 0
+            start_time = time.perf_counter()
+            for segment in segments_iter:
+                count += 1
+                segment_data = segment_to_dict(segment)
+                if decoded is not None:
+                    decoded.append(segment_data)
+                yield sse_event("segment", {"index": count, **segment_data, "chunk": writer.write(segment)})
+                if local and ticket:
+                    scheduler.preemption_point(segment_data["end"])
+            if local:
+                # Segmentler gönderilirken istemciyi bekleme süresi de dahildir
+                record_stage("model_decode", time.perf_counter() - start_time)
+                record_transcription(model_name, info["duration"], time.perf_counter() - start_time)
+            
+            if decoded is not None:
+                transcript_cache.put(cache_key, decoded, model=model_name)
+            if redecode_stats:
+                redecode = redecode_summary(redecode_stats, info["duration"])
+            
+            finish_upload(upload_id)
+            yield sse_event("done", {"segments": count, "redecode": redecode, "chunk": writer.footer()})
+            logger.info(f"Streaming transkripsiyon tamamlandı: {count} segment")
+        except Exception as e:
+            logger.error(f"Streaming transkripsiyon hatası: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            yield sse_event("error", {"error": f"Transkripsiyon hatası: {str(e)}"})
+
+@app.route('/transcribe/stream', methods=['POST'])
+def transcribe_audio_stream():
+    """Ses dosyasını transkribe et, segmentleri Server-Sent Events ile akıt"""
+    try:
+        profile = parse_profile(request.form.get('profile'), DECODE_PROFILES, DEFAULT_PROFILE)
+    except ValueError as e:
+        return jsonify({"error": str(e), "available_profiles": list(DECODE_PROFILES)}), 400
+    
+    model_name = resolve_model_name(request.form.get('model'), profile)
+    if not model_name:
+        logger.warning(f"Stream isteği: Bilinmeyen model: {request.form.get('model')}")
+        return jsonify({"error": "Bilinmeyen model", "available_models": model_registry.available()}), 400
+    
+    if not model_ready(model_name):
+        logger.error("Stream isteği reddedildi: Model yüklenemedi")
+        return jsonify({"error": "Whisper modeli yüklenemedi"}), 500
+    
+    try:
+        language, _ = parse_request_language(request.form)
+        parse_priority(request.form.get('priority'), None, INTERACTIVE_MAX_SECONDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Reddedilen istemci aynı upload ile tekrar dener (upload stream başarıyla bitince silinir)
+    try:
+        admission.check()
+    except Overloaded as e:
+        return overloaded_response(e)
+    
+    # Ses stream bitene kadar bellekte tutulur, diske yazılmaz
+    audio_data, audio_filename, error_response = request_audio("Stream")
+    if error_response:
+        return error_response
+    
+    output_format = request.form.get('format', 'srt')
+    logger.info(f"Streaming transcribe başlatılıyor: {audio_filename}, format: {output_format}, model: {model_name}, "
+                f"dil: {language}, profil: {profile}")
+    suffix = os.path.splitext(audio_filename)[1]
+    
+    return Response(
+        stream_transcription_events(audio_data, output_format, model_name, suffix, language, profile,
+                                    request_ticket(audio_data), request.form.get('upload_id')),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @app.route('/transcribe', methods=['POST'])
 def transcribe_audio():
     """Ses dosyasını transkribe et ve altyazı oluştur"""
-    if not model:
+    if request.accept_mimetypes.best == 'text/event-stream':
+        return transcribe_audio_stream()
+    
+    try:
+        profile = parse_profile(request.form.get('profile'), DECODE_PROFILES, DEFAULT_PROFILE)
+    except ValueError as e:
+        return jsonify({"error": str(e), "available_profiles": list(DECODE_PROFILES)}), 400
+    
+    model_name = resolve_model_name(request.form.get('model'), profile)
+    if not model_name:
+        logger.warning(f"Transcribe isteği: Bilinmeyen model: {request.form.get('model')}")
+        return jsonify({"error": "Bilinmeyen model", "available_models": model_registry.available()}), 400
+    
+    if not model_ready(model_name):
         logger.error("Transcribe isteği reddedildi: Model yüklenemedi")
         return jsonify({"error": "Whisper modeli yüklenemedi"}), 500
     
-    temp_audio_path = None
-    output_temp_path = None
+    try:
+        caption_style = parse_caption_style(request.form)
+        language, language_switching = parse_request_language(request.form)
+        parse_priority(request.form.get('priority'), None, INTERACTIVE_MAX_SECONDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
+    # Kabul kontrolü decode öncesinde tekrar yapılır; upload sadece transkripsiyon başarılı olunca silinir
     try:
-        if 'audio' not in request.files:
-            logger.warning("Transcribe isteği: Ses dosyası bulunamadı")
-            return jsonify({"error": "Ses dosyası bulunamadı"}), 400
-        
-        audio_file = request.files['audio']
-        output_format = request.form.get('format', 'srt')  # srt veya xml
-        
-        if audio_file.filename == '':
-            logger.warning("Transcribe isteği: Dosya seçilmedi")
-            return jsonify({"error": "Dosya seçilmedi"}), 400
-        
-        logger.info(f"Transcribe başlatılıyor: {audio_file.filename}, format: {output_format}")
-        
-        # Geçici dosya oluştur
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_audio_path = temp_file.name
+        admission.check()
+    except Overloaded as e:
+        return overloaded_response(e)
+    
+    try:
+        # Ses bellekte çözülür, diske geçici dosya yazılmaz
+        audio_data, audio_filename, error_response = request_audio("Transcribe")
+        if error_response:
+            return error_response
         
-        logger.info(f"Ses dosyası kaydedildi: {temp_audio_path}")
+        output_format = request.form.get('format', 'srt')  # srt, vtt, json veya xml
+        logger.info(f"Transcribe başlatılıyor: {audio_filename}, format: {output_format}, model: {model_name}, "
+                    f"dil: {language}{' (parça bazında)' if language_switching else ''}, profil: {profile}")
+        logger.info(f"Ses dosyası alındı: {len(audio_data)} bayt")
         
         # Whisper ile transkribe et
         logger.info("Transkripsiyon başlatılıyor...")
-        
-        if USE_FASTER_WHISPER:
-            segments, info = model.transcribe(
-                temp_audio_path,
-                language="tr",  # Türkçe
-                beam_size=5,
-                word_timestamps=True
-            )
-            # Generator'ı listeye çevir
-            segments = list(segments)
-            logger.info(f"Faster Whisper transkripsiyon tamamlandı: {len(segments)} segment")
-        else:
-            result = model.transcribe(temp_audio_path, language="tr")
-            segments = result["segments"]
-            logger.info(f"OpenAI Whisper transkripsiyon tamamlandı: {len(segments)} segment")
-        
-        # Format'a göre çıktı oluştur
-        if output_format.lower() == 'xml':
-            output_content = create_premiere_xml(segments)
-            filename = "subtitles.xml"
-            mimetype = "application/xml"
-        else:  # SRT format
-            output_content = create_srt_subtitles(segments)
-            filename = "subtitles.srt"
-            mimetype = "text/plain"
-        
-        # Geçici dosya oluştur
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=f'.{output_format}', encoding='utf-8') as output_file:
-            output_file.write(output_content)
-            output_temp_path = output_file.name
-        
-        logger.info(f"Altyazı dosyası oluşturuldu: {filename} ({len(output_content)} karakter)")
-        
-        return send_file(
-            output_temp_path,
-            as_attachment=True,
-            download_name=filename,
-            mimetype=mimetype
+        segments, meta = transcribe_cached(
+            audio_data,
+            parallel=parse_parallel_mode(request.form.get('parallel')),
+            sequence_id=request.form.get('sequence_id') or None,
+            model_name=model_name,
+            suffix=os.path.splitext(audio_filename)[1],
+            admit=True,
+            language=language,
+            language_switching=language_switching,
+            profile=profile,
+            ticket=request_ticket(audio_data)
         )
+        finish_upload(request.form.get('upload_id'))
+        
+        # Format'a göre çıktı parça parça oluşturulup gönderilir
+        return set_result_headers(subtitle_response(segments, output_format, caption_style), meta)
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    
+    except ClusterTimeout as e:
+        logger.error(f"Transkripsiyon zaman aşımı: {e}")
+        return jsonify({"error": str(e)}), 504
+    
+    except AudioDecodeError as e:
+        logger.warning(f"Ses dosyası çözülemedi: {e}")
+        return jsonify({"error": f"Ses dosyası çözülemedi: {str(e)}"}), 400
         
     except Exception as e:
         logger.error(f"Transkripsiyon hatası: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({"error": f"Transkripsiyon hatası: {str(e)}"}), 500
-        
-    finally:
-        # Geçici dosyaları temizle
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Parçalı upload başlat (filename, size alanları); parçalar PATCH ile gönderilir"""
+    data = request.get_json(silent=True) or request.form
+    filename = data.get('filename') or 'audio.wav'
+    size = data.get('size')
+    try:
+        upload = upload_store.create(filename, int(size) if size is not None else None)
+    except ValueError:
+        return jsonify({"error": "Geçersiz boyut"}), 400
+    except UploadError as e:
+        logger.warning(f"Upload isteği reddedildi: {e}")
+        return upload_error_response(e)
+    upload["chunk_bytes"] = UPLOAD_CHUNK_MB * 1024 * 1024
+    return jsonify(upload), 201
+
+@app.route('/uploads/<upload_id>', methods=['PATCH'])
+def append_upload(upload_id):
+    """Upload'a parça ekle: Upload-Offset header'ı parçanın başlangıç ofsetidir"""
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return jsonify({"error": "Upload-Offset header'ı gerekli"}), 400
+    try:
+        with stage("upload"):
+            data = request.get_data(cache=False)
+        new_offset = upload_store.append(upload_id, offset, data)
+    except UploadError as e:
+        return upload_error_response(e)
+    response = jsonify({"upload_id": upload_id, "offset": new_offset})
+    response.headers['Upload-Offset'] = str(new_offset)
+    return response
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Upload durumu: kesilen upload bu ofsetten devam ettirilir"""
+    try:
+        return jsonify(upload_store.status(upload_id))
+    except UploadError as e:
+        return upload_error_response(e)
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Yarım kalan upload'ı iptal et"""
+    try:
+        upload_store.delete(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({"deleted": upload_id})
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Ses dosyasını asenkron transkripsiyon kuyruğuna ekle"""
+    try:
+        profile = parse_profile(request.form.get('profile'), DECODE_PROFILES, DEFAULT_PROFILE)
+    except ValueError as e:
+        return jsonify({"error": str(e), "available_profiles": list(DECODE_PROFILES)}), 400
+    
+    model_name = resolve_model_name(request.form.get('model'), profile)
+    if not model_name:
+        logger.warning(f"Job isteği: Bilinmeyen model: {request.form.get('model')}")
+        return jsonify({"error": "Bilinmeyen model", "available_models": model_registry.available()}), 400
+    
+    if not model_ready(model_name):
+        logger.error("Job isteği reddedildi: Model yüklenemedi")
+        return jsonify({"error": "Whisper modeli yüklenemedi"}), 500
+    
+    output_format = request.form.get('format', 'srt')
+    try:
+        caption_style = parse_caption_style(request.form)
+        language, language_switching = parse_request_language(request.form)
+        parse_priority(request.form.get('priority'), None, INTERACTIVE_MAX_SECONDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Kuyruktaki job'lar backlog'a dahildir; eşik doluysa job oluşturulmaz
+    try:
+        admission.check()
+    except Overloaded as e:
+        return overloaded_response(e)
+    
+    # Ses dosyası worker işleyene kadar diskte kalır, worker siler
+    upload_id = request.form.get('upload_id')
+    if upload_id:
+        # Tamamlanmış parçalı upload zaten diskte, kopyalanmadan job'a verilir
         try:
-            if temp_audio_path and os.path.exists(temp_audio_path):
-                os.unlink(temp_audio_path)
-                logger.debug(f"Geçici ses dosyası silindi: {temp_audio_path}")
-            
-            if output_temp_path and os.path.exists(output_temp_path):
-                os.unlink(output_temp_path)
-                logger.debug(f"Geçici çıktı dosyası silindi: {output_temp_path}")
-        except Exception as cleanup_error:
-            logger.warning(f"Geçici dosya temizleme hatası: {cleanup_error}")
+            temp_audio_path, audio_filename = upload_store.take(upload_id)
+        except UploadError as e:
+            logger.warning(f"Job isteği: {e}")
+            return upload_error_response(e)
+    else:
+        if 'audio' not in request.files:
+            logger.warning("Job isteği: Ses dosyası bulunamadı")
+            return jsonify({"error": "Ses dosyası bulunamadı"}), 400
+        
+        audio_file = request.files['audio']
+        if audio_file.filename == '':
+            logger.warning("Job isteği: Dosya seçilmedi")
+            return jsonify({"error": "Dosya seçilmedi"}), 400
+        
+        audio_filename = audio_file.filename
+        suffix = os.path.splitext(audio_filename)[1] or '.wav'
+        with stage("temp_write"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            audio_file.save(temp_file.name)
+            temp_audio_path = temp_file.name
+    
+    # Sıralama için süre başlıktan okunur (WAV; diğer formatlar ffprobe ile, yoksa boyuttan tahmin)
+    duration = probe_duration(temp_audio_path) or os.path.getsize(temp_audio_path) / ESTIMATED_BYTES_PER_SECOND
+    ticket = Ticket(request_client(), parse_priority(request.form.get('priority'), duration, INTERACTIVE_MAX_SECONDS),
+                    duration)
+    try:
+        job = job_queue.submit(
+            audio_path=temp_audio_path,
+            format=output_format,
+            filename=audio_filename,
+            parallel=parse_parallel_mode(request.form.get('parallel')),
+            sequence_id=request.form.get('sequence_id') or None,
+            model=model_name,
+            caption_style=caption_style,
+            language=language,
+            language_switching=language_switching,
+            profile=profile,
+            **ticket_params(ticket)
+        )
+    except JobQueueFull as e:
+        # Kalıcı depo açıksa dosya depoya taşınmış ve depo tarafından silinmiş olabilir
+        if os.path.exists(temp_audio_path):
+            os.unlink(temp_audio_path)
+        return overloaded_response(Overloaded(str(e), admission.retry_after()))
+    
+    logger.info(f"Job oluşturuldu: {job.id}, {audio_filename}, format: {output_format}, model: {model_name}, "
+                f"profil: {profile}, öncelik: {ticket.priority} ({duration:.0f}s)")
+    return jsonify(job_status(job)), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job durumu ve ilerlemesi"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job bulunamadı"}), 404
+    return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Tamamlanan job'un altyazı çıktısı (format query parametresi ile değiştirilebilir)"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job bulunamadı"}), 404
+    
+    if job.status == "error":
+        return jsonify({"error": f"Transkripsiyon hatası: {job.error}"}), 500
+    
+    if job.status != "done":
+        return jsonify(job.to_dict()), 202
+    
+    output_format = request.args.get('format', job.params.get('format', 'srt'))
+    try:
+        # Query'deki stil alanları job gönderilirken verilen stili geçersiz kılar
+        caption_style = parse_caption_style(request.args) or job.params.get("caption_style")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Server-Timing: worker'daki aşamalar
+    timings = current_timings()
+    if timings is not None:
+        timings.update(job.meta.get("timings", {}))
+    
+    return set_result_headers(subtitle_response(job.segments, output_format, caption_style), job.meta)
+
+@app.route('/render', methods=['POST'])
+def render_cached():
+    """Önbellekteki segmentleri yeniden decode etmeden farklı format / altyazı stiliyle üret.
+
+    Anahtar X-Transcript-Key header'ı veya transcript_key alanı ile verilir
+    (/transcribe, /jobs ve /transcribe/stream yanıtlarındaki önbellek anahtarı).
+    """
+    values = request.get_json(silent=True) or request.values
+    transcript_key = request.headers.get('X-Transcript-Key') or values.get('transcript_key')
+    if not transcript_cache:
+        return jsonify({"error": "Önbellek devre dışı"}), 404
+    if not transcript_key or not is_cache_key(transcript_key):
+        return jsonify({"error": "Geçersiz transcript_key"}), 400
+    
+    try:
+        caption_style = parse_caption_style(values)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    with stage("cache_read"):
+        segments = transcript_cache.get(transcript_key)
+    if segments is None:
+        logger.info(f"Render isteği: önbellekte yok: {transcript_key[:12]}")
+        return jsonify({"error": "Transkripsiyon önbellekte bulunamadı"}), 404
+    
+    output_format = values.get('format', 'srt')
+    logger.info(f"Render: {transcript_key[:12]} ({len(segments)} segment), format: {output_format}, "
+                f"stil: {caption_style}")
+    response = subtitle_response(segments, output_format, caption_style)
+    response.headers['X-Transcript-Key'] = transcript_key
+    return response
+
+@app.route('/cache', methods=['DELETE'])
+def clear_cache():
+    """Transkripsiyon önbelleğini temizle (yönetim)"""
+    if ADMIN_TOKEN and request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+        logger.warning("Önbellek temizleme isteği reddedildi: geçersiz token")
+        return jsonify({"error": "Yetkisiz"}), 403
+    
+    if not transcript_cache:
+        return jsonify({"error": "Önbellek devre dışı"}), 404
+    
+    removed = transcript_cache.clear()
+    return jsonify({"removed": removed, "cache": transcript_cache.stats()})
 
 @app.route('/models', methods=['GET'])
 def get_available_models():
     """Kullanılabilir Whisper modellerini listele"""
     try:
-        models = ["tiny", "base", "small", "medium", "large"]
-        
         response_data = {
             "current_model": WHISPER_MODEL,
-            "available_models": models,
+            "available_models": model_registry.available(),
             "faster_whisper": USE_FASTER_WHISPER,
-            "model_loaded": model is not None,
+            "model_loaded": model_registry.entry(WHISPER_MODEL).state == "loaded",
+            "models": model_registry.status(),
+            "loaded_memory_mb": round(model_registry.loaded_mb(), 1),
+            "memory_budget_mb": MODEL_MEMORY_BUDGET_MB,
             "recommended_model": "base"
         }
         
@@ -328,7 +2022,7 @@ if __name__ == '__main__':
     logger.info(f"Debug: {debug}")
     logger.info(f"Whisper Model: {WHISPER_MODEL}")
     logger.info(f"Faster Whisper: {USE_FASTER_WHISPER}")
-    logger.info(f"Model Durumu: {'Yüklendi' if model else 'Hata'}")
+    logger.info(f"Model Durumu: {startup_status()} (hazır olunca /ready 200 döner)")
     logger.info("=" * 60)
     
     try:
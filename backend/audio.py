@@ -0,0 +1,336 @@
+"""
+Bellekten ses çözme (diske geçici dosya yazmadan).
+PCM WAV doğrudan upload tamponu üzerinden numpy ile okunur; diğer formatlar ffmpeg'e
+stdin üzerinden verilir. Çıktı her zaman 16 kHz mono float32 dizidir.
+Uzun kayıtlar için AudioFileReader dosyayı tamamını belleğe almadan sınırlı parçalar halinde çözer.
+"""
+
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# numpy ile doğrudan okunan ve ffmpeg gerektiren upload formatları
+NUMPY_FORMATS = ["wav"]
+FFMPEG_FORMATS = ["flac", "opus", "ogg", "mp3", "m4a", "aac", "mp4", "mov", "webm"]
+
+# AudioFileReader varsayılan parça uzunluğu (saniye) ve WAV başlığı için okunan en fazla bayt
+READ_CHUNK_SECONDS = 30.0
+WAV_HEADER_BYTES = 1024 * 1024
+
+# Tam sayı katı örnekleme hızlarında (32/48/96 kHz) kullanılan alçak geçiren filtre uzunluğu (katsayı başına)
+DECIMATION_TAPS_PER_FACTOR = 16
+
+
+class AudioDecodeError(Exception):
+    """Ses verisi çözülemediğinde fırlatılır"""
+
+
+def _wav_layout(view):
+    """RIFF/WAVE başlığı: (dtype, kanal sayısı, örnekleme hızı, data ofseti, data boyutu) veya None.
+
+    data boyutu başlıkta yazan değerdir; stream olarak yazılmış WAV'larda 0 veya 0xFFFFFFFF olabilir.
+    """
+    if len(view) < 12 or bytes(view[0:4]) != b'RIFF' or bytes(view[8:12]) != b'WAVE':
+        return None
+
+    fmt = None
+    position = 12
+    while position + 8 <= len(view):
+        chunk_id = bytes(view[position:position + 4])
+        chunk_size = struct.unpack_from('<I', view, position + 4)[0]
+        body = position + 8
+        if chunk_id == b'fmt ' and chunk_size >= 16:
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', view, body)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                audio_format = struct.unpack_from('<H', view, body + 24)[0]
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b'data':
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, bits = fmt
+            if (audio_format, bits) == (WAVE_FORMAT_PCM, 16):
+                dtype = np.dtype('<i2')
+            elif (audio_format, bits) == (WAVE_FORMAT_PCM, 32):
+                dtype = np.dtype('<i4')
+            elif (audio_format, bits) == (WAVE_FORMAT_IEEE_FLOAT, 32):
+                dtype = np.dtype('<f4')
+            else:
+                return None
+            return dtype, channels, sample_rate, body, chunk_size
+        # Chunk'lar çift bayt sınırına hizalıdır
+        position = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def parse_wav(data):
+    """PCM / float WAV başlığını oku.
+
+    Dönen değer (örnekler, kanal sayısı, örnekleme hızı); desteklenmeyen WAV veya başka
+    formatlar için None. Örnekler upload tamponunun kopyasız bir görünümüdür.
+    """
+    view = memoryview(data)
+    layout = _wav_layout(view)
+    if layout is None:
+        return None
+    dtype, channels, sample_rate, body, chunk_size = layout
+    available = len(view) - body
+    if chunk_size == 0 or chunk_size > available:
+        chunk_size = available
+    frame_bytes = dtype.itemsize * channels
+    count = (chunk_size // frame_bytes) * channels
+    samples = np.frombuffer(view, dtype=dtype, count=count, offset=body)
+    return samples, channels, sample_rate
+
+
+def _to_float_mono(samples, channels):
+    """Tam sayı veya float örnekleri [-1, 1] aralığında mono float32'ye çevir"""
+    if samples.dtype == np.int16:
+        scale = 1.0 / 32768.0
+    elif samples.dtype == np.int32:
+        scale = 1.0 / 2147483648.0
+    else:
+        scale = 1.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    else:
+        samples = samples.astype(np.float32)
+    if scale != 1.0:
+        samples *= scale
+    return samples
+
+
+def _decimate(audio, factor, block_size=65536):
+    """Tam sayı kat örnekleme düşürme: pencereli sinc alçak geçiren filtre, sadece çıktı örnekleri hesaplanır"""
+    taps = DECIMATION_TAPS_PER_FACTOR * factor + 1
+    n = np.arange(taps) - (taps - 1) / 2
+    cutoff = 0.45 / factor
+    kernel = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)).astype(np.float32)
+    kernel /= kernel.sum()
+
+    half = (taps - 1) // 2
+    padded = np.pad(audio, (half, half + factor))
+    output_length = (len(audio) + factor - 1) // factor
+    # Her çıktı örneği için filtre penceresi (kopyasız görünüm); bellek sınırlı kalsın diye bloklar halinde
+    windows = np.lib.stride_tricks.sliding_window_view(padded, taps)[::factor][:output_length]
+    output = np.empty(output_length, dtype=np.float32)
+    for start in range(0, output_length, block_size):
+        output[start:start + block_size] = windows[start:start + block_size] @ kernel
+    return output
+
+
+def decode_wav(data):
+    """PCM WAV'ı numpy ile çöz; ffmpeg gerektiren durumlarda None"""
+    parsed = parse_wav(data)
+    if parsed is None:
+        return None
+    samples, channels, sample_rate = parsed
+    if channels < 1 or sample_rate < SAMPLE_RATE or sample_rate % SAMPLE_RATE:
+        return None
+    audio = _to_float_mono(samples, channels)
+    if sample_rate != SAMPLE_RATE:
+        audio = _decimate(audio, sample_rate // SAMPLE_RATE)
+    return audio
+
+
+def _run_ffmpeg(input_arg, input_data=None):
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", input_arg,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "pipe:1"
+    ]
+    try:
+        return subprocess.run(command, input=input_data, capture_output=True)
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg bulunamadı")
+
+
+def decode_ffmpeg(data, suffix=''):
+    """Sesi ffmpeg stdin üzerinden 16 kHz mono float32'ye çöz"""
+    result = _run_ffmpeg("pipe:0", data)
+    if result.returncode != 0 or not result.stdout:
+        # MP4/MOV gibi bazı container'lar aranabilir (seekable) giriş ister
+        logger.warning(f"ffmpeg stdin çözme başarısız, geçici dosya ile tekrar deneniyor: "
+                       f"{result.stderr.decode('utf-8', 'replace').strip()[:200]}")
+        fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            result = _run_ffmpeg(temp_path)
+        finally:
+            os.unlink(temp_path)
+        if result.returncode != 0:
+            raise AudioDecodeError(result.stderr.decode('utf-8', 'replace').strip() or "ffmpeg hatası")
+
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def accepted_formats():
+    """Sunucunun çözebildiği upload formatları (ffmpeg kurulu değilse sadece WAV)"""
+    if shutil.which("ffmpeg"):
+        return NUMPY_FORMATS + FFMPEG_FORMATS
+    return list(NUMPY_FORMATS)
+
+
+def decode_audio_bytes(data, suffix=''):
+    """Bellekteki ses verisini 16 kHz mono float32 diziye çöz"""
+    audio = decode_wav(data)
+    if audio is not None:
+        return audio
+    return decode_ffmpeg(data, suffix)
+
+
+def wav_duration(data):
+    """Upload baytlarının WAV başlığından süresi (saniye); WAV değilse None"""
+    try:
+        layout = _wav_layout(memoryview(data)[:WAV_HEADER_BYTES])
+    except struct.error:
+        return None
+    if layout is None:
+        return None
+    dtype, channels, sample_rate, body, data_size = layout
+    available = len(data) - body
+    if data_size == 0 or data_size > available:
+        data_size = available
+    if channels < 1 or not sample_rate:
+        return None
+    return data_size / (dtype.itemsize * channels * sample_rate)
+
+
+def probe_duration(path):
+    """Dosyanın süresi (saniye) sesi çözmeden: WAV başlıktan, diğer formatlar ffprobe ile; okunamazsa None"""
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+    if not shutil.which("ffprobe"):
+        return None
+    command = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=60)
+        return float(result.stdout.strip())
+    except (ValueError, subprocess.SubprocessError, OSError):
+        return None
+
+
+class AudioFileReader:
+    """Diskteki ses dosyasını sınırlı bellekle 16 kHz mono float32 parçalar halinde çöz.
+
+    Desteklenen PCM / float WAV'lar (16 kHz katı örnekleme hızlarında) seek + read ile doğrudan
+    okunur; diğer formatlar ffmpeg'in stdout'undan akış olarak okunur. Bellek kullanımı parça
+    uzunluğuyla sınırlıdır, dosyanın süresine bağlı değildir. Dosya memory-map edilmez: okunan
+    sayfalar process'in RSS'ine sayılır ve uzun kayıtlarda bellek yine süreyle büyür.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._wav = self._wav_layout()
+        if self._wav is not None:
+            dtype, channels, sample_rate, _, frames = self._wav
+            self.duration = frames / sample_rate
+        else:
+            # ffprobe yoksa süre bilinmez (None); parçalar yine okunabilir
+            self.duration = probe_duration(path)
+
+    def _wav_layout(self):
+        """Doğrudan okunabilen WAV için (dtype, kanal, örnekleme hızı, data ofseti, kare sayısı), değilse None"""
+        with open(self.path, 'rb') as f:
+            header = f.read(WAV_HEADER_BYTES)
+            size = os.fstat(f.fileno()).st_size
+        try:
+            layout = _wav_layout(memoryview(header))
+        except struct.error:
+            return None
+        if layout is None:
+            return None
+        dtype, channels, sample_rate, body, data_size = layout
+        if channels < 1 or sample_rate < SAMPLE_RATE or sample_rate % SAMPLE_RATE:
+            return None
+        available = size - body
+        if data_size == 0 or data_size > available:
+            data_size = available
+        return dtype, channels, sample_rate, body, data_size // (dtype.itemsize * channels)
+
+    def chunks(self, start_seconds=0.0, chunk_seconds=READ_CHUNK_SECONDS):
+        """start_seconds'tan itibaren chunk_seconds uzunluğunda parçalar (son parça daha kısa olabilir)"""
+        if self._wav is not None:
+            return self._wav_chunks(start_seconds, chunk_seconds)
+        return self._ffmpeg_chunks(start_seconds, chunk_seconds)
+
+    def read(self, start_seconds, seconds):
+        """Tek bölge (dil tespiti pencereleri gibi kısa okumalar için)"""
+        chunks = self.chunks(start_seconds, seconds)
+        try:
+            return next(chunks, np.zeros(0, dtype=np.float32))
+        finally:
+            chunks.close()
+
+    def _wav_chunks(self, start_seconds, chunk_seconds):
+        dtype, channels, sample_rate, body, frames = self._wav
+        factor = sample_rate // SAMPLE_RATE
+        frame_bytes = dtype.itemsize * channels
+        # Örnekleme düşürmede parça sınırlarında filtre penceresi komşu örnekleri de görür:
+        # iki yandan filtre yarı uzunluğu kadar fazla okunur, çıktı tam dosyayı çözmekle aynıdır
+        margin = (DECIMATION_TAPS_PER_FACTOR // 2) * factor if factor > 1 else 0
+        step = max(1, int(chunk_seconds * SAMPLE_RATE)) * factor
+        with open(self.path, 'rb') as f:
+            for first in range(int(start_seconds * SAMPLE_RATE) * factor, frames, step):
+                last = min(first + step, frames)
+                lower = max(first - margin, 0)
+                upper = min(last + margin, frames)
+                f.seek(body + lower * frame_bytes)
+                raw = f.read((upper - lower) * frame_bytes)
+                samples = np.frombuffer(raw, dtype=dtype, count=(len(raw) // frame_bytes) * channels)
+                audio = _to_float_mono(samples, channels)
+                if factor > 1:
+                    skip = (first - lower) // factor
+                    audio = _decimate(audio, factor)[skip:skip + (last - first + factor - 1) // factor]
+                yield audio
+
+    def _ffmpeg_chunks(self, start_seconds, chunk_seconds):
+        command = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        if start_seconds:
+            command += ["-ss", f"{start_seconds:.3f}"]
+        command += ["-i", self.path, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        chunk_bytes = max(1, int(chunk_seconds * SAMPLE_RATE)) * 2
+        # stderr dosyaya: pipe dolarsa ffmpeg stdout yazarken bloklanır
+        with tempfile.TemporaryFile() as errors:
+            try:
+                process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=errors)
+            except FileNotFoundError:
+                raise AudioDecodeError("ffmpeg bulunamadı")
+            produced = False
+            try:
+                while True:
+                    data = process.stdout.read(chunk_bytes)
+                    if len(data) < 2:
+                        break
+                    produced = True
+                    yield np.frombuffer(data, dtype='<i2', count=len(data) // 2).astype(np.float32) / 32768.0
+            finally:
+                # Okuma yarıda bırakılırsa (generator kapatıldı) ffmpeg durdurulur
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait()
+            if process.returncode != 0 and not produced:
+                errors.seek(0)
+                raise AudioDecodeError(errors.read().decode('utf-8', 'replace').strip() or "ffmpeg hatası")
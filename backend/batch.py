@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Toplu (klasör / liste) transkripsiyon.
+
+    python batch.py /arsiv/bolumler --workers 2 --formats srt,xml
+    python batch.py liste.txt --output-dir /arsiv/altyazilar --profile final --report rapor.json
+
+Girdi bir klasör (alt klasörler dahil taranır) veya her satırında bir medya dosyası olan liste
+dosyasıdır (göreli yollar liste dosyasına göredir, '#' ile başlayan satırlar atlanır). Dosyalar
+HTTP sunucusuyla aynı transkripsiyon hattından (önbellek, profil, dil) geçer ve altyazılar her
+dosyanın yanına (veya --output-dir altına aynı klasör yapısıyla) yazılır.
+
+Dosyalar süresine göre en uzundan kısaya sıralanıp worker havuzuna verilir: en uzun işler başta
+başladığı için son biten worker'ın bekleme süresi (makespan) kısalır. Çıktıları zaten olan dosyalar
+atlanır; önbellekte olan dosyalar decode edilmeden yazılır. Sonunda toplam ses süresi, işlem süresi,
+throughput ve gerçek zaman oranı (RTF) raporlanır.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Toplu işte HTTP job kuyruğu ve kalıcı job deposu kullanılmaz; model ilk dosyada yüklenir
+os.environ["CLUSTER_ROLE"] = "standalone"
+os.environ["AUTOSTART_SERVICES"] = "false"
+os.environ.setdefault("JOB_STORE_ENABLED", "false")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Klasör taramasında alınan medya uzantıları (ffmpeg ile çözülür, WAV hariç)
+MEDIA_EXTENSIONS = {
+    ".wav", ".flac", ".opus", ".ogg", ".mp3", ".m4a", ".aac", ".mp4", ".mov", ".webm", ".mkv", ".mxf", ".avi"
+}
+# Süresi okunamayan dosyalar için boyuttan kaba tahmin (~128 kbps)
+ESTIMATED_BYTES_PER_SECOND = 16000
+
+
+def format_duration(seconds):
+    """Saniyeyi s:dd:ss olarak biçimlendir"""
+    minutes, seconds = divmod(int(round(seconds or 0)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def collect_media(source):
+    """Klasördeki medya dosyaları veya liste dosyasındaki yollar: (kök klasör, mutlak yollar)"""
+    if os.path.isdir(source):
+        paths = []
+        for directory, _, names in os.walk(source):
+            paths.extend(os.path.join(directory, name) for name in names
+                         if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS)
+        return source, sorted(paths)
+
+    base = os.path.dirname(source)
+    with open(source, encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    paths = [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith('#')]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else base
+    return root, paths
+
+
+def output_paths(path, root, output_dir, extensions):
+    """Medya dosyasının altyazı yolları (uzantı başına); output_dir verilirse klasör yapısı korunur"""
+    stem = os.path.splitext(path)[0]
+    if output_dir:
+        stem = os.path.join(output_dir, os.path.relpath(stem, root))
+    return [stem + extension for extension in extensions]
+
+
+def is_done(path, outputs):
+    """Tüm çıktılar var ve medya dosyasından yeniyse dosya atlanır"""
+    media_mtime = os.path.getmtime(path)
+    return all(os.path.exists(output) and os.path.getmtime(output) >= media_mtime for output in outputs)
+
+
+def write_subtitles(segments, output_format, path, caption_style=None):
+    """Altyazıyı geçici dosyaya yazıp yerine taşı (yarım kalan dosya tamamlanmış sayılmaz)"""
+    from segmentation import resegment
+    from subtitles import iter_document, subtitle_writer
+
+    if caption_style:
+        segments = resegment(segments, caption_style)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.part'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for chunk in iter_document(subtitle_writer(output_format), segments):
+            f.write(chunk)
+    os.replace(temp_path, path)
+
+
+def transcribe_item(app, item, args, caption_style):
+    """Tek dosyayı transkribe et ve altyazılarını yaz; sonuç sözlüğü döndür"""
+    started = time.perf_counter()
+    if app.LONGFORM_MIN_SECONDS and (item["duration"] or 0.0) >= app.LONGFORM_MIN_SECONDS:
+        # Uzun kayıt: dosya belleğe okunmadan pencere pencere işlenir
+        segments, meta = app.transcribe_long_file(
+            item["path"],
+            model_name=args.model_name,
+            language=args.language,
+            language_switching=args.language_switching,
+            profile=args.profile
+        )
+    else:
+        with open(item["path"], 'rb') as f:
+            audio_data = f.read()
+        segments, meta = app.transcribe_cached(
+            audio_data,
+            suffix=os.path.splitext(item["path"])[1],
+            parallel=args.parallel,
+            model_name=args.model_name,
+            language=args.language,
+            language_switching=args.language_switching,
+            profile=args.profile
+        )
+    for output_format, output in zip(args.formats, item["outputs"]):
+        write_subtitles(segments, output_format, output, caption_style)
+    seconds = time.perf_counter() - started
+    duration = item["duration"] or (segments[-1]["end"] if segments else 0.0)
+    return {
+        **item,
+        "status": "cached" if meta["cache_hit"] else "done",
+        "duration": round(duration, 2),
+        "seconds": round(seconds, 2),
+        "rtf": round(seconds / duration, 3) if duration else None,
+        "segments": len(segments),
+        "language": meta.get("language"),
+        "redecode": meta.get("redecode")
+    }
+
+
+def summarize(results, wall_seconds, args):
+    """Toplu iş özeti: dosya sayıları, ses / işlem süresi, throughput ve RTF"""
+    processed = [result for result in results if result["status"] in ("done", "cached")]
+    audio_seconds = sum(result["duration"] or 0.0 for result in processed)
+    return {
+        "files": len(results),
+        "transcribed": sum(1 for result in results if result["status"] == "done"),
+        "cached": sum(1 for result in results if result["status"] == "cached"),
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "workers": args.workers,
+        "model": args.model_name,
+        "profile": args.profile,
+        "audio_seconds": round(audio_seconds, 2),
+        "processing_seconds": round(sum(result["seconds"] or 0.0 for result in processed), 2),
+        # Son dosyanın bittiği an (worker'lar paralel çalıştığından işlem süresi toplamından kısadır)
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput": round(audio_seconds / wall_seconds, 2) if wall_seconds else None,
+        "rtf": round(wall_seconds / audio_seconds, 4) if audio_seconds else None
+    }
+
+
+def parse_style(values):
+    """--style anahtar=değer listesinden altyazı stili (segmentation.parse_caption_style)"""
+    from segmentation import _STYLE_FIELDS, parse_caption_style
+
+    fields = {}
+    for value in values or []:
+        name, _, field_value = value.partition('=')
+        name = name.strip()
+        # parse_caption_style bilinmeyen alanları yok sayar; yazım hatası sessizce stilsiz çıktı üretmesin
+        if name not in _STYLE_FIELDS:
+            raise ValueError(f"Bilinmeyen stil alanı: {name} (seçenekler: {', '.join(_STYLE_FIELDS)})")
+        fields[name] = field_value.strip()
+    return parse_caption_style(fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasör / liste dosyasındaki medyaları toplu transkribe et")
+    parser.add_argument("source", help="Medya klasörü veya her satırında bir dosya yolu olan liste dosyası")
+    parser.add_argument("--formats", default="srt,xml", help="Altyazı formatları, virgülle ayrılmış (srt, vtt, json, xml)")
+    parser.add_argument("--output-dir", help="Altyazılar bu klasöre yazılır (varsayılan: medya dosyasının yanı)")
+    parser.add_argument("--workers", type=int, default=2, help="Aynı anda işlenen dosya sayısı")
+    parser.add_argument("--model", help="Whisper modeli (varsayılan: profilin modeli / WHISPER_MODEL)")
+    parser.add_argument("--profile", help="Kalite / hız profili (draft, balanced, final, adaptive)")
+    parser.add_argument("--language", help="Dil kodu veya 'auto' (varsayılan: DEFAULT_LANGUAGE)")
+    parser.add_argument("--language-switching", action="store_true", help="'auto' ile dili parça bazında tespit et")
+    parser.add_argument("--parallel", choices=("auto", "true", "false"), default="auto",
+                        help="Uzun dosyalarda çok çekirdekli transkripsiyon (PARALLEL_WORKERS)")
+    parser.add_argument("--style", action="append", metavar="ALAN=DEĞER",
+                        help="Altyazı satır bölme ayarı, örn. --style max_chars_per_line=42 (tekrarlanabilir)")
+    parser.add_argument("--force", action="store_true", help="Çıktısı olan dosyaları da tekrar işle")
+    parser.add_argument("--report", help="JSON rapor dosyası (dosya başına sonuçlar ve özet)")
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.source)
+    output_dir = os.path.abspath(args.output_dir) if args.output_dir else None
+    report_path = os.path.abspath(args.report) if args.report else None
+    if not os.path.exists(source):
+        parser.error(f"Bulunamadı: {args.source}")
+    # Model eşzamanlı transcribe çağrısı sayısı (faster-whisper num_workers) worker sayısına eşit olsun
+    os.environ.setdefault("JOB_WORKERS", str(max(args.workers, 1)))
+
+    # Önbellek ve log dizinleri sunucuyla paylaşılır
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    import app
+    from audio import probe_duration
+    from language import parse_language
+    from profiles import parse_profile
+    from subtitles import subtitle_writer
+
+    try:
+        args.profile = parse_profile(args.profile, app.DECODE_PROFILES, app.DEFAULT_PROFILE)
+        args.language = parse_language(args.language, app.DEFAULT_LANGUAGE)
+        caption_style = parse_style(args.style)
+    except ValueError as e:
+        parser.error(str(e))
+    args.language_switching = args.language_switching and args.language == 'auto'
+    args.model_name = app.resolve_model_name(args.model, args.profile)
+    if not args.model_name:
+        parser.error(f"Bilinmeyen model: {args.model} (seçenekler: {', '.join(app.model_registry.available())})")
+    args.formats = [name.strip().lower() for name in args.formats.split(',') if name.strip()]
+    extensions = [os.path.splitext(subtitle_writer(name).filename)[1] for name in args.formats]
+
+    root, paths = collect_media(source)
+    items, results = [], []
+    for path in paths:
+        if not os.path.exists(path):
+            results.append({"path": path, "status": "error", "error": "Dosya bulunamadı", "duration": None,
+                            "seconds": None})
+            continue
+        outputs = output_paths(path, root, output_dir, extensions)
+        duration = probe_duration(path)
+        item = {"path": path, "outputs": outputs, "duration": duration}
+        if not args.force and is_done(path, outputs):
+            results.append({**item, "status": "skipped", "seconds": None})
+        else:
+            items.append(item)
+
+    # En uzun iş önce (LPT): süresi okunamayan dosyalar boyutlarından tahmin edilir
+    items.sort(key=lambda item: item["duration"] or os.path.getsize(item["path"]) / ESTIMATED_BYTES_PER_SECOND,
+               reverse=True)
+    total_audio = sum(item["duration"] or 0.0 for item in items)
+
+    print("=" * 60)
+    print("Adobe Premiere Pro AI Altyazı Eklentisi - Toplu Transkripsiyon")
+    print("=" * 60)
+    print(f"Kaynak: {source}")
+    print(f"Dosya: {len(paths)} ({len(items)} işlenecek, {len(paths) - len(items)} atlandı / bulunamadı)")
+    print(f"Toplam ses: {format_duration(total_audio)}")
+    print(f"Model: {args.model_name}, profil: {args.profile}, dil: {args.language}, worker: {args.workers}")
+    print(f"Formatlar: {', '.join(args.formats)}")
+    print("=" * 60)
+
+    if items:
+        try:
+            app.model_registry.load(args.model_name)
+        except app.ModelUnavailable as e:
+            print(f"Model yüklenemedi: {e}")
+            return 1
+
+    lock = threading.Lock()
+    completed = 0
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(args.workers, 1), thread_name_prefix="batch")
+    try:
+        futures = {executor.submit(transcribe_item, app, item, args, caption_style): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result = future.result()
+                line = (f"✓ {os.path.relpath(item['path'], root)} ({format_duration(result['duration'])} ses, "
+                        f"{result['seconds']}s, RTF {result['rtf']}{', önbellek' if result['status'] == 'cached' else ''})")
+            except Exception as e:
+                result = {**item, "status": "error", "error": str(e), "seconds": None}
+                line = f"✗ {os.path.relpath(item['path'], root)}: {e}"
+            with lock:
+                results.append(result)
+                completed += 1
+                print(f"[{completed}/{len(items)}] {line}", flush=True)
+    except KeyboardInterrupt:
+        print("\nDurduruluyor: başlamamış dosyalar iptal edildi, çalışanlar bitiriliyor...")
+        executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        executor.shutdown(wait=True)
+        if app.parallel_transcriber:
+            app.parallel_transcriber.shutdown()
+
+    summary = summarize(results, time.perf_counter() - started, args)
+    print("=" * 60)
+    print(f"Transkribe edilen: {summary['transcribed']}, önbellekten: {summary['cached']}, "
+          f"atlanan: {summary['skipped']}, hatalı: {summary['failed']}")
+    print(f"Ses: {format_duration(summary['audio_seconds'])}, süre: {format_duration(summary['wall_seconds'])}, "
+          f"throughput: {summary['throughput']}x gerçek zaman, RTF: {summary['rtf']}")
+    print("=" * 60)
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "files": results}, f, ensure_ascii=False, indent=2)
+        print(f"Rapor: {report_path}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
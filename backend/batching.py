@@ -0,0 +1,340 @@
+"""
+Eşzamanlı isteklerin mikro-batch'lenmesi.
+Kısa klipler en fazla 30 saniyelik pencerelere bölünür; farklı isteklerden gelen pencereler
+kısa bir süre (max_wait_ms) toplanıp encoder ve decoder'dan tek batch olarak geçirilir,
+segmentler geldikleri isteğe geri dağıtılır. Sadece Faster Whisper ile çalışır.
+
+Pencereler birbirinden bağımsız decode edilir (önceki pencerenin metni prompt olarak
+kullanılmaz). İlk geçişte eşikleri (sıkıştırma oranı, ortalama log olasılık) tutmayan
+pencereler tek başına, daha yüksek sıcaklıklarla tekrar decode edilir.
+"""
+
+import logging
+import math
+import queue
+import threading
+import time
+
+import numpy as np
+
+from parallel import SAMPLE_RATE, find_split_points, stitch_segments
+
+logger = logging.getLogger(__name__)
+
+# Pencere hedef uzunluğu ve sessizlik arama aralığı: 23 + 2 x 3 + 1 (sert kesim örtüşmesi) <= 30 saniye
+WINDOW_TARGET_SECONDS = 23.0
+WINDOW_SEARCH_SECONDS = 3.0
+MAX_WINDOW_SECONDS = 30.0
+
+# faster-whisper transcribe() varsayılanları
+PREPEND_PUNCTUATIONS = "\"'“¿([{-"
+APPEND_PUNCTUATIONS = "\"'.。,，!！?？:：”)]}、"
+FALLBACK_TEMPERATURES = [0.2, 0.4, 0.6, 0.8, 1.0]
+
+
+def build_transcription_options(tokenizer, beam_size=5, word_timestamps=False, temperature=None, **_):
+    """faster-whisper TranscriptionOptions (transcribe() varsayılanları, önceki metin koşulu kapalı).
+
+    temperature verilirse (profil) fallback sadece 0'dan büyük sıcaklıklarla yapılır; 0.0 fallback'i kapatır.
+    """
+    from faster_whisper.transcribe import TranscriptionOptions, get_suppressed_tokens
+
+    temperatures = FALLBACK_TEMPERATURES
+    if temperature is not None:
+        temperatures = [value for value in (temperature if isinstance(temperature, (list, tuple)) else [temperature])
+                        if value > 0]
+
+    return TranscriptionOptions(
+        beam_size=beam_size,
+        best_of=5,
+        patience=1.0,
+        length_penalty=1.0,
+        repetition_penalty=1.0,
+        no_repeat_ngram_size=0,
+        log_prob_threshold=-1.0,
+        no_speech_threshold=0.6,
+        compression_ratio_threshold=2.4,
+        condition_on_previous_text=False,
+        prompt_reset_on_temperature=0.5,
+        temperatures=temperatures,
+        initial_prompt=None,
+        prefix=None,
+        suppress_blank=True,
+        suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+        without_timestamps=False,
+        max_initial_timestamp=1.0,
+        word_timestamps=word_timestamps,
+        prepend_punctuations=PREPEND_PUNCTUATIONS,
+        append_punctuations=APPEND_PUNCTUATIONS,
+        max_new_tokens=None,
+        clip_timestamps="0",
+        hallucination_silence_threshold=None
+    )
+
+
+def split_tokens(tokens, timestamp_begin, duration, time_precision=0.02):
+    """Zaman damgası token'larına göre pencere içi segmentler: [{seek, start, end, tokens}, ...]"""
+    single_timestamp_ending = len(tokens) >= 2 and tokens[-2] < timestamp_begin <= tokens[-1]
+    consecutive = [
+        i for i in range(1, len(tokens))
+        if tokens[i] >= timestamp_begin and tokens[i - 1] >= timestamp_begin
+    ]
+
+    if not consecutive:
+        timestamps = [token for token in tokens if token >= timestamp_begin]
+        end = duration
+        if timestamps and timestamps[-1] != timestamp_begin:
+            end = (timestamps[-1] - timestamp_begin) * time_precision
+        return [dict(seek=0, start=0.0, end=end, tokens=tokens)]
+
+    slices = list(consecutive)
+    if single_timestamp_ending:
+        slices.append(len(tokens))
+
+    segments = []
+    last_slice = 0
+    for current_slice in slices:
+        sliced = tokens[last_slice:current_slice]
+        segments.append(dict(
+            seek=0,
+            start=(sliced[0] - timestamp_begin) * time_precision,
+            end=(sliced[-1] - timestamp_begin) * time_precision,
+            tokens=sliced
+        ))
+        last_slice = current_slice
+
+    # Kapanış zaman damgası olmayan son parça: seri decode'da bir sonraki pencerede tekrar
+    # işlenirdi, burada pencere sonuna kadar süren segment olarak tutulur
+    remaining = tokens[last_slice:]
+    if not single_timestamp_ending and any(token < timestamp_begin for token in remaining):
+        start = segments[-1]["end"]
+        if remaining[0] >= timestamp_begin:
+            start = (remaining[0] - timestamp_begin) * time_precision
+        segments.append(dict(seek=0, start=start, end=duration, tokens=remaining))
+    return segments
+
+
+class _Request:
+    """Bir transkripsiyon isteğinin pencere sonuçları"""
+
+    def __init__(self, window_count, duration, progress_callback):
+        self.results = [None] * window_count
+        self.remaining = window_count
+        self.duration = duration
+        self.progress_callback = progress_callback
+        self.processed_seconds = 0.0
+        self.segments_decoded = 0
+        self.error = None
+        self.done = threading.Event()
+
+
+class _Window:
+    __slots__ = ("request", "index", "audio", "offset")
+
+    def __init__(self, request, index, audio, offset):
+        self.request = request
+        self.index = index
+        self.audio = audio
+        self.offset = offset
+
+
+class MicroBatcher:
+    """Eşzamanlı isteklerin pencerelerini batch'leyen zamanlayıcı (model başına bir tane)"""
+
+    def __init__(self, registry, model_name, decode_options, max_batch_size=8, max_wait_ms=50):
+        self.registry = registry
+        self.model_name = model_name
+        self.decode_options = decode_options
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.windows = 0
+        self.fallback_windows = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name=f"batcher-{self.model_name}", daemon=True
+                )
+                self._thread.start()
+
+    def transcribe(self, audio, progress_callback=None):
+        """16 kHz mono float32 sesi batch kuyruğu üzerinden transkribe et (tamamlanana kadar bekler)"""
+        self._ensure_started()
+        duration = len(audio) / SAMPLE_RATE
+        window_count = 1 if duration <= MAX_WINDOW_SECONDS else math.ceil(duration / WINDOW_TARGET_SECONDS)
+        chunks = find_split_points(audio, window_count, max_search_seconds=WINDOW_SEARCH_SECONDS)
+
+        request = _Request(len(chunks), duration, progress_callback)
+        for index, (start, end) in enumerate(chunks):
+            self._queue.put(_Window(request, index, audio[start:end], start / SAMPLE_RATE))
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return stitch_segments(request.results)
+
+    def _collect_batch(self):
+        """İlk pencereyi bekle, ardından batch dolana veya max_wait_ms dolana kadar topla"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                results = self._run_batch(batch)
+            except Exception as e:
+                logger.error(f"Batch transkripsiyon hatası ({len(batch)} pencere): {e}")
+                for window in batch:
+                    window.request.error = e
+                    self._finish_window(window, [])
+                continue
+
+            with self._lock:
+                self.batches += 1
+                self.windows += len(batch)
+            for window, segments in zip(batch, results):
+                self._finish_window(window, segments)
+
+    def _finish_window(self, window, segments):
+        request = window.request
+        request.results[window.index] = segments
+        request.remaining -= 1
+        request.processed_seconds += len(window.audio) / SAMPLE_RATE
+        request.segments_decoded += len(segments)
+        if request.progress_callback and request.error is None:
+            request.progress_callback(request.segments_decoded,
+                                      min(request.processed_seconds, request.duration), request.duration)
+        if request.remaining == 0:
+            request.done.set()
+
+    def _run_batch(self, windows):
+        """Pencereleri tek encoder/decoder çağrısıyla işle, pencere başına segment listesi döndür"""
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_compression_ratio, get_ctranslate2_storage
+
+        with self.registry.acquire(self.model_name) as model:
+            tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task="transcribe",
+                language=self.decode_options.get("language")
+            )
+            options = build_transcription_options(tokenizer, **self.decode_options)
+            extractor = model.feature_extractor
+
+            # Her pencere 30 saniyeye sıfırla doldurulur; Whisper encoder sabit 3000 çerçeve bekler
+            features = np.stack([
+                extractor(window.audio)[:, :extractor.nb_max_frames] for window in windows
+            ]).astype(np.float32)
+            encoder_output = model.model.encode(get_ctranslate2_storage(features), to_cpu=False)
+
+            prompt = model.get_prompt(tokenizer, [], without_timestamps=False)
+            results = model.model.generate(
+                encoder_output,
+                [prompt] * len(windows),
+                beam_size=options.beam_size,
+                patience=options.patience,
+                length_penalty=options.length_penalty,
+                repetition_penalty=options.repetition_penalty,
+                no_repeat_ngram_size=options.no_repeat_ngram_size,
+                max_length=model.max_length,
+                return_scores=True,
+                return_no_speech_prob=True,
+                suppress_blank=options.suppress_blank,
+                suppress_tokens=options.suppress_tokens,
+                max_initial_timestamp_index=int(round(options.max_initial_timestamp / model.time_precision))
+            )
+
+            # Kelime zamanları ve tekrar decode için pencere başına encoder çıktısı
+            encoder_array = None
+            batch_segments = []
+            for index, (window, result) in enumerate(zip(windows, results)):
+                def window_encoder_output():
+                    nonlocal encoder_array
+                    if encoder_array is None:
+                        encoder_array = np.array(encoder_output)
+                    return get_ctranslate2_storage(np.ascontiguousarray(encoder_array[index:index + 1]))
+
+                tokens = result.sequences_ids[0]
+                avg_logprob = result.scores[0] * (len(tokens) ** options.length_penalty) / (len(tokens) + 1)
+                compression_ratio = get_compression_ratio(tokenizer.decode(tokens).strip())
+                no_speech = result.no_speech_prob > options.no_speech_threshold
+
+                needs_fallback = compression_ratio > options.compression_ratio_threshold or (
+                    avg_logprob < options.log_prob_threshold and not no_speech
+                )
+                if needs_fallback and options.temperatures:
+                    with self._lock:
+                        self.fallback_windows += 1
+                    result, avg_logprob, _, compression_ratio = model.generate_with_fallback(
+                        window_encoder_output(), prompt, tokenizer, options
+                    )
+                    tokens = result.sequences_ids[0]
+                    no_speech = result.no_speech_prob > options.no_speech_threshold
+
+                if no_speech and avg_logprob < options.log_prob_threshold:
+                    batch_segments.append([])
+                    continue
+
+                duration = len(window.audio) / SAMPLE_RATE
+                segments = split_tokens(tokens, tokenizer.timestamp_begin, duration, model.time_precision)
+                if options.word_timestamps:
+                    num_frames = min(extractor.nb_max_frames, len(window.audio) // extractor.hop_length)
+                    model.add_word_timestamps(
+                        segments, tokenizer, window_encoder_output(), num_frames,
+                        options.prepend_punctuations, options.append_punctuations,
+                        last_speech_timestamp=0.0
+                    )
+
+                window_segments = []
+                for segment in segments:
+                    text = tokenizer.decode(segment["tokens"])
+                    if segment["start"] == segment["end"] or not text.strip():
+                        continue
+                    window_segments.append({
+                        "start": segment["start"] + window.offset,
+                        "end": min(segment["end"], duration) + window.offset,
+                        "text": text.strip(),
+                        "avg_logprob": avg_logprob,
+                        "compression_ratio": compression_ratio,
+                        "no_speech_prob": result.no_speech_prob,
+                        "words": [
+                            {
+                                "start": word["start"] + window.offset,
+                                "end": word["end"] + window.offset,
+                                "word": word["word"],
+                                "probability": word["probability"]
+                            }
+                            for word in segment.get("words", [])
+                        ]
+                    })
+                batch_segments.append(window_segments)
+            return batch_segments
+
+    def stats(self):
+        """Batch istatistikleri"""
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "language": self.decode_options.get("language"),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self.batches,
+                "windows": self.windows,
+                "average_batch_size": round(self.windows / self.batches, 2) if self.batches else None,
+                "fallback_windows": self.fallback_windows,
+                "queued_windows": self._queue.qsize()
+            }
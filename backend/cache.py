@@ -0,0 +1,150 @@
+"""
+İçerik adresli transkripsiyon önbelleği.
+Anahtar: ses baytlarının hash'i + decode ayarları (model, dil, beam_size, word_timestamps).
+Diskte render edilmiş çıktı değil ham segment listesi saklanır; böylece aynı ses
+her formatta (SRT, XML, ...) milisaniyeler içinde tekrar üretilebilir.
+Toplam boyut sınırı aşıldığında en uzun süredir kullanılmayan kayıtlar silinir (LRU).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """Dosya içeriğinin SHA-256 hash'i (blok blok okunur)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_bytes(data):
+    """Bellekteki ses verisinin SHA-256 hash'i"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_cache_key(value):
+    """Değer make_cache_key çıktısı biçiminde mi (dosya yolu olarak güvenle kullanılabilir)"""
+    return isinstance(value, str) and len(value) == 64 and all(char in '0123456789abcdef' for char in value)
+
+
+def make_cache_key(audio_hash, options):
+    """Ses hash'i ve decode ayarlarından önbellek anahtarı üret"""
+    payload = json.dumps({"audio": audio_hash, **options}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TranscriptCache:
+    """Boyut sınırlı, disk tabanlı LRU segment önbelleği"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self):
+        """(yol, boyut, son erişim) listesi"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        """Önbellekteki segment listesini döndür, yoksa None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # LRU: son erişim zamanı olarak mtime güncellenir
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data["segments"]
+
+    def put(self, key, segments, **metadata):
+        """Segment listesini kaydet, gerekirse eski kayıtları sil"""
+        data = json.dumps({"segments": segments, "created_at": time.time(), **metadata}, ensure_ascii=False)
+        path = self._path(key)
+
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        size = os.path.getsize(temp_path)
+
+        with self._lock:
+            if os.path.exists(path):
+                self._total_bytes -= os.path.getsize(path)
+            os.replace(temp_path, path)
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Toplam boyut sınırın altına inene kadar en eski kayıtları sil (lock altında çağrılır)"""
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+            logger.debug(f"Önbellekten silindi: {path}")
+
+    def clear(self):
+        """Tüm kayıtları sil, silinen kayıt sayısını döndür"""
+        with self._lock:
+            removed = 0
+            for path, _, _ in self._entries():
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+            self._total_bytes = 0
+        logger.info(f"Önbellek temizlendi: {removed} kayıt")
+        return removed
+
+    def stats(self):
+        """Önbellek istatistikleri"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries()),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,431 @@
+"""
+Tek makinede yatay ölçekleme: API ön yüzü + inference worker düğümleri.
+Ortak durum paylaşılan dizindeki SQLite veritabanında tutulur (harici broker / bulut servisi yok):
+- workers: düğümler kendilerini kaydeder, yüklü modellerini ve boş kapasitelerini heartbeat ile bildirir
+- jobs: ön yüz job'u en uygun düğüme atar (model affinity, sonra en az yüklü), düğümler işleri çeker
+Ses dosyaları paylaşılan spool dizinine taşınır; sonuç segmentleri job satırına yazılır.
+Heartbeat'i kesilen düğümün çalışan işleri tekrar kuyruğa alınır.
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from jobs import Job, JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterTimeout(Exception):
+    """Senkron istekte job süresi içinde bir düğümde bitmediğinde fırlatılır (job hata olarak işaretlenir)"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    models TEXT NOT NULL DEFAULT '[]',
+    slots INTEGER NOT NULL DEFAULT 1,
+    running INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    heartbeat REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    model TEXT,
+    params TEXT NOT NULL,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    segments_decoded INTEGER NOT NULL DEFAULT 0,
+    audio_seconds_processed REAL NOT NULL DEFAULT 0,
+    audio_duration REAL,
+    segments TEXT,
+    meta TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+# İlerleme bilgisi veritabanına en fazla bu aralıkla yazılır (saniye)
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+def choose_worker(workers, model_name):
+    """Job'un atanacağı düğüm.
+
+    Modeli yüklü ve boş kapasitesi olan düğüm tercih edilir (model yükleme maliyeti ödenmez);
+    yoksa en fazla boş kapasitesi olan düğüm seçilir (modeli o yükler). Hiç düğüm yoksa None.
+    workers: {"id", "models", "free"} sözlükleri
+    """
+    if not workers:
+        return None
+    best = max(workers, key=lambda w: (model_name in w["models"] and w["free"] > 0, w["free"], model_name in w["models"]))
+    return best["id"]
+
+
+class ClusterStore:
+    """Paylaşılan SQLite veritabanı ve ses spool dizini"""
+
+    def __init__(self, directory, worker_timeout=15.0):
+        self.directory = directory
+        self.worker_timeout = worker_timeout
+        self.spool_dir = os.path.join(directory, 'audio')
+        self.path = os.path.join(directory, 'cluster.db')
+        os.makedirs(self.spool_dir, exist_ok=True)
+        conn = self.connect()
+        try:
+            # WAL: düğümler okurken ön yüz yazabilir (işlem dışında ayarlanır, dosyada kalıcıdır)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def connect(self):
+        """Yeni bağlantı (thread'ler arasında paylaşılmaz); işlemler BEGIN IMMEDIATE ile açılır"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    def alive_since(self):
+        return time.time() - self.worker_timeout
+
+    def spool(self, source_path, job_id):
+        """Ses dosyasını paylaşılan spool dizinine taşı, yeni yolu döndür"""
+        target = os.path.join(self.spool_dir, job_id + os.path.splitext(source_path)[1])
+        shutil.move(source_path, target)
+        return target
+
+    def requeue_orphans(self, conn):
+        """Heartbeat'i kesilen düğümlerin çalışan işlerini tekrar kuyruğa al"""
+        alive = "SELECT id FROM workers WHERE heartbeat >= ?"
+        cursor = conn.execute(
+            f"UPDATE jobs SET status = 'queued', worker_id = NULL, started_at = NULL "
+            f"WHERE status = 'running' AND worker_id NOT IN ({alive})", (self.alive_since(),)
+        )
+        if cursor.rowcount:
+            logger.warning(f"Düğümü kapanan {cursor.rowcount} job tekrar kuyruğa alındı")
+        # Uzun süredir heartbeat göndermeyen düğüm kayıtları silinir
+        conn.execute("DELETE FROM workers WHERE heartbeat < ?", (time.time() - 10 * self.worker_timeout,))
+
+    def workers(self, conn=None):
+        """Canlı düğümler: yüklü modeller, slot, çalışan ve kendisine atanmış bekleyen iş sayısı"""
+        own = conn is None
+        conn = conn or self.connect()
+        try:
+            rows = conn.execute(
+                "SELECT w.*, (SELECT COUNT(*) FROM jobs j WHERE j.worker_id = w.id AND j.status = 'queued') "
+                "AS queued FROM workers w WHERE heartbeat >= ? ORDER BY id", (self.alive_since(),)
+            ).fetchall()
+        finally:
+            if own:
+                conn.close()
+        return [{
+            "id": row["id"],
+            "host": row["host"],
+            "models": json.loads(row["models"]),
+            "slots": row["slots"],
+            "running": row["running"],
+            "queued": row["queued"],
+            "free": row["slots"] - row["running"] - row["queued"],
+            "heartbeat_age": round(time.time() - row["heartbeat"], 1)
+        } for row in rows]
+
+
+class _Connection:
+    """sqlite3 bağlantısı; with bloğu BEGIN IMMEDIATE ... COMMIT/ROLLBACK işlemi açar"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, *args):
+        return self._conn.execute(*args)
+
+    def executescript(self, script):
+        return self._conn.executescript(script)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._conn.close()
+
+
+def _job_from_row(row, with_result=True):
+    job = Job(json.loads(row["params"]))
+    job.id = row["id"]
+    job.status = row["status"]
+    job.created_at = row["created_at"]
+    job.started_at = row["started_at"]
+    job.finished_at = row["finished_at"]
+    job.segments_decoded = row["segments_decoded"]
+    job.audio_seconds_processed = row["audio_seconds_processed"]
+    job.audio_duration = row["audio_duration"]
+    job.error = row["error"]
+    job.meta = json.loads(row["meta"]) if row["meta"] else {}
+    job.meta["worker"] = row["worker_id"]
+    if with_result and row["segments"]:
+        job.segments = json.loads(row["segments"])
+    return job
+
+
+class ClusterJobQueue:
+    """Ön yüz tarafı: JobQueue ile aynı arayüz, işler düğümlerde çalışır"""
+
+    def __init__(self, store, max_queued=100, retention_seconds=3600):
+        self.store = store
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self.workers = 0
+
+    def start(self):
+        logger.info(f"Cluster job kuyruğu: {self.store.path}")
+
+    def submit(self, **params):
+        """İşi spool'a taşı, uygun düğüme ata ve kuyruğa ekle"""
+        self._purge_expired()
+        job_id = uuid.uuid4().hex
+        model_name = params.get("model")
+        with self.store.connect() as conn:
+            self.store.requeue_orphans(conn)
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"Kuyruk dolu ({self.max_queued} iş)")
+            worker_id = choose_worker(self.store.workers(conn), model_name)
+            params["audio_path"] = self.store.spool(params["audio_path"], job_id)
+            conn.execute(
+                "INSERT INTO jobs (id, status, model, params, worker_id, created_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, model_name, json.dumps(params), worker_id, time.time())
+            )
+        logger.info(f"Job kuyruğa eklendi: {job_id} (düğüm: {worker_id or 'herhangi'}, kuyrukta: {queued + 1})")
+        return self.get(job_id)
+
+    def get(self, job_id, with_result=True):
+        """ID ile job getir"""
+        conn = self.store.connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _job_from_row(row, with_result) if row else None
+
+    def wait(self, job_id, timeout=None, poll_seconds=0.2):
+        """Job bitene kadar en fazla timeout saniye bekle (senkron /transcribe isteklerinde).
+
+        Süre dolarsa job hata olarak işaretlenir (düğüm sonradan bitirse de sonucu yazılmaz) ve
+        ClusterTimeout fırlatılır.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id, with_result=False)
+            if job is None or job.status in ("done", "error"):
+                return self.get(job_id)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(poll_seconds)
+        error = f"Job {timeout:g}s içinde bitmedi (düğüm: {job.meta.get('worker') or 'yok'})"
+        with self.store.connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'error', error = ?, finished_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')", (error, time.time(), job_id)
+            )
+        if not cursor.rowcount:
+            # Son yoklamadan sonra bitti
+            return self.get(job_id)
+        logger.warning(f"Job zaman aşımına uğradı: {job_id}: {error}")
+        raise ClusterTimeout(error)
+
+    def stats(self):
+        """Kuyruk ve düğüm istatistikleri"""
+        conn = self.store.connect()
+        try:
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') GROUP BY status"
+            ).fetchall())
+            workers = self.store.workers(conn)
+        finally:
+            conn.close()
+        return {
+            "workers": sum(worker["slots"] for worker in workers),
+            "nodes": len(workers),
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "max_queued": self.max_queued
+        }
+
+    def drain(self, timeout):
+        # İşler düğümlerde çalışır; ön yüz kapanırken beklenecek yerel iş yoktur
+        return True
+
+    def _purge_expired(self):
+        """Saklama süresi dolan tamamlanmış işleri sil"""
+        with self.store.connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                         (time.time() - self.retention_seconds,))
+
+
+class ClusterJob(Job):
+    """Düğümde çalışan job: ilerleme aralıklarla veritabanına yazılır"""
+
+    def __init__(self, row, store):
+        super().__init__(json.loads(row["params"]))
+        self.id = row["id"]
+        self.status = "running"
+        self.created_at = row["created_at"]
+        self.started_at = time.time()
+        self._store = store
+        self._flushed_at = 0.0
+
+    def update_progress(self, segments_decoded, audio_seconds_processed, audio_duration=None):
+        super().update_progress(segments_decoded, audio_seconds_processed, audio_duration)
+        now = time.monotonic()
+        if now - self._flushed_at < PROGRESS_FLUSH_SECONDS:
+            return
+        self._flushed_at = now
+        with self._store.connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET segments_decoded = ?, audio_seconds_processed = ?, audio_duration = ? WHERE id = ?",
+                (self.segments_decoded, self.audio_seconds_processed, self.audio_duration, self.id)
+            )
+
+
+class ClusterWorker:
+    """Inference düğümü: kaydolur, heartbeat ile model / kapasite bildirir, kendisine atanan işleri çeker.
+
+    handler(job) segment listesini döndürür (tek makine modundaki job handler'ı ile aynı).
+    loaded_models() o an yüklü model adlarını döndürür.
+    Kapanan düğümlerin işleri hemen alınır. Canlı başka düğüme atanmış iş ancak steal_after_seconds'tan
+    uzun süredir bekliyorsa, atandığı düğümün boş slotu yoksa ve modeli bu düğümde yüklüyse alınır
+    (model affinity korunur, yanlış düğümde soğuk model yüklemesi yapılmaz).
+    """
+
+    def __init__(self, store, handler, loaded_models, slots=1, worker_id=None,
+                 heartbeat_seconds=2.0, poll_seconds=0.5, steal_after_seconds=30.0):
+        self.store = store
+        self.handler = handler
+        self.loaded_models = loaded_models
+        self.slots = slots
+        self.id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.steal_after_seconds = steal_after_seconds
+        self.running = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Düğümü kaydet, heartbeat ve slot thread'lerini başlat"""
+        self.heartbeat()
+        threads = [threading.Thread(target=self._heartbeat_loop, name="cluster-heartbeat", daemon=True)]
+        threads += [threading.Thread(target=self._slot_loop, name=f"cluster-slot-{i + 1}", daemon=True)
+                    for i in range(self.slots)]
+        for thread in threads:
+            thread.start()
+        self._threads = threads
+        logger.info(f"Düğüm kaydedildi: {self.id} ({self.slots} slot, {self.store.path})")
+
+    def heartbeat(self):
+        with self.store.connect() as conn:
+            conn.execute(
+                "INSERT INTO workers (id, host, models, slots, running, started_at, heartbeat) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "models = excluded.models, slots = excluded.slots, running = excluded.running, "
+                "heartbeat = excluded.heartbeat",
+                (self.id, socket.gethostname(), json.dumps(self.loaded_models()), self.slots,
+                 self.running, time.time(), time.time())
+            )
+            self.store.requeue_orphans(conn)
+
+    def stop(self, timeout):
+        """Yeni iş almayı durdur, çalışan işlerin bitmesini bekle, kaydı sil"""
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads[1:]:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        drained = self.running == 0
+        with self.store.connect() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (self.id,))
+        logger.info(f"Düğüm durdu: {self.id} ({'işler bitti' if drained else 'çalışan işler yarım kaldı'})")
+        return drained
+
+    def claim(self):
+        """Sıradaki uygun işi al: önce bu düğüme atananlar, sonra atanmamış / sahipsiz işler ve
+        dolu düğümlerde uzun bekleyen, modeli bu düğümde yüklü işler"""
+        now = time.time()
+        models = list(self.loaded_models())
+        with self.store.connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND (worker_id IS NULL OR worker_id = ? "
+                "OR worker_id NOT IN (SELECT id FROM workers WHERE heartbeat >= ?) "
+                f"OR (created_at < ? AND model IN ({', '.join('?' * len(models)) or 'NULL'}) "
+                "AND worker_id IN (SELECT id FROM workers WHERE running >= slots))) "
+                "ORDER BY worker_id IS ? DESC, created_at LIMIT 1",
+                (self.id, self.store.alive_since(), now - self.steal_after_seconds, *models, self.id)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', worker_id = ?, started_at = ? WHERE id = ?",
+                         (self.id, now, row["id"]))
+        return ClusterJob(row, self.store)
+
+    def _heartbeat_loop(self):
+        while not self._stopping.wait(self.heartbeat_seconds):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat yazılamadı: {e}")
+
+    def _slot_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.claim()
+            except sqlite3.Error as e:
+                logger.warning(f"İş alınamadı: {e}")
+                job = None
+            if job is None:
+                self._stopping.wait(self.poll_seconds)
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        with self._lock:
+            self.running += 1
+        logger.info(f"Job başlatıldı: {job.id} (düğüm: {self.id})")
+        segments, error = None, None
+        try:
+            segments = self.handler(job)
+            logger.info(f"Job tamamlandı: {job.id} ({len(segments)} segment, {time.time() - job.started_at:.1f}s)")
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Job hatası: {job.id}: {e}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+        finally:
+            with self._lock:
+                self.running -= 1
+        with self.store.connect() as conn:
+            # İş bu sırada başka düğüme verildiyse (heartbeat kesintisi) veya ön yüzde zaman aşımına
+            # uğradıysa sonuç yazılmaz
+            conn.execute(
+                "UPDATE jobs SET status = ?, segments = ?, meta = ?, error = ?, finished_at = ?, "
+                "segments_decoded = ?, audio_seconds_processed = ?, audio_duration = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                ("error" if error else "done", json.dumps(segments, ensure_ascii=False) if segments is not None else None,
+                 json.dumps(job.meta), error, time.time(), job.segments_decoded, job.audio_seconds_processed,
+                 job.audio_duration, job.id, self.id)
+            )
@@ -0,0 +1,120 @@
+"""
+Eşzamanlı aynı isteklerin birleştirilmesi (single-flight).
+Panel zaman aşımından sonra aynı sesi tekrar gönderdiğinde veya iki editör aynı sequence'i
+gönderdiğinde ikinci bir decode başlatılmaz: aynı anahtarlı (ses hash'i + decode ayarları) istek,
+çalışmakta olan decode'a bağlanır ve sonucu o decode bitince alır.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """Çalışmakta olan tek decode: sonucu, hatası ve bağlı isteklerin ilerleme callback'leri"""
+
+    def __init__(self, key):
+        self.key = key
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.callbacks = []
+        self.last_progress = None
+
+    def progress(self, *args):
+        """Decode'un ilerlemesini bağlı tüm isteklere ilet"""
+        self.last_progress = args
+        for callback in list(self.callbacks):
+            try:
+                callback(*args)
+            except Exception as e:
+                # Bağlı bir isteğin callback hatası decode'u durdurmaz
+                logger.warning(f"İlerleme callback hatası: {e}")
+
+
+class RequestCoalescer:
+    """Anahtar başına en fazla bir decode; aynı anahtarla gelen istekler sonucu bekler.
+
+    Lider decode hata verirse aynı hata bağlı isteklere de fırlatılır (bozuk dosya N kez decode edilmez).
+    Sadece retry_errors türündeki hatalar (ör. liderin kabul kontrolünde reddedilmesi: bağlı job'u
+    başarısız yapmamalı) devralınmaz; bağlı istekler o durumda kendileri tekrar dener.
+    """
+
+    def __init__(self, retry_errors=()):
+        self.retry_errors = tuple(retry_errors)
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn, progress_callback=None):
+        """fn(progress) sonucunu döndür: (sonuç, paylaşıldı mı).
+
+        Aynı anahtarlı decode çalışıyorsa fn çağrılmaz, o decode'un sonucu beklenir ve (sonuç, True)
+        döner. progress_callback decode'un ilerlemesini alır (bağlanan istek son durumu hemen alır).
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = Flight(key)
+                    self.leaders += 1
+                    leader = True
+                else:
+                    flight.followers += 1
+                    self.coalesced += 1
+                    leader = False
+                if progress_callback:
+                    flight.callbacks.append(progress_callback)
+            if leader:
+                return self._lead(flight, fn), False
+            logger.info(f"İstek çalışan decode'a bağlandı: {key[:12]} ({flight.followers} bağlı istek)")
+            if progress_callback and flight.last_progress:
+                progress_callback(*flight.last_progress)
+            flight.done.wait()
+            if flight.error is None:
+                return flight.result, True
+            if not isinstance(flight.error, self.retry_errors):
+                raise flight.error
+            logger.info(f"Bağlı olunan decode reddedildi, istek tekrar deneniyor: {key[:12]}")
+
+    def join(self, key):
+        """Çalışan decode varsa bitmesini bekleyip sonucunu döndür, yoksa None.
+
+        Decode başarısız olursa hatası fırlatılır; retry_errors türündeki hatada None döner (çağıran kendisi dener).
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                return None
+            flight.followers += 1
+            self.coalesced += 1
+        logger.info(f"İstek çalışan decode'a bağlandı: {key[:12]} ({flight.followers} bağlı istek)")
+        flight.done.wait()
+        if flight.error is not None and not isinstance(flight.error, self.retry_errors):
+            raise flight.error
+        return flight.result if flight.error is None else None
+
+    def _lead(self, flight, fn):
+        try:
+            flight.result = fn(flight.progress)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[flight.key]
+            flight.done.set()
+
+    def stats(self):
+        """Birleştirme istatistikleri (/health)"""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "waiting": sum(flight.followers for flight in self._flights.values()),
+                "decodes": self.leaders,
+                "coalesced": self.coalesced
+            }
@@ -0,0 +1,69 @@
+"""
+Production sunucu ayarları (gunicorn).
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Tek worker process + thread havuzu: Whisper modeli process başına bir kez yüklenir ve tüm
+istek / job thread'leri aynı modeli paylaşır. CTranslate2 hesaplama thread'lerini model
+yüklenirken başlattığından fork öncesi yüklenen model fork edilen process'te kullanılamaz; bu yüzden
+preload ile sadece kütüphaneler (numpy, faster-whisper, ...) ana process'te import edilir, model ve
+arka plan servisleri worker'da başlatılır. Worker yeniden başlatıldığında import maliyeti ödenmez.
+Job kuyruğu process belleğinde tutulduğu için worker sayısı 1'dir. CLUSTER_ROLE=frontend ile
+ön yüz model yüklemez, işler paylaşılan kuyruk üzerinden düğümlere (worker.py) gider; bu modda
+SERVER_WORKERS ile birden fazla worker process çalıştırılabilir.
+
+SIGTERM: yeni transkripsiyonlar 503 ile reddedilir, /ready 503 döner, süren istekler tamamlanır,
+ardından çalışan ve kuyruktaki job'lar DRAIN_TIMEOUT saniyeye kadar bitirilir.
+"""
+
+import os
+import signal
+
+# Servisler import sırasında değil, fork sonrası worker'da başlatılır
+os.environ["AUTOSTART_SERVICES"] = "false"
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+# Ön yüz durumsuzdur (kuyruk, upload ve önbellek paylaşılan dizinlerde); tek makine modunda 1
+workers = int(os.getenv('SERVER_WORKERS', 2)) if os.getenv('CLUSTER_ROLE') == 'frontend' else 1
+worker_class = "gthread"
+threads = int(os.getenv('SERVER_THREADS', 8))
+preload_app = True
+
+# gthread worker'ında uzun istekler heartbeat'i engellemez; timeout takılan worker içindir
+timeout = int(os.getenv('SERVER_TIMEOUT', 120))
+keepalive = 5
+# Ana process worker'ı bu süreden sonra öldürür: süren istekler + job drain süresini kapsamalı
+graceful_timeout = int(os.getenv('DRAIN_TIMEOUT', 300)) + 30
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv('LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    if os.getenv('USE_FASTER_WHISPER', 'true').lower() == 'true':
+        # Ağır import ana process'te bir kez yapılır, sayfaları worker ile paylaşılır (copy-on-write)
+        import faster_whisper  # noqa: F401
+
+
+def post_fork(server, worker):
+    from app import start_background_services
+    start_background_services()
+
+
+def post_worker_init(worker):
+    from app import begin_shutdown
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(signum, frame):
+        # Soket kapanmadan önce yeni transkripsiyonları reddetmeye başla
+        begin_shutdown()
+        handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+
+
+def worker_exit(server, worker):
+    # Worker process'inde, süren istekler bittikten sonra çağrılır: job kuyruğunu boşalt
+    from app import drain_and_stop
+    drain_and_stop()
@@ -0,0 +1,258 @@
+"""
+Düzenlenen sequence'lerin artımlı (incremental) transkripsiyonu.
+Ses kısa pencerelerde spektral parmak izlerine (Haitsma-Kalker tarzı 32 bit alt parmak izi)
+ayrılır, önceki export'un parmak izleriyle zaman kayması dahil eşleştirilir. Değişmeyen
+bölgelerin segmentleri kaydırılarak tekrar kullanılır, sadece değişen bölgeler transkribe edilir.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 4096
+HOP_SIZE = 800  # 50 ms: eşleşen bölgelerde en fazla 25 ms kayma hatası
+HOP_SECONDS = HOP_SIZE / SAMPLE_RATE
+BAND_EDGES_HZ = np.geomspace(300, 5000, 34)
+SILENCE_ENERGY = 1e-4
+
+# Eşleştirme ayarları
+MAX_CANDIDATE_OFFSETS = 8
+MIN_OFFSET_VOTES = 5
+BER_THRESHOLD = 0.3
+BER_SMOOTHING_FRAMES = 11
+MIN_RUN_FRAMES = 40  # 2 saniyeden kısa eşleşmeler güvenilmez sayılır
+REGION_PADDING_SECONDS = 0.5
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def compute_fingerprints(audio, block_frames=1024):
+    """16 kHz mono ses için (alt parmak izleri uint32, sessiz çerçeve maskesi) döndür"""
+    frame_count = max(0, 1 + (len(audio) - FRAME_SIZE) // HOP_SIZE)
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    freqs = np.fft.rfftfreq(FRAME_SIZE, 1.0 / SAMPLE_RATE)
+    band_index = np.digitize(freqs, BAND_EDGES_HZ) - 1
+    # FFT kutularını 33 logaritmik banda toplayan matris
+    band_matrix = np.zeros((len(freqs), 33), dtype=np.float32)
+    valid = (band_index >= 0) & (band_index < 33)
+    band_matrix[np.nonzero(valid)[0], band_index[valid]] = 1.0
+
+    energies = np.zeros((frame_count, 33), dtype=np.float32)
+    if frame_count:
+        frames_view = np.lib.stride_tricks.sliding_window_view(audio, FRAME_SIZE)[::HOP_SIZE]
+        # Bellek kullanımını sınırlamak için FFT bloklar halinde yapılır
+        for start in range(0, frame_count, block_frames):
+            block = frames_view[start:start + block_frames] * window
+            spectrum = np.abs(np.fft.rfft(block, axis=1)) ** 2
+            energies[start:start + len(block)] = spectrum @ band_matrix
+
+    silent = energies.sum(axis=1) < SILENCE_ENERGY
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    bits = np.zeros((frame_count, 32), dtype=bool)
+    bits[1:] = (band_diff[1:] - band_diff[:-1]) > 0
+    fingerprints = np.packbits(bits, axis=1, bitorder="little").view(np.uint32).ravel()
+    fingerprints[silent] = 0
+    return fingerprints, silent
+
+
+def _bit_error_rate(a, b):
+    """İki parmak izi dizisi arasında çerçeve başına bit hata oranı"""
+    xor = np.bitwise_xor(a, b).view(np.uint8).reshape(-1, 4)
+    return _POPCOUNT[xor].sum(axis=1) / 32.0
+
+
+def align(old_fp, new_fp, new_silent):
+    """Yeni çerçeveleri eski çerçevelere eşle.
+
+    Dönen dizi her yeni çerçeve için eski dizideki kaymayı (çerçeve cinsinden) verir;
+    eşleşmeyen çerçeveler için None.
+    """
+    # Kayma oylaması: kesirli çerçeve kaymalarında 32 bitin tamamı nadiren aynı kalır,
+    # bu yüzden 16 bitlik yarımlar ayrı ayrı eşleştirilir
+    index = {}
+    for position, value in enumerate(old_fp):
+        if value:
+            value = int(value)
+            index.setdefault(("lo", value & 0xFFFF), []).append(position)
+            index.setdefault(("hi", value >> 16), []).append(position)
+
+    votes = Counter()
+    for j, value in enumerate(new_fp):
+        if not value:
+            continue
+        value = int(value)
+        for key in (("lo", value & 0xFFFF), ("hi", value >> 16)):
+            for i in index.get(key, ())[:16]:
+                votes[i - j] += 1
+
+    # En çok oy alan kaymalar ve komşuları (kesirli kayma iki çerçeve arasında kalabilir)
+    offsets = set()
+    for offset, count in votes.most_common(MAX_CANDIDATE_OFFSETS):
+        if count >= MIN_OFFSET_VOTES:
+            offsets.update(range(offset - 1, offset + 2))
+
+    frame_count = len(new_fp)
+    kernel = np.ones(BER_SMOOTHING_FRAMES) / BER_SMOOTHING_FRAMES
+    ber_by_offset = {}
+    for offset in offsets:
+        j_start = max(0, -offset)
+        j_end = min(frame_count, len(old_fp) - offset)
+        if j_end <= j_start:
+            continue
+        ber = np.ones(frame_count)
+        ber[j_start:j_end] = _bit_error_rate(new_fp[j_start:j_end], old_fp[j_start + offset:j_end + offset])
+        ber_by_offset[offset] = np.convolve(ber, kernel, mode="same")
+
+    if ber_by_offset:
+        candidates = list(ber_by_offset)
+        ber_matrix = np.stack([ber_by_offset[offset] for offset in candidates])
+        best_index = ber_matrix.argmin(axis=0)
+        best_ber = ber_matrix.min(axis=0)
+    else:
+        best_ber = np.ones(frame_count)
+
+    matches = [None] * frame_count
+    previous = None
+    for j in range(frame_count):
+        # Histerezis: mevcut kayma eşik altında kaldıkça korunur, komşu kaymalar arasında
+        # gidip gelmek eşleşme dizilerini bölmez
+        if previous is not None and ber_by_offset[previous][j] < BER_THRESHOLD:
+            matches[j] = previous
+        elif best_ber[j] < BER_THRESHOLD:
+            previous = candidates[best_index[j]]
+            matches[j] = previous
+        elif new_silent[j] and previous is not None:
+            # Sessiz çerçeveler önceki eşleşmenin kaymasını devralır
+            matches[j] = previous
+
+    # Kısa eşleşme dizilerini değişmiş kabul et
+    j = 0
+    while j < frame_count:
+        if matches[j] is None:
+            j += 1
+            continue
+        run_start = j
+        while j < frame_count and matches[j] == matches[run_start]:
+            j += 1
+        if j - run_start < MIN_RUN_FRAMES:
+            for k in range(run_start, j):
+                matches[k] = None
+    return matches
+
+
+def plan_incremental(old_fp, old_segments, new_fp, new_silent, duration):
+    """Tekrar kullanılacak segmentleri ve tekrar transkribe edilecek bölgeleri belirle.
+
+    Dönen değer: (yeni zamanlara kaydırılmış segmentler, [(başlangıç, bitiş), ...] saniye)
+    """
+    matches = align(old_fp, new_fp, new_silent)
+
+    # Eşleşme dizileri: (yeni başlangıç, yeni bitiş, kayma saniye)
+    runs = []
+    j = 0
+    while j < len(matches):
+        if matches[j] is None:
+            j += 1
+            continue
+        run_start = j
+        while j < len(matches) and matches[j] == matches[run_start]:
+            j += 1
+        runs.append((run_start * HOP_SECONDS, (j - 1) * HOP_SECONDS + FRAME_SIZE / SAMPLE_RATE,
+                     float(matches[run_start] * HOP_SECONDS)))
+
+    reused = []
+    for segment in old_segments:
+        for run_start, run_end, shift in runs:
+            new_start = segment["start"] - shift
+            new_end = segment["end"] - shift
+            if new_start >= run_start and new_end <= run_end:
+                reused.append(shift_segment(segment, -shift))
+                break
+    reused.sort(key=lambda segment: segment["start"])
+
+    # Değişmiş çerçeveleri içeren, tekrar kullanılan segmentlerin kapsamadığı aralıklar
+    changed = np.array([match is None for match in matches], dtype=bool) & ~new_silent
+    changed_cumsum = np.concatenate([[0], np.cumsum(changed)])
+    gaps = []
+    cursor = 0.0
+    for segment in reused + [{"start": duration, "end": duration}]:
+        if segment["start"] > cursor:
+            gaps.append((cursor, segment["start"]))
+        cursor = max(cursor, segment["end"])
+
+    regions = []
+    for gap_start, gap_end in gaps:
+        first = max(0, int((gap_start - FRAME_SIZE / SAMPLE_RATE) / HOP_SECONDS))
+        last = min(len(changed), int(gap_end / HOP_SECONDS) + 1)
+        if last > first and changed_cumsum[last] - changed_cumsum[first] > 0:
+            regions.append((float(max(gap_start - REGION_PADDING_SECONDS, 0.0)),
+                            float(min(gap_end + REGION_PADDING_SECONDS, duration))))
+    return reused, regions
+
+
+def shift_segment(segment, shift):
+    """Segment ve kelime zamanlarını kaydır"""
+    shifted = dict(segment)
+    shifted["start"] = segment["start"] + shift
+    shifted["end"] = segment["end"] + shift
+    shifted["words"] = [
+        {**word, "start": word["start"] + shift, "end": word["end"] + shift}
+        for word in segment.get("words", [])
+    ]
+    return shifted
+
+
+def merge_region_segments(reused, region_results):
+    """Tekrar kullanılan segmentlerle yeni transkribe edilen bölgeleri zaman sırasıyla birleştir"""
+    merged = list(reused)
+    for (region_start, region_end), segments in region_results:
+        for segment in segments:
+            # Dolgu payı yüzünden komşu tekrar kullanılan segmentle çakışanlar atılır
+            if any(other["start"] < segment["end"] and segment["start"] < other["end"] for other in reused):
+                continue
+            merged.append(segment)
+    merged.sort(key=lambda segment: segment["start"])
+    return merged
+
+
+class SequenceStore:
+    """Sequence başına son export'un parmak izleri ve segmentleri"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _base(self, sequence_id):
+        name = hashlib.sha256(sequence_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def load(self, sequence_id):
+        """(parmak izleri, segmentler) veya None"""
+        base = self._base(sequence_id)
+        try:
+            fingerprints = np.load(base + ".npy")
+            with open(base + ".json", "r", encoding="utf-8") as f:
+                segments = json.load(f)["segments"]
+        except (FileNotFoundError, ValueError):
+            return None
+        return fingerprints, segments
+
+    def save(self, sequence_id, fingerprints, segments):
+        base = self._base(sequence_id)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, fingerprints)
+        os.replace(temp_path, base + ".npy")
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"sequence_id": sequence_id, "segments": segments}, f, ensure_ascii=False)
+        os.replace(temp_path, base + ".json")
@@ -0,0 +1,262 @@
+"""
+Asenkron transkripsiyon iş kuyruğu.
+İstekler kuyruğa alınır, sınırlı sayıda worker thread yüklü model üzerinde işleri sırayla işler.
+rank verilirse kuyruk FIFO değil öncelik sırasıyla boşaltılır (bkz. scheduler). Kalıcı depo
+(jobstore.JobStore) verilirse job'lar diske yazılır ve yeniden başlatmada yarım kalanlar tekrar kuyruğa alınır.
+"""
+
+import logging
+import queue
+import threading
+import time
+import traceback
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Kuyruk kapasitesi dolduğunda fırlatılır"""
+
+
+class ScheduledQueue(queue.Queue):
+    """Öncelik sıralı kuyruk: get() rank(item) değeri en küçük işi döndürür.
+
+    Sıralama (istemci başına hizmet gibi) zamanla değiştiği için her get()'te yeniden hesaplanır.
+    ready(item) False iken iş verilmez (ör. zamanlayıcıda boş slot yok ve iş kimseyi kesemiyor);
+    koşul dışarıdan değiştiği için POLL_SECONDS aralıkla tekrar bakılır.
+    """
+
+    POLL_SECONDS = 0.5
+
+    def __init__(self, maxsize, rank, ready=None):
+        self.rank = rank
+        self.ready = ready or (lambda item: True)
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = []
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        self.queue.append(item)
+
+    def _get(self):
+        item = min(self.queue, key=self.rank)
+        self.queue.remove(item)
+        return item
+
+    def get(self, block=True, timeout=None):
+        """Sıradaki hazır işi bekle ve döndür (worker'lar sadece bloklayan get() kullanır)"""
+        with self.not_empty:
+            while not (self._qsize() and self.ready(min(self.queue, key=self.rank))):
+                self.not_empty.wait(self.POLL_SECONDS)
+            item = self._get()
+            self.not_full.notify()
+            return item
+
+
+class Job:
+    """Tek bir transkripsiyon işinin durumu ve ilerlemesi"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.segments = None
+        self.segments_decoded = 0
+        self.audio_seconds_processed = 0.0
+        self.audio_duration = None
+        self.error = None
+        # Önbellek / artımlı transkripsiyon bilgisi (handler doldurur)
+        self.meta = {}
+
+    def update_progress(self, segments_decoded, audio_seconds_processed, audio_duration=None):
+        """Worker tarafından decode ilerledikçe çağrılır"""
+        self.segments_decoded = segments_decoded
+        self.audio_seconds_processed = audio_seconds_processed
+        if audio_duration:
+            self.audio_duration = audio_duration
+
+    def eta_seconds(self):
+        """İşlenen ses süresine göre kalan süre tahmini"""
+        if self.status != "running" or not self.audio_duration or not self.audio_seconds_processed:
+            return None
+        elapsed = time.time() - self.started_at
+        remaining_audio = max(self.audio_duration - self.audio_seconds_processed, 0.0)
+        return round(elapsed / self.audio_seconds_processed * remaining_audio, 1)
+
+    def to_dict(self):
+        """Job durumunu JSON'a uygun sözlük olarak döndür"""
+        progress = None
+        if self.status == "done":
+            progress = 100.0
+        elif self.audio_duration:
+            progress = round(min(self.audio_seconds_processed / self.audio_duration, 1.0) * 100, 1)
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "format": self.params.get("format"),
+            "filename": self.params.get("filename"),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "segments_decoded": self.segments_decoded,
+            "audio_seconds_processed": round(self.audio_seconds_processed, 2),
+            "audio_duration": self.audio_duration,
+            "progress": progress,
+            "eta_seconds": self.eta_seconds(),
+            "error": self.error,
+            **self.meta
+        }
+
+
+class JobQueue:
+    """Sınırlı kapasiteli kuyruk ve sabit sayıda worker thread.
+
+    rank(job) / ready(job) verilirse işler ScheduledQueue ile öncelik sırasıyla alınır.
+    """
+
+    def __init__(self, handler, workers=1, max_queued=100, retention_seconds=3600, store=None, rank=None, ready=None):
+        self.handler = handler
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.store = store
+        if rank:
+            self._queue = ScheduledQueue(max_queued, rank, ready)
+        else:
+            self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Worker thread'lerini başlat"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job kuyruğu başlatıldı: {self.workers} worker")
+        if self.store:
+            self._purge_expired()
+            recovered = self.store.recover()
+            if recovered:
+                # Kuyruk kapasitesinden fazla job kurtarılabilir; başlatmayı bekletmeden sıraya alınır
+                threading.Thread(target=self._requeue, args=(recovered,), name="job-recovery", daemon=True).start()
+
+    def _requeue(self, jobs):
+        for job in jobs:
+            with self._lock:
+                self._jobs[job.id] = job
+            self._queue.put(job)
+        logger.info(f"Yarım kalan {len(jobs)} job tekrar kuyruğa alındı")
+
+    def submit(self, **params):
+        """Yeni iş oluştur ve kuyruğa ekle"""
+        self._purge_expired()
+        job = Job(params)
+        if self.store:
+            if self._queue.full():
+                raise JobQueueFull(f"Kuyruk dolu ({self._queue.maxsize} iş)")
+            # Ses dosyası job bitene kadar depoda kalır, process yeniden başlasa da silinmez
+            params["audio_path"] = self.store.store_audio(params["audio_path"], job.id)
+            self.store.add(job)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            if self.store:
+                self.store.delete(job.id)
+            raise JobQueueFull(f"Kuyruk dolu ({self._queue.maxsize} iş)")
+
+        with self._lock:
+            self._jobs[job.id] = job
+        logger.info(f"Job kuyruğa eklendi: {job.id} (kuyrukta: {self._queue.qsize()})")
+        return job
+
+    def get(self, job_id):
+        """ID ile job getir (bellekte yoksa kalıcı depodan)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store:
+            job = self.store.get(job_id)
+        return job
+
+    def queued(self):
+        """Kuyrukta bekleyen (henüz worker'a verilmemiş) job'lar"""
+        with self._queue.mutex:
+            return list(self._queue.queue)
+
+    def stats(self):
+        """Kuyruk istatistikleri"""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": running,
+            "max_queued": self._queue.maxsize
+        }
+
+    def drain(self, timeout):
+        """Kuyruktaki ve çalışan işlerin bitmesini en fazla timeout saniye bekle.
+
+        Tüm işler bittiyse True döner. Yeni iş kabulünü durdurmak çağıranın sorumluluğundadır.
+        """
+        deadline = time.monotonic() + timeout
+        # Queue.join() ile aynı koşul (task_done çağrılmamış iş kalmadı), süre sınırlı
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Job kuyruğu boşaltılamadı: {self._queue.unfinished_tasks} iş bitmedi")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            logger.info(f"Job başlatıldı: {job.id}")
+            self._persist(job)
+            try:
+                job.segments = self.handler(job)
+                job.status = "done"
+                logger.info(f"Job tamamlandı: {job.id} ({len(job.segments)} segment, "
+                            f"{time.time() - job.started_at:.1f}s)")
+            except Exception as e:
+                job.status = "error"
+                job.error = str(e)
+                logger.error(f"Job hatası: {job.id}: {e}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+            finally:
+                job.finished_at = time.time()
+                self._persist(job)
+                self._queue.task_done()
+
+    def _persist(self, job):
+        if not self.store:
+            return
+        try:
+            self.store.update(job)
+        except Exception as e:
+            # Depo hatası job'u durdurmaz; sadece yeniden başlatmada kurtarılamaz
+            logger.error(f"Job kaydedilemedi: {job.id}: {e}")
+
+    def _purge_expired(self):
+        """Saklama süresi dolan tamamlanmış işleri bellekten sil"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if self.store:
+            self.store.purge_expired(self.retention_seconds)
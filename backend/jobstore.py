@@ -0,0 +1,242 @@
+"""
+Kalıcı job deposu (SQLite).
+Job'ların ses dosyası, ayarları, durumu ve sonuçları diske yazılır; decode edilen segmentler
+parça parça (checkpoint) kaydedilir. Process beklenmedik şekilde kapanırsa yeniden başlatmada
+yarım kalan job'lar tekrar kuyruğa alınır ve son tamamlanan parçadan devam eder.
+Biten job'ların sonuçları saklama süresi boyunca tutulur, sonra ses ve parçalarla birlikte silinir.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+
+from incremental import shift_segment
+from jobs import Job
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    segments_decoded INTEGER NOT NULL DEFAULT 0,
+    audio_seconds_processed REAL NOT NULL DEFAULT 0,
+    audio_duration REAL,
+    segments TEXT,
+    meta TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    segments TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    """Job kayıtları, job ses dosyaları ve decode checkpoint'leri"""
+
+    def __init__(self, directory, max_attempts=3):
+        self.directory = directory
+        self.max_attempts = max_attempts
+        self.audio_dir = os.path.join(directory, 'audio')
+        self.path = os.path.join(directory, 'jobs.db')
+        os.makedirs(self.audio_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            # WAL: checkpoint yazılırken durum sorguları beklemez
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Her işlem kendi bağlantısını açar (worker ve istek thread'leri arasında paylaşılmaz)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def store_audio(self, source_path, job_id):
+        """Ses dosyasını depo dizinine taşı (process kapanınca silinmez), yeni yolu döndür"""
+        target = os.path.join(self.audio_dir, job_id + os.path.splitext(source_path)[1])
+        shutil.move(source_path, target)
+        return target
+
+    def add(self, job):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at) VALUES (?, ?, ?, ?)",
+                (job.id, job.status, json.dumps(job.params), job.created_at)
+            )
+
+    def update(self, job):
+        """Durum, ilerleme ve (bittiyse) sonucu yaz; biten job'un checkpoint'leri silinir"""
+        finished = job.status in ("done", "error")
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, finished_at = ?, segments_decoded = ?, "
+                "audio_seconds_processed = ?, audio_duration = ?, segments = ?, meta = ?, error = ? WHERE id = ?",
+                (job.status, job.started_at, job.finished_at, job.segments_decoded, job.audio_seconds_processed,
+                 job.audio_duration,
+                 json.dumps(job.segments, ensure_ascii=False) if job.segments is not None else None,
+                 json.dumps(job.meta), job.error, job.id)
+            )
+            if finished:
+                conn.execute("DELETE FROM chunks WHERE job_id = ?", (job.id,))
+
+    def delete(self, job_id):
+        """Job kaydını, checkpoint'lerini ve ses dosyasını sil"""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+        if row:
+            _remove(json.loads(row["params"]).get("audio_path"))
+
+    def get(self, job_id):
+        """Depodaki job (bellekte olmayan, ör. yeniden başlatma öncesi bitmiş) veya None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_from_row(row) if row else None
+
+    def recover(self):
+        """Yarım kalan job'lar: kuyruktakiler aynen, çalışanlar bir deneme artırılarak geri döner.
+
+        max_attempts kez yarıda kalan (ör. her seferinde process'i çökerten) veya ses dosyası
+        kaybolan job'lar hata olarak işaretlenir.
+        """
+        recovered = []
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET status = 'queued', attempts = attempts + 1 WHERE status = 'running'")
+            rows = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+            for row in rows:
+                job = _job_from_row(row)
+                if row["attempts"] >= self.max_attempts:
+                    job.error = f"Job {row['attempts']} kez yarıda kaldı, tekrar denenmedi"
+                elif not os.path.exists(job.params.get("audio_path") or ""):
+                    job.error = "Job ses dosyası bulunamadı"
+                else:
+                    recovered.append(job)
+                    continue
+                conn.execute("UPDATE jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                             (job.error, time.time(), job.id))
+                conn.execute("DELETE FROM chunks WHERE job_id = ?", (job.id,))
+                logger.warning(f"Job kurtarılamadı: {job.id}: {job.error}")
+        return recovered
+
+    def checkpoint(self, job_id, chunk_seconds=60.0):
+        """Job'un kayıtlı parçalarını yükle ve yeni segmentleri parça parça kaydeden Checkpoint döndür"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT segments FROM chunks WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+        segments = [segment for row in rows for segment in json.loads(row["segments"])]
+        return Checkpoint(self, job_id, segments, len(rows), chunk_seconds)
+
+    def save_chunk(self, job_id, index, segments):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunks (job_id, idx, saved_at, segments) VALUES (?, ?, ?, ?)",
+                (job_id, index, time.time(), json.dumps(segments, ensure_ascii=False))
+            )
+
+    def clear_chunks(self, job_id):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM chunks WHERE job_id = ?", (job_id,))
+
+    def purge_expired(self, retention_seconds):
+        """Saklama süresi dolan sonuçları, sahipsiz checkpoint'leri ve ses dosyalarını sil"""
+        cutoff = time.time() - retention_seconds
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,))
+            # Depoda kaydı olmayan job'ların (ör. cluster düğümü) eski checkpoint'leri
+            conn.execute("DELETE FROM chunks WHERE job_id IN (SELECT job_id FROM chunks GROUP BY job_id "
+                         "HAVING MAX(saved_at) < ?) AND job_id NOT IN "
+                         "(SELECT id FROM jobs WHERE status IN ('queued', 'running'))", (cutoff,))
+            pending = {row["id"] for row in conn.execute("SELECT id FROM jobs WHERE status IN ('queued', 'running')")}
+        # Ses dosyaları job bitince silinir; kalanlar yarıda kesilmiş silme veya kayıtsız dosyalardır
+        for name in os.listdir(self.audio_dir):
+            path = os.path.join(self.audio_dir, name)
+            if os.path.splitext(name)[0] not in pending and os.path.getmtime(path) < cutoff:
+                _remove(path)
+
+
+class Checkpoint:
+    """Decode edilen segmentleri parça parça kalıcı olarak kaydeder.
+
+    segments: önceki çalışmalarda kaydedilmiş segmentler (global zamanlı).
+    resume_at: kayıtlı son segmentin sonu; decode bu noktadan devam eder ve yeni
+    segmentlerin zamanları bu kadar kaydırılır.
+    """
+
+    def __init__(self, store, job_id, segments, chunk_count, chunk_seconds):
+        self.store = store
+        self.job_id = job_id
+        self.segments = segments
+        self.resume_at = segments[-1]["end"] if segments else 0.0
+        self.chunk_seconds = chunk_seconds
+        self._index = chunk_count
+        self._pending = []
+        self._flushed_until = self.resume_at
+
+    def add(self, segment):
+        """Yeni decode edilen segment (resume_at'e göre göreli zamanlı)"""
+        self._pending.append(shift_segment(segment, self.resume_at) if self.resume_at else segment)
+        if self._pending[-1]["end"] - self._flushed_until >= self.chunk_seconds:
+            self.flush()
+
+    def flush(self):
+        """Bekleyen segmentleri yeni parça olarak kaydet"""
+        if not self._pending:
+            return
+        self.store.save_chunk(self.job_id, self._index, self._pending)
+        self._index += 1
+        self._flushed_until = self._pending[-1]["end"]
+        self._pending = []
+
+    def progress(self, callback, duration):
+        """Kalan ses için raporlanan ilerlemeyi tüm sese göre çeviren callback"""
+        if not callback:
+            return None
+        return lambda decoded, processed, _duration=None: callback(
+            len(self.segments) + decoded, self.resume_at + processed, duration
+        )
+
+    def merge(self, segments):
+        """Kayıtlı segmentler + kalan sesin segmentleri (global zamanlı)"""
+        if not self.resume_at:
+            return segments
+        return self.segments + [shift_segment(segment, self.resume_at) for segment in segments]
+
+
+def _job_from_row(row):
+    job = Job(json.loads(row["params"]))
+    job.id = row["id"]
+    job.status = row["status"]
+    job.created_at = row["created_at"]
+    job.started_at = row["started_at"]
+    job.finished_at = row["finished_at"]
+    job.segments_decoded = row["segments_decoded"]
+    job.audio_seconds_processed = row["audio_seconds_processed"]
+    job.audio_duration = row["audio_duration"]
+    job.error = row["error"]
+    job.meta = json.loads(row["meta"]) if row["meta"] else {}
+    if row["segments"]:
+        job.segments = json.loads(row["segments"])
+    return job
+
+
+def _remove(path):
+    try:
+        if path and os.path.exists(path):
+            os.unlink(path)
+    except OSError as e:
+        logger.warning(f"Job dosyası silinemedi: {path}: {e}")
@@ -0,0 +1,145 @@
+"""
+Transkripsiyon dili seçimi ve otomatik dil tespiti.
+Dil tespiti sadece ilk 30 saniyeye bakmaz: ses boyunca eşit aralıklı birkaç kısa pencere seçilir
+(sessiz pencereler atlanır), her pencerenin dil olasılıkları ortalanarak tek karar verilir.
+Tespit sonucu ses içeriği (hash) başına bellekte tutulur; aynı ses tekrar geldiğinde tespit yapılmaz.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+AUTO = "auto"
+
+# Whisper'ın desteklediği dil kodları
+LANGUAGE_CODES = (
+    "af", "am", "ar", "as", "az", "ba", "be", "bg", "bn", "bo", "br", "bs", "ca", "cs", "cy", "da", "de",
+    "el", "en", "es", "et", "eu", "fa", "fi", "fo", "fr", "gl", "gu", "ha", "haw", "he", "hi", "hr", "ht",
+    "hu", "hy", "id", "is", "it", "ja", "jw", "ka", "kk", "km", "kn", "ko", "la", "lb", "ln", "lo", "lt",
+    "lv", "mg", "mi", "mk", "ml", "mn", "mr", "ms", "mt", "my", "ne", "nl", "nn", "no", "oc", "pa", "pl",
+    "ps", "pt", "ro", "ru", "sa", "sd", "si", "sk", "sl", "sn", "so", "sq", "sr", "su", "sv", "sw", "ta",
+    "te", "tg", "th", "tk", "tl", "tr", "tt", "uk", "ur", "uz", "vi", "yi", "yo", "yue", "zh",
+)
+
+# Bu RMS'in altındaki pencereler sessiz sayılır (~-50 dBFS)
+SILENCE_RMS = 0.003
+
+
+def parse_language(value, default):
+    """'language' alanı: Whisper dil kodu, 'auto' veya boş (default). Geçersizse ValueError"""
+    value = (value or default).strip().lower()
+    if value != AUTO and value not in LANGUAGE_CODES:
+        raise ValueError(f"Desteklenmeyen dil: {value}")
+    return value
+
+
+def window_starts(length, count, window):
+    """length örneklik ses boyunca eşit aralıklı pencere başlangıçları; kısa seslerde None (tek pencere)"""
+    if length <= window * count:
+        count = max(1, length // window)
+    if count == 1 and length <= 2 * window:
+        return None
+    # Pencere merkezleri sesin (i + 0.5) / count noktalarında
+    return [min(max(int((i + 0.5) * length / count) - window // 2, 0), length - window) for i in range(count)]
+
+
+def voiced_windows(windows):
+    """Sessiz pencereleri at; hepsi sessizse hepsini kullan"""
+    voiced = [(start, samples) for start, samples in windows
+              if len(samples) and np.sqrt(np.mean(np.square(samples, dtype=np.float32))) >= SILENCE_RMS]
+    return voiced or windows
+
+
+def sample_windows(audio, count, window_seconds):
+    """Ses boyunca eşit aralıklı en fazla count pencere: [(başlangıç saniyesi, örnekler)].
+
+    Sessiz pencereler atlanır; hepsi sessizse hepsi kullanılır. Kısa seslerde tek pencere döner.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    starts = window_starts(len(audio), count, window)
+    if starts is None:
+        return [(0.0, audio)]
+    return voiced_windows([(start / SAMPLE_RATE, audio[start:start + window]) for start in starts])
+
+
+def sample_file_windows(reader, count, window_seconds):
+    """sample_windows'un dosyadan okuyan hali (audio.AudioFileReader): sadece pencereler okunur.
+
+    Süresi bilinmeyen dosyalarda (ffprobe yok) sadece baştaki pencere kullanılır.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    length = int((reader.duration or 0) * SAMPLE_RATE)
+    starts = window_starts(length, count, window) if length else [0]
+    if starts is None:
+        return [(0.0, reader.read(0.0, 2 * window_seconds))]
+    return voiced_windows([(start / SAMPLE_RATE, reader.read(start / SAMPLE_RATE, window_seconds))
+                           for start in starts])
+
+
+def detect_language(audio, detect_window, windows=3, window_seconds=10.0):
+    """Birkaç pencereden dil tespiti.
+
+    audio: 16 kHz mono float32 dizi veya uzun kayıtlarda audio.AudioFileReader (pencereler dosyadan okunur).
+    detect_window(samples) pencere için {dil: olasılık} döndürür (modele özgü).
+    Dönen sözlük: language, confidence (pencere olasılıklarının ortalaması), windows
+    (pencere başına başlangıç / dil / olasılık) ve seconds (tespit süresi).
+    """
+    started = time.perf_counter()
+    totals = {}
+    results = []
+    if isinstance(audio, np.ndarray):
+        sampled = sample_windows(audio, windows, window_seconds)
+    else:
+        sampled = sample_file_windows(audio, windows, window_seconds)
+    for start, samples in sampled:
+        probabilities = detect_window(samples)
+        for code, probability in probabilities.items():
+            totals[code] = totals.get(code, 0.0) + probability
+        code, probability = max(probabilities.items(), key=lambda item: item[1])
+        results.append({"start": round(start, 2), "language": code, "probability": round(probability, 3)})
+    language, total = max(totals.items(), key=lambda item: item[1])
+    return {
+        "language": language,
+        "confidence": round(total / len(sampled), 3),
+        "windows": results,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+class LanguageCache:
+    """Ses hash'i başına tespit sonucu (LRU, sınırlı sayıda kayıt)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            detection = self._entries.get(key)
+            if detection is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return detection
+
+    def put(self, key, detection):
+        with self._lock:
+            self._entries[key] = detection
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
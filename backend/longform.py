@@ -0,0 +1,76 @@
+"""
+Uzun kayıtların (saatlerce süren konferans / toplantı kayıtları) sınırlı bellekle transkripsiyonu.
+Ses dosyadan parça parça okunur (audio.AudioFileReader), yaklaşık sabit uzunlukta pencerelere
+sessiz noktalardan bölünür ve model pencere pencere çalıştırılır. Bir önceki pencerenin son metni
+sonraki pencereye initial_prompt olarak verilir; tüm ses hiçbir zaman tek dizi olarak bellekte tutulmaz.
+"""
+
+import logging
+
+import numpy as np
+
+from parallel import SAMPLE_RATE
+from subtitles import segment_value
+
+logger = logging.getLogger(__name__)
+
+# Pencere kesim noktası aranırken kullanılan çerçeve (100 ms)
+CUT_FRAME_SAMPLES = SAMPLE_RATE // 10
+
+
+def quiet_cut(audio, search):
+    """audio'nun son search örneği içindeki en sessiz çerçevenin ortası (kesim noktası, örnek indeksi)"""
+    frames = search // CUT_FRAME_SAMPLES
+    if frames < 1:
+        return len(audio)
+    region = audio[len(audio) - frames * CUT_FRAME_SAMPLES:].reshape(frames, CUT_FRAME_SAMPLES)
+    energy = np.einsum('ij,ij->i', region, region)
+    return len(audio) - (frames - int(np.argmin(energy))) * CUT_FRAME_SAMPLES + CUT_FRAME_SAMPLES // 2
+
+
+def iter_windows(chunks, window_seconds=300.0, search_seconds=10.0):
+    """Ses parçaları akışından pencereler: (başlangıç saniyesi, örnekler).
+
+    Pencereler en fazla window_seconds uzunluğundadır ve son search_seconds içindeki en sessiz
+    100 ms'de kesilir (kelime ortasından bölünmesin diye); kesimden sonraki kuyruk bir sonraki
+    pencerenin başı olur. Bellekte aynı anda en fazla bir pencere + bir parça bulunur.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    search = min(int(search_seconds * SAMPLE_RATE), window // 2)
+    offset = 0
+    pending, pending_length = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_length += len(chunk)
+        while pending_length >= window:
+            audio = np.concatenate(pending) if len(pending) > 1 else pending[0]
+            cut = quiet_cut(audio[:window], search)
+            yield offset / SAMPLE_RATE, audio[:cut]
+            offset += cut
+            # Kuyruk kopyalanır: pencerenin tamponu bir sonraki pencere boyunca tutulmasın
+            pending = [audio[cut:].copy()]
+            pending_length = len(pending[0])
+    if pending_length:
+        yield offset / SAMPLE_RATE, np.concatenate(pending) if len(pending) > 1 else pending[0]
+
+
+def carry_prompt(segments, max_chars=200):
+    """Önceki pencerenin son segmentlerinden sonraki pencereye verilecek initial_prompt (yoksa None)"""
+    texts = []
+    length = 0
+    for segment in reversed(segments):
+        text = (segment_value(segment, 'text') or '').strip()
+        if not text:
+            continue
+        texts.append(text)
+        length += len(text) + 1
+        if length >= max_chars:
+            break
+    if not texts:
+        return None
+    prompt = " ".join(reversed(texts))
+    if len(prompt) > max_chars:
+        # Kelime ortasından başlamasın
+        prompt = prompt[-max_chars:]
+        prompt = prompt[prompt.find(" ") + 1:] if " " in prompt else prompt
+    return prompt
@@ -0,0 +1,259 @@
+"""
+Aşama süreleri ve Prometheus metrikleri.
+Transkripsiyon hattının her aşaması (upload, çözme, model, render, ...) histogramlara yazılır;
+aynı süreler istek başına toplanıp Server-Timing header'ı olarak da döndürülür.
+Çıktı Prometheus text formatındadır (harici bağımlılık yok).
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Saniye cinsinden histogram sınırları (ms'lik render'dan dakikalarca süren decode'a kadar)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Aşamalar: upload (istek gövdesini alma), temp_write (diske yazma), decode (ses çözme),
+# prepare (özellik çıkarımı / dil tespiti / VAD), model_decode, cache_read (önbellekten okuma),
+# resegment (altyazı satır bölme), render (altyazı üretimi), send (yanıt gönderimi)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç"""
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Anlık değer; callback verilirse değerler scrape sırasında okunur"""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.callback:
+            # callback: {etiket değerleri tuple'ı: değer} veya etiketsiz metrikte tek değer
+            values = self.callback()
+            items = sorted(values.items()) if isinstance(values, dict) else [((), values)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items if value is not None
+        ]
+
+
+class Histogram(_Metric):
+    """Kümülatif bucket'lı histogram"""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metriklerin kaydı ve Prometheus text formatında çıktısı"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ThroughputWindow:
+    """Son window_seconds içinde işlenen ses saniyesi / duvar saati saniyesi"""
+
+    def __init__(self, window_seconds=60.0):
+        self.window_seconds = window_seconds
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def add(self, audio_seconds):
+        now = time.monotonic()
+        with self._lock:
+            self._events.append((now, audio_seconds))
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._events and self._events[0][0] < now - self.window_seconds:
+            self._events.popleft()
+
+    def rate(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return sum(seconds for _, seconds in self._events) / self.window_seconds
+
+
+# Uygulama genelindeki metrikler
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "subem_stage_seconds", "Transkripsiyon hattı aşama süreleri", ["stage"]
+)
+REQUEST_SECONDS = registry.histogram(
+    "subem_request_seconds", "HTTP istek süreleri (yanıt gönderimi hariç)", ["endpoint", "method"]
+)
+REQUESTS_TOTAL = registry.counter(
+    "subem_requests_total", "HTTP istek sayısı", ["endpoint", "method", "status"]
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "subem_requests_in_flight", "İşlenmekte olan HTTP istekleri"
+)
+AUDIO_SECONDS_TOTAL = registry.counter(
+    "subem_audio_seconds_total", "Transkribe edilen toplam ses süresi (saniye)", ["model"]
+)
+TRANSCRIBE_SECONDS_TOTAL = registry.counter(
+    "subem_transcribe_seconds_total", "Transkripsiyona harcanan toplam duvar saati süresi (saniye)", ["model"]
+)
+
+throughput = ThroughputWindow()
+registry.gauge(
+    "subem_audio_seconds_per_second", "Son 60 saniyedeki transkripsiyon hızı (ses saniyesi / saniye)",
+    callback=throughput.rate
+)
+
+# İstek başına aşama süreleri (thread / istek bağlamına özel)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_timings():
+    """Bu bağlam için yeni aşama süresi sözlüğü başlat ve döndür"""
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def current_timings():
+    return _request_timings.get()
+
+
+def record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Bloğun süresini aşama histogramına ve istek süreleri sözlüğüne yaz"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start_time)
+
+
+def record_transcription(model_name, audio_seconds, wall_seconds):
+    """Tamamlanan transkripsiyonu throughput metriklerine ekle"""
+    AUDIO_SECONDS_TOTAL.inc(audio_seconds, model=model_name)
+    TRANSCRIBE_SECONDS_TOTAL.inc(wall_seconds, model=model_name)
+    throughput.add(audio_seconds)
+
+
+def server_timing_header(timings):
+    """Aşama sürelerini Server-Timing header değerine çevir (ms)"""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
@@ -0,0 +1,266 @@
+"""
+Whisper model kayıt defteri (registry).
+Modeller ilk istekte yüklenir, bellek bütçesi aşıldığında en uzun süredir kullanılmayan
+boştaki model bellekten atılır (LRU), uzun süre kullanılmayan modeller de arka planda boşaltılır.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Bellek ölçülemediğinde kullanılan yaklaşık yerleşik boyutlar (MB, int8)
+ESTIMATED_MODEL_MB = {
+    "tiny": 80,
+    "base": 150,
+    "small": 350,
+    "medium": 900,
+    "large": 1700,
+    "large-v2": 1700,
+    "large-v3": 1700
+}
+
+
+# Aynı modelin farklı compute_type ile yüklenen kopyası: "<model>@<compute_type>" (ör. small@float32)
+VARIANT_SEPARATOR = "@"
+
+
+def variant_name(name, compute_type):
+    return f"{name}{VARIANT_SEPARATOR}{compute_type}"
+
+
+class ModelUnavailable(Exception):
+    """Model yüklenemediğinde fırlatılır"""
+
+
+def current_rss_mb():
+    """Process'in yerleşik bellek kullanımı (MB), ölçülemezse None"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelEntry:
+    """Registry'deki tek bir modelin durumu"""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.model = None
+        self.state = "unloaded"
+        self.error = None
+        self.failed_at = None
+        self.resident_mb = None
+        self.in_use = 0
+        self.last_used = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.load_lock = threading.Lock()
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "state": self.state,
+            "compute_type": self.config.get("compute_type"),
+            "cpu_threads": self.config.get("cpu_threads"),
+            "resident_mb": round(self.resident_mb, 1) if self.resident_mb else None,
+            "in_use": self.in_use,
+            "last_used": self.last_used,
+            "load_seconds": self.load_seconds,
+            "error": self.error
+        }
+
+
+class ModelRegistry:
+    """Tembel yüklenen, bellek bütçeli model havuzu"""
+
+    def __init__(self, loader, available_models, default_model, memory_budget_mb,
+                 idle_timeout_seconds=0, model_config=None, retry_seconds=30):
+        self.loader = loader
+        self.default_model = default_model
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        model_config = model_config or {}
+        for name in available_models:
+            config = {"compute_type": "int8", "cpu_threads": 0}
+            config.update(model_config.get(name, {}))
+            self._entries[name] = ModelEntry(name, config)
+
+    def available(self):
+        return list(self._entries)
+
+    def is_available(self, name):
+        return self._lookup(name) is not None
+
+    def entry(self, name):
+        entry = self._lookup(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
+    def _lookup(self, name):
+        """Kayıtlı model veya ilk kullanımda kaydedilen compute_type varyantı (ör. small@float32)"""
+        entry = self._entries.get(name)
+        if entry is None and name and VARIANT_SEPARATOR in name:
+            base, compute_type = name.split(VARIANT_SEPARATOR, 1)
+            base_entry = self._entries.get(base)
+            if base_entry is None or not compute_type or "model" in base_entry.config:
+                return None
+            # Varyant ayrı model olarak yüklenir, bellek bütçesine ayrıca sayılır
+            config = {**base_entry.config, "compute_type": compute_type, "model": base}
+            with self._lock:
+                entry = self._entries.setdefault(name, ModelEntry(name, config))
+        return entry
+
+    def ready(self, name):
+        """Model yüklü veya yüklenebilir mi: yükleme hatası retry_seconds boyunca geçerli sayılır,
+        sonra (ör. geçici bellek / disk hatası) bir sonraki istek yüklemeyi tekrar dener"""
+        entry = self.entry(name)
+        return entry.state != "error" or time.time() - entry.failed_at >= self.retry_seconds
+
+    def _estimate_mb(self, name):
+        name = self._entries[name].config.get("model", name)
+        return ESTIMATED_MODEL_MB.get(name, ESTIMATED_MODEL_MB["large"])
+
+    def loaded_mb(self):
+        """Yüklü modellerin toplam bellek kullanımı (MB)"""
+        with self._lock:
+            return sum(entry.resident_mb or 0 for entry in self._entries.values() if entry.state == "loaded")
+
+    def load(self, name, hold=False):
+        """Modeli yükle (yüklüyse hemen döner), model nesnesini döndür.
+
+        hold=True ise model aynı lock altında kullanımda sayılır (in_use); dönüşle kullanım
+        arasında _make_room / evict_idle modeli boşaltamaz. Çağıran release() ile bırakır.
+        """
+        entry = self._lookup(name)
+        if entry is None:
+            raise ModelUnavailable(f"Bilinmeyen model: {name}")
+
+        with entry.load_lock:
+            with self._lock:
+                if entry.state == "loaded":
+                    if hold:
+                        self._hold(entry)
+                    return entry.model
+
+            self._make_room(name, self._estimate_mb(name))
+            entry.state = "loading"
+            entry.error = None
+            logger.info(f"Whisper model yükleniyor: {name} ({entry.config})")
+            rss_before = current_rss_mb()
+            start_time = time.time()
+            try:
+                model = self.loader(name, **entry.config)
+            except Exception as e:
+                entry.state = "error"
+                entry.error = str(e)
+                entry.failed_at = time.time()
+                logger.error(f"Model yükleme hatası: {name}: {e}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                raise ModelUnavailable(f"Model yüklenemedi: {name}: {e}")
+
+            rss_after = current_rss_mb()
+            measured = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            with self._lock:
+                # Eşzamanlı yüklemeler ölçümü bozabilir, anlamsız değerde tahmine dönülür
+                entry.resident_mb = measured if measured and measured > 0 else self._estimate_mb(name)
+                entry.model = model
+                entry.state = "loaded"
+                entry.loaded_at = time.time()
+                entry.last_used = entry.loaded_at
+                entry.load_seconds = round(entry.loaded_at - start_time, 2)
+                if hold:
+                    self._hold(entry)
+            logger.info(f"Model yüklendi: {name} ({entry.load_seconds}s, ~{entry.resident_mb:.0f} MB)")
+            return model
+
+    @contextmanager
+    def acquire(self, name=None):
+        """Modeli kullanım süresince kilitle (kullanımdaki model bellekten atılmaz)"""
+        name = name or self.default_model
+        model = self.load(name, hold=True)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    def _hold(self, entry):
+        """Modeli kullanımda say (_lock altında çağrılır)"""
+        entry.in_use += 1
+        entry.last_used = time.time()
+
+    def release(self, name):
+        """load(hold=True) ile alınan kullanımı bırak"""
+        entry = self._lookup(name)
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.time()
+
+    def _make_room(self, loading_name, required_mb):
+        """Bütçe aşılacaksa boştaki modelleri LRU sırasıyla boşalt"""
+        with self._lock:
+            loaded = [entry for entry in self._entries.values()
+                      if entry.state == "loaded" and entry.name != loading_name]
+            used_mb = sum(entry.resident_mb or 0 for entry in loaded)
+            for entry in sorted(loaded, key=lambda entry: entry.last_used or 0):
+                if used_mb + required_mb <= self.memory_budget_mb:
+                    break
+                if entry.in_use:
+                    continue
+                used_mb -= entry.resident_mb or 0
+                self._unload(entry, reason="bellek bütçesi")
+
+            if used_mb + required_mb > self.memory_budget_mb:
+                logger.warning(f"Bellek bütçesi aşılıyor: {used_mb + required_mb:.0f} MB > "
+                               f"{self.memory_budget_mb} MB")
+
+    def _unload(self, entry, reason):
+        """Modeli bellekten at (lock altında çağrılır)"""
+        logger.info(f"Model bellekten atılıyor: {entry.name} ({reason})")
+        entry.model = None
+        entry.state = "unloaded"
+        entry.resident_mb = None
+        gc.collect()
+
+    def evict_idle(self):
+        """Boşta kalma süresi dolan modelleri boşalt (varsayılan model hariç)"""
+        if not self.idle_timeout_seconds:
+            return
+        cutoff = time.time() - self.idle_timeout_seconds
+        with self._lock:
+            for entry in self._entries.values():
+                if (entry.state == "loaded" and entry.name != self.default_model
+                        and not entry.in_use and entry.last_used < cutoff):
+                    self._unload(entry, reason="boşta")
+
+    def start_idle_reaper(self, interval_seconds=60):
+        """Boştaki modelleri periyodik olarak boşaltan arka plan thread'i"""
+        if not self.idle_timeout_seconds:
+            return
+
+        def reaper():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.evict_idle()
+                except Exception as e:
+                    logger.warning(f"Model boşaltma hatası: {e}")
+
+        threading.Thread(target=reaper, name="model-reaper", daemon=True).start()
+
+    def status(self):
+        """Tüm modellerin durumu"""
+        with self._lock:
+            return [entry.to_dict() for entry in self._entries.values()]
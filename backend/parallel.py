@@ -0,0 +1,181 @@
+"""
+Çok çekirdekli paralel transkripsiyon.
+Uzun ses sessizlik noktalarından (Faster Whisper VAD) parçalara bölünür, parçalar
+model kopyaları çalıştıran bir process havuzunda transkribe edilir ve segmentler
+global zaman damgalarıyla tekrar birleştirilir.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Parça sınırında hiç sessizlik bulunamazsa sert kesim yapılır ve parçalar bu kadar örtüşür
+HARD_CUT_OVERLAP_SECONDS = 1.0
+
+# Worker process içindeki model kopyası
+_worker_model = None
+
+def _init_worker(model_name, compute_type, cpu_threads):
+    """Process havuzu initializer: her worker kendi model kopyasını yükler"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+def _transcribe_chunk(audio, offset, options):
+    """Worker process'te tek parçayı transkribe et, global zamanlı segment sözlükleri döndür"""
+    segments, _ = _worker_model.transcribe(audio, **options)
+    result = []
+    for segment in segments:
+        result.append({
+            "start": segment.start + offset,
+            "end": segment.end + offset,
+            "text": segment.text.strip(),
+            "avg_logprob": segment.avg_logprob,
+            "compression_ratio": segment.compression_ratio,
+            "no_speech_prob": segment.no_speech_prob,
+            "words": [
+                {
+                    "start": word.start + offset,
+                    "end": word.end + offset,
+                    "word": word.word,
+                    "probability": word.probability
+                }
+                for word in (segment.words or [])
+            ]
+        })
+    return result
+
+def find_split_points(audio, chunk_count, max_search_seconds=30.0):
+    """Ses örnekleri üzerinde yaklaşık eşit aralıklı, sessizliğe denk gelen bölme noktaları bul.
+
+    Dönen liste [(start_sample, end_sample), ...] parça aralıklarıdır.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    total = len(audio)
+    if chunk_count <= 1:
+        return [(0, total)]
+
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=300, speech_pad_ms=100))
+    # Konuşma bölgeleri arasındaki boşlukların orta noktaları aday bölme noktalarıdır
+    gaps = [
+        (speech[i]["end"] + speech[i + 1]["start"]) // 2
+        for i in range(len(speech) - 1)
+    ]
+
+    max_search = int(max_search_seconds * SAMPLE_RATE)
+    chunk_length = total / chunk_count
+    bounds = [0]
+    hard_cuts = []
+    for i in range(1, chunk_count):
+        target = int(i * chunk_length)
+        candidates = [gap for gap in gaps if abs(gap - target) <= max_search and gap > bounds[-1]]
+        if candidates:
+            bounds.append(min(candidates, key=lambda gap: abs(gap - target)))
+        else:
+            bounds.append(target)
+            hard_cuts.append(len(bounds) - 1)
+    bounds.append(total)
+
+    overlap = int(HARD_CUT_OVERLAP_SECONDS * SAMPLE_RATE)
+    chunks = []
+    for i in range(len(bounds) - 1):
+        start = bounds[i]
+        # Sert kesimlerde bir sonraki parça biraz geriden başlar, tekrar eden metin birleştirirken atılır
+        if i in hard_cuts:
+            start = max(start - overlap, 0)
+        chunks.append((start, bounds[i + 1]))
+    return chunks
+
+def _normalize_text(text):
+    return " ".join(text.lower().split())
+
+def stitch_segments(chunk_results):
+    """Parça sonuçlarını sırayla birleştir, sınırlarda tekrar eden segmentleri ayıkla"""
+    stitched = []
+    for segments in chunk_results:
+        for segment in segments:
+            if stitched:
+                last = stitched[-1]
+                # Önceki parçanın zaten kapsadığı segment
+                if segment["end"] <= last["end"]:
+                    continue
+                if segment["start"] < last["end"]:
+                    if _normalize_text(segment["text"]) == _normalize_text(last["text"]):
+                        continue
+                    segment["start"] = last["end"]
+                    segment["words"] = [word for word in segment["words"] if word["start"] >= last["end"]]
+            stitched.append(segment)
+    return stitched
+
+
+class ParallelTranscriber:
+    """Model kopyalarından oluşan process havuzu ile paralel transkripsiyon"""
+
+    def __init__(self, model_name, workers, cpu_threads, compute_type="int8", min_chunk_seconds=60.0):
+        self.model_name = model_name
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self.compute_type = compute_type
+        self.min_chunk_seconds = min_chunk_seconds
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """Havuz ilk kullanımda oluşturulur; model kopyalarının yüklenmesi zaman alır"""
+        with self._lock:
+            if self._pool is None:
+                logger.info(f"Paralel transkripsiyon havuzu başlatılıyor: {self.workers} worker x "
+                            f"{self.cpu_threads} thread ({self.model_name})")
+                # Yüklü CTranslate2 thread'leri fork sonrası güvenli olmadığından spawn kullanılır
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.compute_type, self.cpu_threads)
+                )
+            return self._pool
+
+    def transcribe(self, audio, options, progress_callback=None):
+        """16 kHz mono float32 ses dizisini paralel transkribe et"""
+        duration = len(audio) / SAMPLE_RATE
+        # Worker başına iki parça: parça süreleri eşit olmadığında yük daha dengeli dağılır
+        chunk_count = max(1, min(self.workers * 2, int(duration // self.min_chunk_seconds)))
+        chunks = find_split_points(audio, chunk_count)
+        logger.info(f"Paralel transkripsiyon: {duration:.1f}s ses, {len(chunks)} parça")
+
+        start_time = time.time()
+        pool = self._get_pool()
+        futures = {
+            pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, options): index
+            for index, (start, end) in enumerate(chunks)
+        }
+
+        results = [None] * len(chunks)
+        processed_seconds = 0.0
+        segments_decoded = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            start, end = chunks[index]
+            processed_seconds += (end - start) / SAMPLE_RATE
+            segments_decoded += len(results[index])
+            if progress_callback:
+                progress_callback(segments_decoded, min(processed_seconds, duration), duration)
+
+        segments = stitch_segments(results)
+        logger.info(f"Paralel transkripsiyon tamamlandı: {len(segments)} segment, "
+                    f"{time.time() - start_time:.1f}s")
+        return segments
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,93 @@
+"""
+Kalite / hız profilleri.
+Her profil model, beam boyutu, sıcaklık (temperature fallback), VAD filtresi ve compute_type seçer.
+'adaptive' profili önce greedy decode yapar, sadece düşük güvenli segmentleri (avg_logprob /
+compression_ratio eşikleri) daha geniş beam ve / veya daha büyük modelle tekrar decode eder.
+"""
+
+import logging
+
+from subtitles import segment_value
+
+logger = logging.getLogger(__name__)
+
+# Profilden transcribe() çağrısına geçen decode ayarları
+DECODE_KEYS = ("beam_size", "temperature", "vad_filter")
+
+# model None ise WHISPER_MODEL, compute_type None ise modelin kendi ayarı kullanılır
+DEFAULT_PROFILES = {
+    # Kaba kurgu önizlemesi: küçük model, greedy, sıcaklık fallback'i yok, sessizlikler atlanır
+    "draft": {"model": "tiny", "beam_size": 1, "temperature": 0.0, "vad_filter": True},
+    # Önceki sabit ayarlar (beam 5, fallback açık)
+    "balanced": {"model": None, "beam_size": 5},
+    # Teslim: daha büyük model, int8 yerine float32 ağırlıklar
+    "final": {"model": "small", "beam_size": 5, "vad_filter": True, "compute_type": "float32"},
+    # Greedy ilk geçiş + düşük güvenli segmentlerin tekrar decode'u
+    "adaptive": {
+        "model": None, "beam_size": 1, "temperature": 0.0,
+        "redecode": {
+            "model": "small", "beam_size": 5,
+            "log_prob_threshold": -0.8, "compression_ratio_threshold": 2.4,
+            # Tekrar decode edilen bölgeye iki yandan eklenen bağlam (saniye)
+            "padding": 0.5
+        }
+    }
+}
+
+
+def load_profiles(overrides=None):
+    """Varsayılan profiller + DECODE_PROFILES ile verilen değişiklikler / yeni profiller"""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    for name, profile in (overrides or {}).items():
+        profiles[name] = {**profiles.get(name, {}), **profile}
+    return profiles
+
+
+def parse_profile(value, profiles, default):
+    """'profile' alanı: profil adı veya boş (default). Bilinmeyen profilde ValueError"""
+    name = (value or default).strip().lower()
+    if name not in profiles:
+        raise ValueError(f"Bilinmeyen profil: {name}")
+    return name
+
+
+def profile_decode_options(profile):
+    """Profilin transcribe() ayarları (sıcaklık listesi JSON / önbellek anahtarı için tuple'a çevrilir)"""
+    options = {key: profile[key] for key in DECODE_KEYS if key in profile}
+    if isinstance(options.get("temperature"), list):
+        options["temperature"] = tuple(options["temperature"])
+    return options
+
+
+def is_low_confidence(segment, redecode):
+    """Segment tekrar decode edilmeli mi: düşük ortalama log olasılık veya tekrarlı (sıkıştırılabilir) metin"""
+    avg_logprob = segment_value(segment, 'avg_logprob')
+    compression_ratio = segment_value(segment, 'compression_ratio')
+    if avg_logprob is not None and avg_logprob < redecode.get("log_prob_threshold", -0.8):
+        return True
+    return compression_ratio is not None and compression_ratio > redecode.get("compression_ratio_threshold", 2.4)
+
+
+def redecode_window(segments, lower, upper, padding=0.5):
+    """Ardışık düşük güvenli segmentlerin tekrar decode bölgesi: (başlangıç, bitiş).
+
+    Bölge iki yandan padding kadar genişletilir ama komşu (korunan) segmentlerin sınırlarını
+    (lower: önceki segmentin sonu, upper: sonraki segmentin başı veya ses sonu) aşmaz.
+    """
+    start = max(segments[0]["start"] - padding, lower)
+    end = min(segments[-1]["end"] + padding, upper)
+    return start, max(end, start)
+
+
+def redecode_summary(stats, duration):
+    """Adaptive decode istatistikleri + tekrar decode edilen ses oranı"""
+    if not stats:
+        return None
+    return {
+        "segments": stats.get("segments", 0),
+        "redecoded_segments": stats.get("redecoded_segments", 0),
+        "redecoded_seconds": round(stats.get("redecoded_seconds", 0.0), 2),
+        "redecoded_fraction": round(stats.get("redecoded_seconds", 0.0) / duration, 3) if duration else 0.0,
+        "model": stats.get("model"),
+        "seconds": round(stats.get("seconds", 0.0), 3)
+    }
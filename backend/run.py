@@ -2,23 +2,38 @@
 """
 Adobe Premiere Pro AI Altyazı Eklentisi - Backend Server
 Bu script backend sunucusunu başlatır.
+
+SERVER=gunicorn (Linux/macOS varsayılanı): production sunucu (gunicorn.conf.py)
+SERVER=flask (Windows varsayılanı): Flask geliştirme sunucusu; DEBUG=true ise reloader açılır
 """
 
+import importlib.util
 import os
 import sys
-from app import app
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_server():
+    """gunicorn kuruluysa ve Windows değilse gunicorn, aksi halde Flask geliştirme sunucusu"""
+    if sys.platform != 'win32' and importlib.util.find_spec('gunicorn') is not None:
+        return 'gunicorn'
+    return 'flask'
+
 
 if __name__ == '__main__':
     # Environment variables
     port = int(os.getenv('PORT', 5000))
-    debug = os.getenv('DEBUG', 'true').lower() == 'true'
+    debug = os.getenv('DEBUG', 'false').lower() == 'true'
+    server = os.getenv('SERVER', default_server()).lower()
     whisper_model = os.getenv('WHISPER_MODEL', 'base')
     use_faster_whisper = os.getenv('USE_FASTER_WHISPER', 'true').lower() == 'true'
-    
+
     print("=" * 60)
     print("Adobe Premiere Pro AI Altyazı Eklentisi - Backend")
     print("=" * 60)
     print(f"Port: {port}")
+    print(f"Sunucu: {server}")
     print(f"Debug Mode: {debug}")
     print(f"Whisper Model: {whisper_model}")
     print(f"Faster Whisper: {use_faster_whisper}")
@@ -27,9 +42,17 @@ if __name__ == '__main__':
     print(f"API Endpoint: http://localhost:{port}/transcribe")
     print("Durdurmak için Ctrl+C basın")
     print("=" * 60)
-    
+
+    if server == 'gunicorn':
+        # Uygulama bu process'te import edilmez (model iki kez yüklenmesin); gunicorn'a devredilir
+        os.chdir(BACKEND_DIR)
+        os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'])
+
+    from app import app
+
     try:
-        app.run(host='0.0.0.0', port=port, debug=debug)
+        # Reloader uygulamayı (ve modeli) ikinci bir process'te tekrar yükler, sadece debug'da açılır
+        app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=debug, threaded=True)
     except KeyboardInterrupt:
         print("\nSunucu durduruldu.")
         sys.exit(0)
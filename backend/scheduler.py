@@ -0,0 +1,290 @@
+"""
+Model önündeki öncelikli zamanlayıcı.
+Her transkripsiyon (senkron istek, stream veya job) decode etmeden önce bir slot bekler. Bekleyenler
+önce öncelik sınıfına (interactive, bulk), sınıf içinde istemcinin şimdiye kadar aldığı hizmete
+(istemci başına adil paylaşım), sonra ses süresine (kısa ses önce) göre sıralanır. Uzun işler decode
+parçaları arasındaki kesme noktalarında (preemption_point) slotu kendilerinden öncelikli bekleyen
+işlere bırakır ve sıraları tekrar gelince kaldıkları yerden devam eder.
+"""
+
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+# Gerçek zaman oranı (decode süresi / ses süresi) için üstel hareketli ortalama katsayısı
+RTF_SMOOTHING = 0.2
+
+# Hizmet sayaçları bu kadar istemciyi geçince beklemeyen istemcilerin kayıtları silinir
+MAX_TRACKED_CLIENTS = 1024
+
+# Decode parçası içinde çalışan işin ilerlemesi
+_current_ticket = contextvars.ContextVar("scheduler_ticket", default=None)
+
+
+def parse_priority(value, duration, interactive_max_seconds):
+    """'priority' alanı: interactive, bulk veya boş (süreye göre seçilir).
+
+    interactive_max_seconds'tan uzun (veya süresi bilinmeyen) ses interactive istense de bulk sayılır:
+    uzun timeline'lar kısa klip bekleyen editörlerin önüne geçemez. Geçersiz değerde ValueError.
+    """
+    value = (value or '').strip().lower()
+    if value and value not in PRIORITIES:
+        raise ValueError(f"Bilinmeyen öncelik: {value}")
+    short = duration is not None and duration <= interactive_max_seconds
+    if value == BULK or not short:
+        return BULK
+    return INTERACTIVE
+
+
+class Ticket:
+    """Zamanlayıcıda sıra bekleyen / çalışan tek transkripsiyon.
+
+    duration: ses süresi (saniye; upload başlığından, bilinmiyorsa tahmin). processed: kesme
+    noktalarında bildirilen işlenmiş ses süresi; kalan süre sıralamada ve tahminlerde kullanılır.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, client, priority, duration):
+        self.id = next(self._ids)
+        self.client = client or "anonymous"
+        self.priority = priority if priority in PRIORITIES else BULK
+        self.duration = duration or 0.0
+        self.processed = 0.0
+        self.state = "new"
+        self.preemptions = 0
+        self.waited_seconds = 0.0
+        self.run_seconds = 0.0
+        self._since = None
+
+    def remaining(self):
+        return max(self.duration - self.processed, 0.0)
+
+
+class InferenceScheduler:
+    """slots adet eşzamanlı decode; bekleyenler rank() sırasıyla başlatılır.
+
+    quantum_seconds: çalışan iş bu süreden önce kesilmez (kısa kesintilerle sürekli yer değiştirme olmaz).
+    realtime_factor: tahmini başlama süreleri için başlangıç gerçek zaman oranı (bitişlerle güncellenir).
+    Kilit (Condition, RLock) rank() ve can_start() gibi dışarıdan çağrılan yöntemlerde de alınır.
+    """
+
+    def __init__(self, slots=1, quantum_seconds=10.0, realtime_factor=0.5):
+        self.slots = max(1, slots)
+        self.quantum_seconds = quantum_seconds
+        self.realtime_factor = realtime_factor
+        self.preemptions = 0
+        self.started = {priority: 0 for priority in PRIORITIES}
+        self.wait_seconds = {priority: 0.0 for priority in PRIORITIES}
+        self._waiting = []
+        self._running = []
+        # İstemci başına verilen hizmet (ses saniyesi); adil paylaşımın sanal zamanı
+        self._served = {}
+        self._cond = threading.Condition()
+
+    def rank(self, ticket):
+        """Sıralama anahtarı: öncelik sınıfı, istemcinin aldığı hizmet, kalan ses süresi, geliş sırası"""
+        with self._cond:
+            return (PRIORITIES.index(ticket.priority), self._served.get(ticket.client, self._floor()),
+                    ticket.remaining(), ticket.id)
+
+    def _floor(self):
+        """Beklemekte / çalışmakta olan istemcilerin en az hizmeti (yeni istemci bu değerden başlar)"""
+        active = {ticket.client for ticket in self._waiting + self._running}
+        served = [self._served[client] for client in active if client in self._served]
+        return min(served) if served else 0.0
+
+    def _next(self):
+        return min(self._waiting, key=self.rank) if self._waiting else None
+
+    def _outranks(self, waiting, running):
+        """Bekleyen iş çalışanı kesmeli mi: daha öncelikli sınıf veya aynı sınıfta daha kısa ses"""
+        waiting_class, running_class = PRIORITIES.index(waiting.priority), PRIORITIES.index(running.priority)
+        if waiting_class != running_class:
+            return waiting_class < running_class
+        return waiting.remaining() < running.remaining()
+
+    def submit(self, ticket):
+        """Bileti sıraya al (wait() ile sıra beklenir)"""
+        with self._cond:
+            if ticket.client not in self._served or not any(
+                    other.client == ticket.client for other in self._waiting + self._running):
+                # Boşta kalan istemci hizmet biriktirmez: bekleyenlerin en azından başlar
+                self._served[ticket.client] = max(self._served.get(ticket.client, 0.0), self._floor())
+                self._prune()
+            ticket.state = "waiting"
+            ticket._since = time.monotonic()
+            self._waiting.append(ticket)
+            self._cond.notify_all()
+        return ticket
+
+    def wait(self, ticket, timeout=None):
+        """Slot verilene kadar bekle; timeout dolarsa False (bilet sırada kalır)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while ticket.state == "waiting":
+                if len(self._running) < self.slots and self._next() is ticket:
+                    self._start(ticket)
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return ticket.state == "running"
+
+    def _start(self, ticket):
+        now = time.monotonic()
+        waited = now - ticket._since
+        self._waiting.remove(ticket)
+        self._running.append(ticket)
+        ticket.state = "running"
+        ticket.waited_seconds += waited
+        ticket._since = now
+        self.started[ticket.priority] += 1
+        self.wait_seconds[ticket.priority] += waited
+        self._served[ticket.client] = self._served.get(ticket.client, 0.0) + ticket.remaining()
+        # Sıradaki bilet de boş slot varsa başlayabilir
+        self._cond.notify_all()
+
+    def release(self, ticket):
+        """Bileti sıradan / slottan çıkar (bitti, hata verdi veya istemci ayrıldı)"""
+        with self._cond:
+            if ticket.state == "waiting":
+                self._waiting.remove(ticket)
+                self.wait_seconds[ticket.priority] += time.monotonic() - ticket._since
+            elif ticket.state == "running":
+                self._running.remove(ticket)
+                self._update_rate(ticket)
+            ticket.state = "done"
+            self._cond.notify_all()
+
+    def _update_rate(self, ticket):
+        elapsed = time.monotonic() - ticket._since
+        ticket.run_seconds += elapsed
+        processed = ticket.processed or ticket.duration
+        if processed > 0 and ticket.run_seconds > 0:
+            self.realtime_factor += RTF_SMOOTHING * (ticket.run_seconds / processed - self.realtime_factor)
+
+    @contextmanager
+    def running(self, ticket):
+        """Slot almış bileti bu bağlamın çalışan işi yap (preemption_point için); çıkışta bırak"""
+        token = _current_ticket.set(ticket)
+        try:
+            yield ticket
+        finally:
+            _current_ticket.reset(token)
+            self.release(ticket)
+
+    @contextmanager
+    def run(self, ticket):
+        """Sıraya gir, slotu bekle ve blok süresince çalış"""
+        self.submit(ticket)
+        try:
+            self.wait(ticket)
+        except BaseException:
+            self.release(ticket)
+            raise
+        with self.running(ticket):
+            yield ticket
+
+    def preemption_point(self, processed=None):
+        """Decode parçaları arasında çağrılır: bu bağlamın işinden öncelikli bekleyen varsa slot
+        bırakılır, sıra tekrar gelince dönülür. processed: işlenmiş ses süresi (saniye).
+
+        Kesilen iş beklediği süre boyunca (True döner) modelin iterator'ını duraklatmış olur.
+        """
+        ticket = _current_ticket.get()
+        if ticket is None or ticket.state != "running":
+            return False
+        if processed is not None:
+            ticket.processed = processed
+        with self._cond:
+            if time.monotonic() - ticket._since < self.quantum_seconds or len(self._running) < self.slots:
+                return False
+            challenger = self._next()
+            if challenger is None or not self._outranks(challenger, ticket):
+                return False
+            self._running.remove(ticket)
+            self._update_rate(ticket)
+            # Kalan ses tekrar başladığında hizmete eklenir
+            self._served[ticket.client] -= ticket.remaining()
+            ticket.preemptions += 1
+            ticket.state = "waiting"
+            ticket._since = time.monotonic()
+            self._waiting.append(ticket)
+            self.preemptions += 1
+            self._cond.notify_all()
+        logger.info(f"İş kesildi: #{ticket.id} ({ticket.priority}, {ticket.client}, kalan {ticket.remaining():.0f}s), "
+                    f"sıradaki #{challenger.id} ({challenger.priority}, {challenger.duration:.0f}s)")
+        self.wait(ticket)
+        return True
+
+    def queue_info(self, ticket, pending=()):
+        """Bilet için sıra bilgisi: position (1 = sıradaki, 0 = çalışıyor), önündeki ses süresi ve
+        tahmini başlama süresi (saniye). pending: henüz sıraya girmemiş biletler (ör. kuyruktaki job'lar).
+        """
+        with self._cond:
+            if ticket.state == "running":
+                return {"priority": ticket.priority, "position": 0, "ahead_seconds": 0.0,
+                        "estimated_start_seconds": 0.0, "estimated_start_at": None}
+            waiting = {id(other): other for other in list(self._waiting) + list(pending)}
+            waiting[id(ticket)] = ticket
+            ordered = sorted(waiting.values(), key=self.rank)
+            ahead = ordered[:ordered.index(ticket)]
+            ahead_seconds = sum(other.remaining() for other in ahead)
+            running_seconds = sum(other.remaining() for other in self._running)
+            # Slotlar dolu değilse sıradaki hemen başlar
+            busy = running_seconds if len(self._running) >= self.slots else 0.0
+            estimate = (busy + ahead_seconds) * self.realtime_factor / self.slots
+            return {
+                "priority": ticket.priority,
+                "position": len(ahead) + 1,
+                "ahead_seconds": round(ahead_seconds, 1),
+                "estimated_start_seconds": round(estimate, 1),
+                "estimated_start_at": round(time.time() + estimate, 1)
+            }
+
+    def can_start(self, ticket):
+        """Sırada olmayan bilet şimdi başlayabilir mi (boş slot var veya çalışan bir işi keser)"""
+        with self._cond:
+            if self._waiting and self.rank(self._next()) < self.rank(ticket):
+                return False
+            if len(self._running) < self.slots:
+                return True
+            return any(self._outranks(ticket, running) for running in self._running)
+
+    def _prune(self):
+        if len(self._served) <= MAX_TRACKED_CLIENTS:
+            return
+        active = {ticket.client for ticket in self._waiting + self._running}
+        for client in [client for client in self._served if client not in active]:
+            del self._served[client]
+
+    def stats(self):
+        """Zamanlayıcı istatistikleri (/health)"""
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "running": [{"priority": t.priority, "remaining_seconds": round(t.remaining(), 1)}
+                            for t in self._running],
+                "waiting": {priority: sum(1 for t in self._waiting if t.priority == priority)
+                            for priority in PRIORITIES},
+                "started": dict(self.started),
+                "average_wait_seconds": {
+                    priority: round(self.wait_seconds[priority] / self.started[priority], 2)
+                    if self.started[priority] else None
+                    for priority in PRIORITIES
+                },
+                "preemptions": self.preemptions,
+                "realtime_factor": round(self.realtime_factor, 3),
+                "clients": len(self._served)
+            }
@@ -0,0 +1,256 @@
+"""
+Altyazı satır bölme ve yeniden segmentleme.
+Whisper segmentleri yayın altyazı sınırları için çoğu zaman fazla uzundur. Bu modül segmentlerin
+kelime zamanlamalarını tek bir kelime akışına çevirir ve cue'ları satır başına karakter, satır sayısı,
+okuma hızı (CPS) ve süre sınırlarına göre yeniden böler / birleştirir.
+Her kelime bir kez işlenir (doğrusal zaman); önbellekteki segmentlerden milisaniyeler içinde
+farklı bir altyazı stili üretilebilir.
+"""
+
+import logging
+import math
+
+from subtitles import segment_value
+
+logger = logging.getLogger(__name__)
+
+# Yayın altyazıları için yaygın varsayılanlar
+DEFAULT_CAPTION_STYLE = {
+    "max_chars_per_line": 42,
+    "max_lines": 2,
+    "max_cps": 17.0,
+    "min_duration": 0.8,
+    "max_duration": 7.0,
+    "max_gap": 1.0
+}
+
+# Stil alanları: (tip, en küçük değer)
+_STYLE_FIELDS = {
+    "max_chars_per_line": (int, 1),
+    "max_lines": (int, 1),
+    "max_cps": (float, 1.0),
+    "min_duration": (float, 0.0),
+    "max_duration": (float, 0.1),
+    "max_gap": (float, 0.0)
+}
+
+# Bu karakterlerle biten kelimeden sonra cue bölünmesi tercih edilir
+_SENTENCE_END = ('.', '!', '?', '…', '。', '！', '？')
+
+
+def parse_caption_style(values):
+    """İstek alanlarından (form / query / JSON) stil sözlüğü üret.
+
+    Stil alanlarından hiçbiri yoksa None döner (segmentler olduğu gibi kullanılır).
+    Geçersiz değerde ValueError fırlatır.
+    """
+    if not any(values.get(name) not in (None, '') for name in _STYLE_FIELDS):
+        return None
+
+    style = dict(DEFAULT_CAPTION_STYLE)
+    for name, (kind, minimum) in _STYLE_FIELDS.items():
+        value = values.get(name)
+        if value in (None, ''):
+            continue
+        try:
+            value = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Geçersiz {name}: {value}")
+        if not math.isfinite(value) or value < minimum:
+            raise ValueError(f"Geçersiz {name}: {value} (en az {minimum})")
+        style[name] = value
+
+    if style["min_duration"] > style["max_duration"]:
+        raise ValueError("min_duration, max_duration değerinden büyük olamaz")
+    return style
+
+
+def iter_words(segments):
+    """Segmentlerdeki kelimeleri (başlangıç, bitiş, metin, olasılık, öncesinde boşluk var mı) olarak üret.
+
+    Kelime zamanlaması olmayan segmentlerde (eski önbellek kayıtları, word_timestamps kapalı)
+    metin boşluklardan bölünür ve segment süresi karakter sayısına göre dağıtılır.
+    """
+    for segment in segments:
+        words = segment_value(segment, 'words')
+        if words:
+            for word in words:
+                if isinstance(word, dict):
+                    # Önbellekten gelen segmentler (hızlı yol)
+                    start, end, raw, probability = word["start"], word["end"], word["word"], word.get("probability")
+                else:
+                    start, end = segment_value(word, 'start'), segment_value(word, 'end')
+                    raw, probability = segment_value(word, 'word'), segment_value(word, 'probability')
+                text = (raw or '').strip()
+                if text:
+                    yield start, end, text, probability, raw[:1].isspace()
+            continue
+
+        tokens = (segment_value(segment, 'text') or '').split()
+        if not tokens:
+            continue
+        start = segment_value(segment, 'start')
+        end = segment_value(segment, 'end')
+        seconds_per_char = (end - start) / sum(len(token) for token in tokens)
+        position = start
+        for token in tokens:
+            token_end = position + len(token) * seconds_per_char
+            yield position, token_end, token, None, True
+            position = token_end
+
+
+def _layout(words, width):
+    """Kelimeleri en fazla width karakterlik satırlara açgözlü yerleştir, satır listesi döndür"""
+    lines = []
+    line = ''
+    for _, _, text, _, spaced in words:
+        if not line:
+            line = text
+        elif len(line) + spaced + len(text) <= width:
+            line += (' ' if spaced else '') + text
+        else:
+            lines.append(line)
+            line = text
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _balance_two_lines(words, max_chars_per_line):
+    """İki satırlık cue'yu uzun satırı en kısa olacak kelime sınırından tek geçişte böl"""
+    total = sum(len(word[2]) + word[4] for word in words) - words[0][4]
+    best, best_index = None, None
+    left = 0
+    for index in range(1, len(words)):
+        left += len(words[index - 1][2]) + (words[index - 1][4] if index > 1 else 0)
+        right = total - left - words[index][4]
+        longest = max(left, right)
+        if longest <= max_chars_per_line and (best is None or longest < best):
+            best, best_index = longest, index
+    if best_index is None:
+        return None
+    return "\n".join(_layout(part, max_chars_per_line)[0] for part in (words[:best_index], words[best_index:]))
+
+
+def break_lines(words, max_chars_per_line):
+    """Cue metnini satırlara böl; satır sayısını koruyarak satır uzunluklarını dengele.
+
+    "Uzun ilk satır + tek kelimelik ikinci satır" yerine iki satırda en dengeli kelime sınırı seçilir;
+    daha fazla satırda aynı satır sayısını veren en dar genişlik ikili arama ile bulunur
+    (cue en fazla max_chars_per_line * max_lines karakter olduğundan cue başına maliyet sabittir).
+    """
+    lines = _layout(words, max_chars_per_line)
+    if len(lines) < 2:
+        return "\n".join(lines)
+    if len(lines) == 2:
+        return _balance_two_lines(words, max_chars_per_line) or "\n".join(lines)
+
+    total = sum(len(line) for line in lines) + len(lines) - 1
+    low = max(math.ceil(total / len(lines)), max(len(word[2]) for word in words))
+    high = max_chars_per_line
+    while low < high:
+        width = (low + high) // 2
+        if len(_layout(words, width)) <= len(lines):
+            high = width
+        else:
+            low = width + 1
+    if low < max_chars_per_line:
+        lines = _layout(words, low)
+    return "\n".join(lines)
+
+
+class _Cue:
+    """Oluşturulmakta olan cue: kelimeler ve satır yerleşiminin artımlı durumu"""
+
+    __slots__ = ("words", "lines", "line_chars", "chars")
+
+    def __init__(self):
+        self.words = []
+        self.lines = 0
+        self.line_chars = 0
+        self.chars = 0
+
+    def fits(self, word, max_chars_per_line, max_lines):
+        """Kelime eklenince cue max_lines satıra sığıyor mu (açgözlü yerleşim, O(1))"""
+        if not self.words:
+            return True
+        if self.line_chars + word[4] + len(word[2]) <= max_chars_per_line:
+            return True
+        return self.lines < max_lines
+
+    def add(self, word, max_chars_per_line):
+        text_length = len(word[2])
+        if not self.words:
+            self.lines, self.line_chars = 1, text_length
+        elif self.line_chars + word[4] + text_length <= max_chars_per_line:
+            self.line_chars += word[4] + text_length
+        else:
+            self.lines += 1
+            self.line_chars = text_length
+        self.chars += text_length + (word[4] if self.words else 0)
+        self.words.append(word)
+
+
+def resegment(segments, style=None):
+    """Segmentleri stil sınırlarına göre yeniden bölünmüş / birleştirilmiş cue listesine çevir.
+
+    Kurallar (her kelime için sabit sayıda kontrol):
+      - satır yerleşimi max_lines'ı aşacaksa, cue süresi max_duration'ı aşacaksa,
+        kelimeler arasında max_gap'ten uzun sessizlik varsa veya okuma hızını karşılamak için
+        gereken süre max_duration'ı aşacaksa yeni cue başlar
+      - cümle sonunda (. ! ? ...) cue en az min_duration uzunluğundaysa bölünür
+    Ardından cue bitişleri min_duration ve max_cps için gereken süreye kadar uzatılır
+    (sonraki cue'nun başlangıcını ve max_duration'ı geçmeden).
+
+    Dönen segmentler start, end, text (satırlar \\n ile ayrılmış) ve words alanlarını içerir.
+    """
+    style = style or DEFAULT_CAPTION_STYLE
+    max_chars_per_line = style["max_chars_per_line"]
+    max_lines = style["max_lines"]
+    max_cps = style["max_cps"]
+    min_duration = style["min_duration"]
+    max_duration = style["max_duration"]
+    max_gap = style["max_gap"]
+
+    cues = []
+    cue = _Cue()
+    previous_end = None
+    for word in iter_words(segments):
+        start, end, text = word[0], word[1], word[2]
+        if cue.words:
+            cue_start = cue.words[0][0]
+            previous_text = cue.words[-1][2]
+            chars = cue.chars + word[4] + len(text)
+            if (not cue.fits(word, max_chars_per_line, max_lines)
+                    or end - cue_start > max_duration
+                    or start - previous_end > max_gap
+                    or chars / max_cps > max_duration
+                    or (previous_text.endswith(_SENTENCE_END) and previous_end - cue_start >= min_duration)):
+                cues.append(cue)
+                cue = _Cue()
+        cue.add(word, max_chars_per_line)
+        previous_end = end
+    if cue.words:
+        cues.append(cue)
+
+    result = []
+    for index, cue in enumerate(cues):
+        start = cue.words[0][0]
+        end = cue.words[-1][1]
+        # Okuma süresi: min_duration ve max_cps'e göre gereken süreye uzat
+        wanted_end = start + min(max(min_duration, cue.chars / max_cps), max_duration)
+        if wanted_end > end:
+            limit = cues[index + 1].words[0][0] if index + 1 < len(cues) else wanted_end
+            end = max(end, min(wanted_end, limit))
+        result.append({
+            "start": start,
+            "end": end,
+            "text": break_lines(cue.words, max_chars_per_line),
+            "words": [
+                {"start": w[0], "end": w[1], "word": (' ' if w[4] else '') + w[2], "probability": w[3]}
+                for w in cue.words
+            ]
+        })
+
+    logger.debug(f"Yeniden segmentleme: {len(segments)} segment → {len(result)} cue")
+    return result
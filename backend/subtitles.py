@@ -0,0 +1,290 @@
+"""
+Altyazı çıktı formatları.
+SRT, WebVTT, JSON (kelime zamanlamalı) ve Premiere Pro XML çıktıları artımlı (incremental) writer
+olarak üretilir: her segment decode edildiği anda kendi parçası yazılabilir, tüm liste bellekte tutulmaz.
+"""
+
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Premiere timebase: saniye başına 254016000000 tick
+PREMIERE_TICKS_PER_SECOND = 254016000000
+
+def segment_value(segment, key):
+    """Faster Whisper (namedtuple) ve OpenAI Whisper (dict) segmentlerinden alan oku"""
+    if isinstance(segment, dict):
+        return segment.get(key)
+    return getattr(segment, key, None)
+
+def segment_to_dict(segment):
+    """Segmenti JSON'a uygun sözlüğe çevir (kelime zamanlamaları dahil)"""
+    words = segment_value(segment, 'words') or []
+    return {
+        "start": segment_value(segment, 'start'),
+        "end": segment_value(segment, 'end'),
+        "text": segment_value(segment, 'text').strip(),
+        "words": [
+            {
+                "start": segment_value(word, 'start'),
+                "end": segment_value(word, 'end'),
+                "word": segment_value(word, 'word'),
+                "probability": segment_value(word, 'probability')
+            }
+            for word in words
+        ]
+    }
+
+def to_microseconds(seconds):
+    """Saniyeyi tam sayı mikrosaniyeye yuvarla (datetime.timedelta ile aynı yuvarlama)"""
+    return round(seconds * 1000000)
+
+def format_timestamp(microseconds, separator=','):
+    """Mikrosaniyeyi SRT (00:00:00,000) veya WebVTT (00:00:00.000) zaman damgasına çevir"""
+    milliseconds = microseconds // 1000
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+# Cue metninde boş satır olamaz (boş satır cue'yu bitirir)
+_BLANK_LINES = re.compile(r"\n\n+")
+
+def cue_text(text):
+    """Boş satırları birleştir (srt kütüphanesinin make_legal_content kuralı)"""
+    if "\n\n" in text:
+        return _BLANK_LINES.sub("\n", text)
+    return text
+
+def cue_times(segment):
+    """Cue olarak yazılacak segmentin (başlangıç, bitiş, metin) değerleri; atlanacaksa None.
+
+    Boş metinli, negatif başlangıçlı veya süresi sıfır/negatif olan segmentler atlanır.
+    """
+    text = segment_value(segment, 'text').strip()
+    start = segment_value(segment, 'start')
+    end = segment_value(segment, 'end')
+    if not text or start < 0 or start >= end:
+        return None
+    return to_microseconds(start), to_microseconds(end), cue_text(text)
+
+class SrtWriter:
+    """Artımlı SRT writer.
+
+    Cue'lar geliş sırasıyla, cue başına nesne oluşturmadan tek geçişte yazılır; segmentler zaman
+    sırasında olmalıdır (Whisper çıktısı öyledir). srt.compose cue'ları sıralayıp yeniden
+    numaralandırdığından çıktı sadece sıralı ve eşit zamanlı olmayan segmentlerde onunla aynıdır.
+    """
+
+    filename = "subtitles.srt"
+    mimetype = "text/plain"
+
+    def __init__(self):
+        self.index = 0
+
+    def header(self):
+        return ""
+
+    def write(self, segment):
+        """Tek segmentin SRT cue'su (atlanan segmentler için boş string)"""
+        cue = cue_times(segment)
+        if cue is None:
+            return ""
+        start, end, text = cue
+        self.index += 1
+        return f"{self.index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n"
+
+    def footer(self):
+        return ""
+
+class VttWriter:
+    """Artımlı WebVTT writer (SRT ile aynı cue'lar, metin HTML kaçışlı)"""
+
+    filename = "subtitles.vtt"
+    mimetype = "text/vtt"
+
+    def __init__(self):
+        self.index = 0
+
+    def header(self):
+        return "WEBVTT\n\n"
+
+    def write(self, segment):
+        cue = cue_times(segment)
+        if cue is None:
+            return ""
+        start, end, text = cue
+        self.index += 1
+        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return f"{self.index}\n{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n\n"
+
+    def footer(self):
+        return ""
+
+# ensure_ascii=False ile json.dumps'ın kullandığı string kaçışı
+_json_string = json.encoder.encode_basestring
+
+def _json_time(value):
+    """Zaman / olasılık değerini 3 ondalıkla JSON sayısı olarak yaz"""
+    return "null" if value is None else f"{value:.3f}"
+
+class JsonWriter:
+    """Artımlı, kompakt JSON writer (kelime zamanlamaları dahil).
+
+    Kelimeler [start, end, word, probability] dizileri olarak yazılır; panel altyazıyı
+    sesi tekrar göndermeden yerelde yeniden bölebilir.
+    """
+
+    filename = "subtitles.json"
+    mimetype = "application/json"
+
+    def __init__(self):
+        self.index = 0
+
+    def header(self):
+        return '{"version":1,"word_fields":["start","end","word","probability"],"segments":['
+
+    def write(self, segment):
+        text = segment_value(segment, 'text').strip()
+        if not text:
+            return ""
+        # Sayılar doğrudan, metinler json.dumps ile yazılır (segment başına sözlük kurulmaz)
+        words = ",".join(
+            f"[{_json_time(segment_value(word, 'start'))},{_json_time(segment_value(word, 'end'))},"
+            f"{_json_string(segment_value(word, 'word'))},{_json_time(segment_value(word, 'probability'))}]"
+            for word in segment_value(segment, 'words') or []
+        )
+        # Parça bazında dil tespitinde segmentin dili de yazılır
+        language = segment_value(segment, 'language')
+        data = (
+            f'{{"start":{_json_time(segment_value(segment, "start"))},'
+            f'"end":{_json_time(segment_value(segment, "end"))},'
+            f'"text":{_json_string(text)},'
+            + (f'"language":{_json_string(language)},' if language else '')
+            + f'"words":[{words}]}}'
+        )
+        self.index += 1
+        return data if self.index == 1 else "," + data
+
+    def footer(self):
+        return "]}\n"
+
+def iter_document(writer, segments):
+    """Writer ile segment akışından dokümanı parça parça üret"""
+    yield writer.header()
+    for segment in segments:
+        yield writer.write(segment)
+    yield writer.footer()
+
+def create_srt_subtitles(segments):
+    """Whisper segments'lerinden SRT formatında altyazı oluştur"""
+    try:
+        return "".join(iter_document(SrtWriter(), segments))
+    except Exception as e:
+        logger.error(f"SRT oluşturma hatası: {e}")
+        raise
+
+# XML 1.0'da izin verilmeyen kontrol karakterleri (Whisper çıktısında nadiren görülür)
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+def xml_escape(value):
+    """Metni XML'e yaz: minidom ile aynı kaçış kuralları (&, <, ", >), satır sonları \n'e normalize edilir"""
+    value = _INVALID_XML_CHARS.sub('', value.replace('\r\n', '\n').replace('\r', '\n'))
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+class PremiereXmlWriter:
+    """Artımlı Premiere Pro XML writer.
+
+    Ağaç kurmadan her caption'ı doğrudan string olarak üretir. indent=True çıktısı, tüm ağacı
+    ElementTree ile kurup minidom ile güzel formatlamakla birebir aynıdır; indent=False boşluksuz yazar.
+    """
+
+    filename = "subtitles.xml"
+    mimetype = "application/xml"
+
+    def __init__(self, sequence_name="AI Generated Subtitles", indent=True,
+                 font="Arial", size=24, color="FFFFFF"):
+        self.sequence_name = sequence_name
+        self.index = 0
+        self._newline = "\n" if indent else ""
+        self._indent_unit = "  " if indent else ""
+        # Caption'ın sabit parçaları bir kez hazırlanır, write() sadece değişken alanları araya koyar
+        self._caption_open = self._indent_unit * 6 + '<caption id="caption-'
+        self._after_id = '">' + self._newline + self._indent_unit * 7 + '<start>'
+        self._after_start = '</start>' + self._newline + self._indent_unit * 7 + '<end>'
+        self._after_end = '</end>' + self._newline + self._indent_unit * 7
+        self._caption_close = (
+            self._newline +
+            self._line(7, "<properties>") +
+            self._line(8, f'<property id="font">{xml_escape(font)}</property>') +
+            self._line(8, f'<property id="size">{xml_escape(str(size))}</property>') +
+            self._line(8, f'<property id="color">{xml_escape(color)}</property>') +
+            self._line(7, "</properties>") +
+            self._line(6, "</caption>")
+        )
+
+    def _line(self, level, content):
+        return f"{self._indent_unit * level}{content}{self._newline}"
+
+    def header(self):
+        """Caption track'e kadar olan XML başlığı"""
+        return (
+            '<?xml version="1.0" ?>\n' +
+            self._line(0, '<xmeml version="4">') +
+            self._line(1, '<project>') +
+            self._line(2, '<sequence id="sequence-1">') +
+            self._line(3, f'<name>{xml_escape(self.sequence_name)}</name>') +
+            self._line(3, '<media>') +
+            self._line(4, '<captions>')
+        )
+
+    def write(self, segment):
+        """Tek segmentin caption elementi (ilk segmentte caption track açılır)"""
+        self.index += 1
+        text = xml_escape(segment_value(segment, 'text').strip())
+        caption = "".join((
+            self._caption_open, str(self.index),
+            self._after_id, str(int(segment_value(segment, 'start') * PREMIERE_TICKS_PER_SECOND)),
+            self._after_start, str(int(segment_value(segment, 'end') * PREMIERE_TICKS_PER_SECOND)),
+            self._after_end, f"<text>{text}</text>" if text else "<text/>",
+            self._caption_close
+        ))
+        if self.index == 1:
+            return self._line(5, '<caption_track id="caption-track-1">') + caption
+        return caption
+
+    def footer(self):
+        if self.index:
+            track_close = self._line(5, '</caption_track>')
+        else:
+            track_close = self._line(5, '<caption_track id="caption-track-1"/>')
+        return (
+            track_close +
+            self._line(4, '</captions>') +
+            self._line(3, '</media>') +
+            self._line(2, '</sequence>') +
+            self._line(1, '</project>') +
+            self._line(0, '</xmeml>')
+        )
+
+def create_premiere_xml(segments, sequence_name="AI Generated Subtitles"):
+    """Whisper segments'lerinden Premiere Pro XML formatında altyazı oluştur"""
+    try:
+        return "".join(iter_document(PremiereXmlWriter(sequence_name), segments))
+    except Exception as e:
+        logger.error(f"XML oluşturma hatası: {e}")
+        raise
+
+# 'format' alanının alabileceği değerler (bilinmeyen formatlar SRT olarak yazılır)
+SUBTITLE_WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "json": JsonWriter,
+    "xml": PremiereXmlWriter
+}
+
+def subtitle_writer(output_format):
+    """Format adına göre yeni bir artımlı writer"""
+    return SUBTITLE_WRITERS.get((output_format or 'srt').lower(), SrtWriter)()
@@ -0,0 +1,167 @@
+"""
+Parçalı (chunked) ve kaldığı yerden devam ettirilebilir (resumable) upload'lar.
+Panel sesi parçalar halinde gönderir; bağlantı koparsa sunucudaki ofseti sorgulayıp
+eksik kısımdan devam eder. Tamamlanan upload transkripsiyon isteklerinde upload_id ile kullanılır.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(Exception):
+    """Upload isteği geçersiz olduğunda fırlatılır (status: HTTP durum kodu)"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class UploadStore:
+    """Disk üzerinde, süre sınırlı upload deposu"""
+
+    def __init__(self, directory, max_bytes, retention_seconds=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _data_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def _load_meta(self, upload_id):
+        # upload_id dosya adında kullanıldığı için sadece uuid hex kabul edilir
+        if len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+            raise UploadError("Upload bulunamadı", status=404)
+        try:
+            with open(self._meta_path(upload_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            raise UploadError("Upload bulunamadı", status=404)
+
+    def _save_meta(self, meta):
+        temp_path = self._meta_path(meta["upload_id"]) + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._meta_path(meta["upload_id"]))
+
+    def create(self, filename, size=None):
+        """Yeni upload başlat, upload bilgisini döndür"""
+        if size is not None and size > self.max_bytes:
+            raise UploadError(f"Upload boyutu sınırı aşıyor ({self.max_bytes} bayt)", status=413)
+        self.purge_expired()
+        meta = {
+            "upload_id": uuid.uuid4().hex,
+            "filename": filename,
+            "size": size,
+            "created_at": time.time()
+        }
+        open(self._data_path(meta["upload_id"]), "wb").close()
+        self._save_meta(meta)
+        logger.info(f"Upload başlatıldı: {meta['upload_id']} ({filename}, {size} bayt)")
+        return self.status(meta["upload_id"])
+
+    def append(self, upload_id, offset, data):
+        """offset'ten itibaren parçayı ekle, yeni ofseti döndür.
+
+        Ofset sunucudaki boyutla uyuşmazsa 409 ile güncel ofset bildirilir; istemci oradan devam eder.
+        """
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            path = self._data_path(upload_id)
+            current = os.path.getsize(path)
+            if offset != current:
+                raise UploadError("Ofset uyuşmuyor", status=409, offset=current)
+            limit = meta["size"] if meta["size"] is not None else self.max_bytes
+            if current + len(data) > limit:
+                raise UploadError("Upload boyutu aşıldı", status=413, offset=current)
+            with open(path, "ab") as f:
+                f.write(data)
+            return current + len(data)
+
+    def status(self, upload_id):
+        """Upload durumu: alınan bayt sayısı ve tamamlanıp tamamlanmadığı"""
+        meta = self._load_meta(upload_id)
+        try:
+            offset = os.path.getsize(self._data_path(upload_id))
+        except FileNotFoundError:
+            raise UploadError("Upload bulunamadı", status=404)
+        return {
+            "upload_id": upload_id,
+            "filename": meta["filename"],
+            "offset": offset,
+            "size": meta["size"],
+            "complete": meta["size"] is None or offset == meta["size"]
+        }
+
+    def _complete(self, upload_id):
+        info = self.status(upload_id)
+        if not info["complete"]:
+            raise UploadError(f"Upload tamamlanmadı ({info['offset']}/{info['size']} bayt)",
+                              status=409, offset=info["offset"])
+        return info
+
+    def get(self, upload_id):
+        """Tamamlanan upload: (veri dosyası yolu, dosya adı).
+
+        Upload depoda kalır; istek başarısız olursa istemci aynı upload_id ile tekrar dener.
+        İş bitince delete ile silinir.
+        """
+        with self._lock:
+            info = self._complete(upload_id)
+        return self._data_path(upload_id), info["filename"]
+
+    def take(self, upload_id):
+        """Tamamlanan upload'ı depodan çıkar: (geçici dosya yolu, dosya adı).
+
+        Veri dosyası önce depo dışına taşınır, sonra kayıt silinir; arada process kapanırsa
+        kalan kayıt purge_expired ile temizlenir. Dosyanın silinmesi çağıranın sorumluluğundadır.
+        """
+        with self._lock:
+            info = self._complete(upload_id)
+            fd, target = tempfile.mkstemp(suffix=os.path.splitext(info["filename"])[1] or ".wav")
+            os.close(fd)
+            shutil.move(self._data_path(upload_id), target)
+            os.unlink(self._meta_path(upload_id))
+        return target, info["filename"]
+
+    def delete(self, upload_id):
+        """Upload'ı sil (önce veri, sonra kayıt: kayıt kalırsa purge_expired bulur)"""
+        with self._lock:
+            self._load_meta(upload_id)
+            for path in (self._data_path(upload_id), self._meta_path(upload_id)):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def purge_expired(self):
+        """Saklama süresi dolan yarım upload'ları sil (son parçanın alındığı zamana göre)"""
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-len(".json")]
+            try:
+                last_activity = os.path.getmtime(self._data_path(upload_id))
+            except FileNotFoundError:
+                last_activity = 0
+            if last_activity < cutoff:
+                for path in (self._data_path(upload_id), self._meta_path(upload_id)):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                logger.debug(f"Süresi dolan upload silindi: {upload_id}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Inference düğümü (yatay ölçekleme).
+
+    CLUSTER_DIR=/data/cluster python worker.py
+
+Düğüm paylaşılan CLUSTER_DIR'e kaydolur, yüklü modellerini ve boş slotlarını heartbeat ile bildirir,
+ön yüzün (CLUSTER_ROLE=frontend) kendisine yönlendirdiği işleri çekip çalıştırır. HTTP portu açmaz.
+Aynı makinede birden fazla düğüm çalıştırılabilir; her biri kendi model kopyasını yükler.
+
+SIGTERM / Ctrl+C: yeni iş alınmaz, çalışan işler DRAIN_TIMEOUT saniyeye kadar bitirilir.
+"""
+
+import os
+import signal
+import sys
+import threading
+
+os.environ["CLUSTER_ROLE"] = "worker"
+# Servisler sinyal handler'ları kurulduktan sonra başlatılır
+os.environ["AUTOSTART_SERVICES"] = "false"
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+if __name__ == '__main__':
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    from app import CLUSTER_DIR, JOB_WORKERS, WHISPER_MODEL, drain_and_stop, start_background_services
+
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_requested.set())
+
+    print("=" * 60)
+    print("Adobe Premiere Pro AI Altyazı Eklentisi - Inference Düğümü")
+    print("=" * 60)
+    print(f"Cluster dizini: {os.path.abspath(CLUSTER_DIR)}")
+    print(f"Whisper Model: {WHISPER_MODEL}")
+    print(f"Slot: {JOB_WORKERS}")
+    print("Durdurmak için Ctrl+C basın")
+    print("=" * 60)
+
+    start_background_services()
+    while not stop_requested.wait(1.0):
+        pass
+    drain_and_stop()
+    print("\nDüğüm durduruldu.")
@@ -7,6 +7,37 @@ class ApiClient {
     constructor(baseUrl = 'http://localhost:5000') {
         this.baseUrl = baseUrl;
         this.timeout = 30000; // 30 saniye timeout
+        this.pollInterval = 2000; // Job durumu sorgulama aralığı
+        this.uploadRetries = 5; // Parça başına tekrar deneme sayısı
+        this.busyRetries = 10; // Sunucu yoğunken (429) job gönderimini tekrar deneme sayısı
+        this.uploadCapabilities = null; // /health ile bildirilen upload ayarları
+        this.clientId = this.loadClientId(); // Backend'in istemciler arası adil sıralaması için
+    }
+
+    /**
+     * Panelin kalıcı istemci kimliği (ilk çalıştırmada oluşturulur, localStorage'da saklanır)
+     */
+    loadClientId() {
+        const key = 'aiSubtitlesClientId';
+        try {
+            let clientId = localStorage.getItem(key);
+            if (!clientId) {
+                clientId = `panel-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+                localStorage.setItem(key, clientId);
+            }
+            return clientId;
+        } catch (error) {
+            return null;
+        }
+    }
+
+    /**
+     * İstemci kimliğini form verisine ekle
+     */
+    appendClientId(formData) {
+        if (this.clientId) {
+            formData.append('client_id', this.clientId);
+        }
     }
 
     /**
@@ -23,6 +54,7 @@ class ApiClient {
 
             if (response.ok) {
                 const data = await response.json();
+                this.uploadCapabilities = data.upload || null;
                 return {
                     success: true,
                     data: data
@@ -41,6 +73,90 @@ class ApiClient {
         }
     }
 
+    /**
+     * Backend parçalı upload destekliyorsa ve dosya tek parçadan büyükse true
+     */
+    shouldUploadChunked(audioFile) {
+        const capabilities = this.uploadCapabilities;
+        return Boolean(capabilities && capabilities.chunked && audioFile.size > capabilities.chunk_bytes);
+    }
+
+    /**
+     * Ses dosyasını parçalar halinde yükle, upload_id döndür.
+     * Bir parça başarısız olursa sunucudaki ofset sorgulanır ve kalan kısımdan devam edilir.
+     * onProgress(sentBytes, totalBytes) her parçadan sonra çağrılır.
+     */
+    async uploadChunked(audioFile, filename = 'audio.wav', onProgress = null) {
+        try {
+            const createResponse = await this.fetchWithTimeout(`${this.baseUrl}/uploads`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ filename: filename, size: audioFile.size })
+            });
+            const upload = await createResponse.json();
+            if (!createResponse.ok) {
+                return {
+                    success: false,
+                    error: `HTTP ${createResponse.status}: ${upload.error || createResponse.statusText}`
+                };
+            }
+
+            const uploadUrl = `${this.baseUrl}/uploads/${upload.upload_id}`;
+            let offset = upload.offset;
+            let failures = 0;
+            while (offset < audioFile.size) {
+                const chunk = audioFile.slice(offset, offset + upload.chunk_bytes);
+                try {
+                    const response = await this.fetchWithTimeout(uploadUrl, {
+                        method: 'PATCH',
+                        headers: {
+                            'Content-Type': 'application/octet-stream',
+                            'Upload-Offset': String(offset)
+                        },
+                        body: chunk
+                    });
+                    const data = await response.json();
+                    if (response.ok || response.status === 409) {
+                        // 409: sunucu farklı bir ofsette, oradan devam edilir
+                        offset = data.offset;
+                        failures = 0;
+                    } else {
+                        throw new Error(`HTTP ${response.status}: ${data.error || response.statusText}`);
+                    }
+                } catch (error) {
+                    failures += 1;
+                    if (failures > this.uploadRetries) {
+                        return {
+                            success: false,
+                            error: `Upload başarısız: ${error.message}`
+                        };
+                    }
+                    await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+                    // Bağlantı koptuysa sunucunun aldığı son ofseti öğren
+                    const status = await this.fetchWithTimeout(uploadUrl, { method: 'GET' }).catch(() => null);
+                    if (status && status.ok) {
+                        offset = (await status.json()).offset;
+                    }
+                }
+                if (onProgress) {
+                    onProgress(offset, audioFile.size);
+                }
+            }
+
+            return {
+                success: true,
+                data: { uploadId: upload.upload_id }
+            };
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
     /**
      * Ses dosyasını transkribe et
      */
@@ -49,6 +165,7 @@ class ApiClient {
             const formData = new FormData();
             formData.append('audio', audioFile);
             formData.append('format', format);
+            this.appendClientId(formData);
 
             const response = await this.fetchWithTimeout(`${this.baseUrl}/transcribe`, {
                 method: 'POST',
@@ -60,7 +177,11 @@ class ApiClient {
                 return {
                     success: true,
                     data: blob,
-                    contentType: response.headers.get('content-type')
+                    contentType: response.headers.get('content-type'),
+                    transcriptKey: response.headers.get('X-Transcript-Key'),
+                    language: response.headers.get('X-Language'),
+                    profile: response.headers.get('X-Profile'),
+                    timings: this.parseServerTiming(response.headers.get('Server-Timing'))
                 };
             } else {
                 const errorText = await response.text();
@@ -77,6 +198,332 @@ class ApiClient {
         }
     }
 
+    /**
+     * Önbellekteki transkripsiyonu yeniden decode etmeden farklı format / altyazı stiliyle üret.
+     * style: { max_chars_per_line, max_lines, max_cps, min_duration, max_duration, max_gap }
+     */
+    async renderTranscript(transcriptKey, format = 'srt', style = {}) {
+        try {
+            const response = await this.fetchWithTimeout(`${this.baseUrl}/render`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-Transcript-Key': transcriptKey
+                },
+                body: JSON.stringify({ format, ...style })
+            });
+
+            if (response.ok) {
+                const blob = await response.blob();
+                return {
+                    success: true,
+                    data: blob,
+                    contentType: response.headers.get('content-type'),
+                    transcriptKey,
+                    timings: this.parseServerTiming(response.headers.get('Server-Timing'))
+                };
+            } else {
+                const errorText = await response.text();
+                return {
+                    success: false,
+                    status: response.status,
+                    error: `HTTP ${response.status}: ${errorText}`
+                };
+            }
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
+    /**
+     * Server-Timing header'ını { aşama: milisaniye } nesnesine çevir (header yoksa null)
+     */
+    parseServerTiming(header) {
+        if (!header) {
+            return null;
+        }
+        const timings = {};
+        header.split(',').forEach(entry => {
+            const [name, ...params] = entry.trim().split(';');
+            const duration = params.find(param => param.trim().startsWith('dur='));
+            if (name && duration) {
+                timings[name] = parseFloat(duration.trim().substring(4));
+            }
+        });
+        return timings;
+    }
+
+    /**
+     * Ses dosyasını transkribe et, segmentleri decode edildikçe al (Server-Sent Events).
+     * onEvent(event, data) her olayda çağrılır; data.chunk parçaları birleşince tam dosya oluşur.
+     */
+    async transcribeAudioStream(audioFile, format = 'srt', onEvent = null) {
+        try {
+            const formData = new FormData();
+            formData.append('audio', audioFile);
+            formData.append('format', format);
+            this.appendClientId(formData);
+
+            // Stream uzun sürebilir, fetchWithTimeout kullanılmaz
+            const response = await fetch(`${this.baseUrl}/transcribe/stream`, {
+                method: 'POST',
+                body: formData
+            });
+
+            if (!response.ok) {
+                const errorText = await response.text();
+                return {
+                    success: false,
+                    error: `HTTP ${response.status}: ${errorText}`
+                };
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder('utf-8');
+            let buffer = '';
+            let content = '';
+            let contentType = 'text/plain';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const rawEvent = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let event = 'message';
+                    let dataLine = '';
+                    rawEvent.split('\n').forEach(line => {
+                        if (line.startsWith('event: ')) {
+                            event = line.slice(7);
+                        } else if (line.startsWith('data: ')) {
+                            dataLine += line.slice(6);
+                        }
+                    });
+
+                    const data = JSON.parse(dataLine);
+                    if (event === 'error') {
+                        return {
+                            success: false,
+                            error: data.error
+                        };
+                    }
+                    if (event === 'info' && format === 'xml') {
+                        contentType = 'application/xml';
+                    }
+                    content += data.chunk || '';
+                    if (onEvent) {
+                        onEvent(event, data);
+                    }
+                }
+            }
+
+            return {
+                success: true,
+                data: new Blob([content], { type: contentType }),
+                contentType: contentType
+            };
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
+    /**
+     * Ses dosyasını asenkron job kuyruğuna gönder.
+     * options.sequenceId verilirse backend aynı sequence'in önceki export'uyla
+     * karşılaştırıp sadece değişen bölgeleri transkribe eder.
+     * options.model verilirse varsayılan model yerine o model kullanılır.
+     * options.language: dil kodu veya 'auto' (otomatik tespit); options.languageSwitching ile
+     * 'auto' dili parça bazında tespit eder (karışık dilli kayıtlar).
+     * options.profile: kalite / hız profili (draft, balanced, final, adaptive).
+     * options.priority: 'interactive' veya 'bulk' (boşsa backend ses süresine göre seçer).
+     * options.uploadId verilirse dosya yerine tamamlanmış parçalı upload kullanılır.
+     */
+    async submitJob(audioFile, format = 'srt', options = {}) {
+        try {
+            const formData = new FormData();
+            if (options.uploadId) {
+                formData.append('upload_id', options.uploadId);
+            } else {
+                formData.append('audio', audioFile, options.filename || 'audio.wav');
+            }
+            formData.append('format', format);
+            if (options.sequenceId) {
+                formData.append('sequence_id', options.sequenceId);
+            }
+            if (options.model) {
+                formData.append('model', options.model);
+            }
+            if (options.profile) {
+                formData.append('profile', options.profile);
+            }
+            if (options.priority) {
+                formData.append('priority', options.priority);
+            }
+            this.appendClientId(formData);
+            if (options.language) {
+                formData.append('language', options.language);
+                if (options.languageSwitching) {
+                    formData.append('language_switching', 'true');
+                }
+            }
+
+            const response = await this.fetchWithTimeout(`${this.baseUrl}/jobs`, {
+                method: 'POST',
+                body: formData
+            });
+
+            const data = await response.json();
+            if (response.ok) {
+                return {
+                    success: true,
+                    data: data
+                };
+            } else {
+                return {
+                    success: false,
+                    status: response.status,
+                    retryAfter: parseInt(response.headers.get('Retry-After'), 10) || null,
+                    error: `HTTP ${response.status}: ${data.error || response.statusText}`
+                };
+            }
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
+    /**
+     * Job durumunu ve ilerlemesini al
+     */
+    async getJob(jobId) {
+        try {
+            const response = await this.fetchWithTimeout(`${this.baseUrl}/jobs/${jobId}`, {
+                method: 'GET'
+            });
+
+            const data = await response.json();
+            if (response.ok) {
+                return {
+                    success: true,
+                    data: data
+                };
+            } else {
+                return {
+                    success: false,
+                    error: `HTTP ${response.status}: ${data.error || response.statusText}`
+                };
+            }
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
+    /**
+     * Tamamlanan job'un altyazı çıktısını indir
+     */
+    async getJobResult(jobId, format = 'srt') {
+        try {
+            const response = await this.fetchWithTimeout(
+                `${this.baseUrl}/jobs/${jobId}/result?format=${encodeURIComponent(format)}`,
+                { method: 'GET' }
+            );
+
+            if (response.status === 200) {
+                const blob = await response.blob();
+                return {
+                    success: true,
+                    data: blob,
+                    contentType: response.headers.get('content-type'),
+                    transcriptKey: response.headers.get('X-Transcript-Key'),
+                    language: response.headers.get('X-Language'),
+                    profile: response.headers.get('X-Profile'),
+                    timings: this.parseServerTiming(response.headers.get('Server-Timing'))
+                };
+            } else {
+                const errorText = await response.text();
+                return {
+                    success: false,
+                    error: `HTTP ${response.status}: ${errorText}`
+                };
+            }
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
+    /**
+     * Job kuyruğu üzerinden transkripsiyon: gönder, tamamlanana kadar sorgula, sonucu indir.
+     * Uzun sequence'lerde tek isteğin timeout'a düşmesini engeller.
+     * Büyük dosyalar backend destekliyorsa parçalı upload ile gönderilir
+     * (options.onUploadProgress(sentBytes, totalBytes) ile takip edilir).
+     */
+    async transcribeAudioAsync(audioFile, format = 'srt', onProgress = null, options = {}) {
+        if (!options.uploadId && this.shouldUploadChunked(audioFile)) {
+            const uploadResult = await this.uploadChunked(
+                audioFile, options.filename || 'audio.wav', options.onUploadProgress
+            );
+            if (!uploadResult.success) {
+                return uploadResult;
+            }
+            options = { ...options, uploadId: uploadResult.data.uploadId };
+        }
+
+        let submitResult = await this.submitJob(audioFile, format, options);
+        // Sunucu yoğunsa (429) Retry-After kadar bekleyip tekrar dene
+        for (let attempt = 0; attempt < this.busyRetries && submitResult.status === 429; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, (submitResult.retryAfter || 5) * 1000));
+            submitResult = await this.submitJob(audioFile, format, options);
+        }
+        if (!submitResult.success) {
+            return submitResult;
+        }
+
+        const jobId = submitResult.data.id;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, this.pollInterval));
+
+            const jobResult = await this.getJob(jobId);
+            if (!jobResult.success) {
+                return jobResult;
+            }
+
+            const job = jobResult.data;
+            if (onProgress) {
+                onProgress(job);
+            }
+
+            if (job.status === 'done') {
+                return this.getJobResult(jobId, format);
+            }
+            if (job.status === 'error') {
+                return {
+                    success: false,
+                    error: job.error
+                };
+            }
+        }
+    }
+
     /**
      * Kullanılabilir modelleri listele
      */
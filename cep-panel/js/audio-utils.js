@@ -0,0 +1,196 @@
+/**
+ * Audio Utils - Upload öncesi ses hazırlama
+ * Premiere'den dışa aktarılan WAV'ı okur ve backend'in tercih ettiği kompakt formata
+ * (16 kHz, mono, 16 bit PCM) dönüştürür. Whisper 16 kHz mono kullandığından
+ * 44.1 kHz stereo göndermek ~5.5 kat gereksiz veri demektir.
+ */
+
+const COMPACT_SAMPLE_RATE = 16000;
+
+// Yeniden örnekleme filtresi: Blackman pencereli sinc (her yanda 8 sıfır geçişi), kesim yeni
+// Nyquist frekansının %90'ı (16 kHz için 7.2 kHz)
+const FILTER_ZERO_CROSSINGS = 8;
+const FILTER_CUTOFF = 0.9;
+
+/**
+ * Dosyayı Node.js fs ile ArrayBuffer olarak oku (CEP --enable-nodejs)
+ */
+function readAudioFile(path) {
+    const nodeRequire = (window.cep_node && window.cep_node.require) || window.require;
+    if (!nodeRequire) {
+        throw new Error('Node.js erişimi yok, ses dosyası okunamadı');
+    }
+    const fs = nodeRequire('fs');
+    const buffer = fs.readFileSync(path);
+    return buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength);
+}
+
+/**
+ * WAV başlığını oku: { audioFormat, channels, sampleRate, bitsPerSample, dataOffset, dataLength }
+ */
+function parseWavHeader(arrayBuffer) {
+    const view = new DataView(arrayBuffer);
+    if (view.getUint32(0, false) !== 0x52494646 || view.getUint32(8, false) !== 0x57415645) {
+        throw new Error('Geçersiz WAV dosyası');
+    }
+
+    let format = null;
+    let position = 12;
+    while (position + 8 <= view.byteLength) {
+        const chunkId = view.getUint32(position, false);
+        let chunkSize = view.getUint32(position + 4, true);
+        const body = position + 8;
+        if (chunkId === 0x666d7420) { // "fmt "
+            format = {
+                audioFormat: view.getUint16(body, true),
+                channels: view.getUint16(body + 2, true),
+                sampleRate: view.getUint32(body + 4, true),
+                bitsPerSample: view.getUint16(body + 14, true)
+            };
+        } else if (chunkId === 0x64617461) { // "data"
+            if (!format) {
+                throw new Error('WAV fmt bölümü bulunamadı');
+            }
+            chunkSize = Math.min(chunkSize || view.byteLength, view.byteLength - body);
+            return { ...format, dataOffset: body, dataLength: chunkSize };
+        }
+        position = body + chunkSize + (chunkSize & 1);
+    }
+    throw new Error('WAV data bölümü bulunamadı');
+}
+
+function gcd(a, b) {
+    while (b) {
+        [a, b] = [b, a % b];
+    }
+    return a;
+}
+
+/**
+ * Yeniden örnekleme için alçak geçiren FIR ağırlıkları: { weights, taps, reach, period }
+ *
+ * Oran rasyonel olduğundan (ör. 44100/16000 = 441/160) çıktı örneklerinin girişe göre kesirli
+ * konumu 'period' örnekte bir tekrarlar; her konum için ağırlıklar bir kez hesaplanır.
+ * Çıktı i, giriş örnekleri floor(i * ratio) - reach ... + taps - 1 ile hesaplanır.
+ */
+function resampleFilter(sampleRate, targetRate) {
+    const ratio = sampleRate / targetRate;
+    // Kesim frekansı giriş örneği başına devir cinsinden; yukarı örneklemede girişin Nyquist'i sınırdır
+    const cutoff = 0.5 * FILTER_CUTOFF / Math.max(ratio, 1);
+    const halfWidth = FILTER_ZERO_CROSSINGS / (2 * cutoff);
+    const reach = Math.floor(halfWidth);
+    const taps = 2 * reach + 2;
+    const period = targetRate / gcd(sampleRate, targetRate);
+    const weights = new Float32Array(period * taps);
+    for (let phase = 0; phase < period; phase++) {
+        const center = phase * ratio;
+        const offset = Math.floor(center) - reach;
+        let sum = 0;
+        for (let tap = 0; tap < taps; tap++) {
+            const x = Math.abs(offset + tap - center);
+            if (x >= halfWidth) {
+                continue;
+            }
+            const arg = 2 * cutoff * x;
+            const sinc = arg === 0 ? 1 : Math.sin(Math.PI * arg) / (Math.PI * arg);
+            const w = 0.5 + 0.5 * x / halfWidth;
+            const window = 0.42 - 0.5 * Math.cos(2 * Math.PI * w) + 0.08 * Math.cos(4 * Math.PI * w);
+            weights[phase * taps + tap] = sinc * window;
+            sum += sinc * window;
+        }
+        // DC kazancı 1: sessizlik / sabit seviye değişmeden geçer
+        for (let tap = 0; tap < taps; tap++) {
+            weights[phase * taps + tap] /= sum;
+        }
+    }
+    return { weights, taps, reach, period };
+}
+
+/**
+ * 16 bit PCM WAV'ı 16 kHz mono 16 bit PCM WAV'a dönüştür (zaten uygunsa aynen döner)
+ */
+function toCompactWav(arrayBuffer) {
+    const header = parseWavHeader(arrayBuffer);
+    if (header.audioFormat !== 1 || header.bitsPerSample !== 16) {
+        // Desteklenmeyen WAV türleri olduğu gibi gönderilir, backend ffmpeg ile çözer
+        return arrayBuffer;
+    }
+    if (header.sampleRate === COMPACT_SAMPLE_RATE && header.channels === 1) {
+        return arrayBuffer;
+    }
+
+    const channels = header.channels;
+    const frameCount = Math.floor(header.dataLength / (2 * channels));
+    const input = new Int16Array(arrayBuffer, header.dataOffset, frameCount * channels);
+    const ratio = header.sampleRate / COMPACT_SAMPLE_RATE;
+    const outputLength = Math.floor(frameCount / ratio);
+    const output = new Int16Array(outputLength);
+
+    // Her çıktı örneği, pencereli sinc ile filtrelenmiş giriş sinyalinin o andaki değeridir:
+    // 8 kHz üstü enerji konuşma bandına katlanmaz. Kanal birleştirme aynı geçişte yapılır.
+    const { weights, taps, reach, period } = resampleFilter(header.sampleRate, COMPACT_SAMPLE_RATE);
+    for (let i = 0; i < outputLength; i++) {
+        const base = (i % period) * taps;
+        const offset = Math.floor(i * ratio) - reach;
+        let sum = 0;
+        let weightSum = 1;
+        if (offset >= 0 && offset + taps <= frameCount) {
+            for (let tap = 0, index = offset * channels; tap < taps; tap++) {
+                let sample = input[index++];
+                for (let channel = 1; channel < channels; channel++) {
+                    sample += input[index++];
+                }
+                sum += sample * weights[base + tap];
+            }
+        } else {
+            // Dosya başı / sonu: dışarıda kalan örnekler atlanır, kalan ağırlıklar normalize edilir
+            weightSum = 0;
+            for (let tap = 0; tap < taps; tap++) {
+                const frame = offset + tap;
+                if (frame < 0 || frame >= frameCount) {
+                    continue;
+                }
+                let sample = 0;
+                for (let channel = 0; channel < channels; channel++) {
+                    sample += input[frame * channels + channel];
+                }
+                sum += sample * weights[base + tap];
+                weightSum += weights[base + tap];
+            }
+        }
+        const value = Math.round(sum / (weightSum * channels));
+        output[i] = Math.max(-32768, Math.min(32767, value));
+    }
+
+    return createWavBuffer(output, COMPACT_SAMPLE_RATE);
+}
+
+/**
+ * Mono 16 bit örneklerden WAV dosyası oluştur
+ */
+function createWavBuffer(samples, sampleRate) {
+    const buffer = new ArrayBuffer(44 + samples.length * 2);
+    const view = new DataView(buffer);
+    view.setUint32(0, 0x52494646, false); // "RIFF"
+    view.setUint32(4, 36 + samples.length * 2, true);
+    view.setUint32(8, 0x57415645, false); // "WAVE"
+    view.setUint32(12, 0x666d7420, false); // "fmt "
+    view.setUint32(16, 16, true);
+    view.setUint16(20, 1, true); // PCM
+    view.setUint16(22, 1, true); // Mono
+    view.setUint32(24, sampleRate, true);
+    view.setUint32(28, sampleRate * 2, true); // Byte rate
+    view.setUint16(32, 2, true); // Block align
+    view.setUint16(34, 16, true); // Bits per sample
+    view.setUint32(36, 0x64617461, false); // "data"
+    view.setUint32(40, samples.length * 2, true);
+    new Int16Array(buffer, 44).set(samples);
+    return buffer;
+}
+
+window.audioUtils = {
+    readAudioFile,
+    parseWavHeader,
+    toCompactWav,
+    createWavBuffer
+};
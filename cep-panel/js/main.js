@@ -16,6 +16,8 @@ const statusText = document.getElementById('statusText');
 const apiUrl = document.getElementById('apiUrl');
 const apiEndpoint = document.getElementById('apiEndpoint');
 const outputFormat = document.getElementById('outputFormat');
+const languageSelect = document.getElementById('language');
+const profileSelect = document.getElementById('profile');
 const generateBtn = document.getElementById('generateBtn');
 const progressContainer = document.getElementById('progressContainer');
 const progressFill = document.getElementById('progressFill');
@@ -60,6 +62,16 @@ function setupEventListeners() {
         saveSettings();
     });
     
+    // Language change
+    languageSelect.addEventListener('change', function() {
+        saveSettings();
+    });
+    
+    // Quality profile change
+    profileSelect.addEventListener('change', function() {
+        saveSettings();
+    });
+    
     // Generate button
     generateBtn.addEventListener('click', generateSubtitles);
 }
@@ -182,16 +194,56 @@ async function generateSubtitles() {
         // Step 2: Read audio file and send to API
         log('API\'ye gönderiliyor...', 'info');
         
-        // Create a mock WAV file for testing
-        const mockWavData = createMockWavFile();
-        const audioBlob = new Blob([mockWavData], { type: 'audio/wav' });
+        const audioBlob = new Blob([prepareUploadAudio(audioPath)], { type: 'audio/wav' });
+        log(`Upload boyutu: ${(audioBlob.size / (1024 * 1024)).toFixed(1)} MB`, 'info');
         
-        const apiResult = await apiClient.transcribeAudio(audioBlob, outputFormat.value);
+        const apiResult = await apiClient.transcribeAudioAsync(audioBlob, outputFormat.value, (job) => {
+            if (job.queue) {
+                // Backend'in öncelikli zamanlayıcısında sıra bekliyor (veya kısa bir iş için duraklatıldı)
+                const waiting = job.status === 'running' && job.progress ? 'Duraklatıldı, sırada' : 'Sırada';
+                showProgress(30, `${waiting}: ${job.queue.position}. sıra, ` +
+                    `tahmini başlama ~${Math.ceil(job.queue.estimated_start_seconds)}s`);
+            } else if (job.status === 'queued') {
+                showProgress(30, 'Sırada bekleniyor...');
+            } else if (job.status === 'running' && job.progress !== null) {
+                const eta = job.eta_seconds !== null ? `, kalan ~${Math.ceil(job.eta_seconds)}s` : '';
+                showProgress(30 + Math.round(job.progress * 0.4),
+                    `Transkripsiyon: %${job.progress} (${job.segments_decoded} segment${eta})`);
+            }
+            if (job.status === 'done' && job.language_detection) {
+                const detection = job.language_detection;
+                const languages = detection.chunks
+                    ? [...new Set(detection.chunks.map(chunk => chunk.language))].join(', ')
+                    : `${detection.language} (güven %${Math.round(detection.confidence * 100)})`;
+                log(`Tespit edilen dil: ${languages}, ${detection.seconds}s`, 'info');
+            }
+            if (job.status === 'done' && job.redecode) {
+                log(`Uyarlanabilir decode: ${job.redecode.redecoded_segments}/${job.redecode.segments} segment ` +
+                    `tekrar decode edildi (sesin %${Math.round(job.redecode.redecoded_fraction * 100)}'i)`, 'info');
+            }
+            if (job.status === 'done' && job.incremental) {
+                log(`Artımlı transkripsiyon: ${job.incremental.reused_segments} segment tekrar kullanıldı, ` +
+                    `${job.incremental.retranscribed_seconds}s yeniden işlendi`, 'info');
+            }
+        }, {
+            sequenceId: currentSequence.id,
+            filename: 'sequence.wav',
+            language: languageSelect.value === 'auto-mixed' ? 'auto' : languageSelect.value,
+            languageSwitching: languageSelect.value === 'auto-mixed',
+            profile: profileSelect.value,
+            onUploadProgress: (sent, total) => {
+                showProgress(Math.round(30 * sent / total), `Ses yükleniyor: %${Math.round(100 * sent / total)}`);
+            }
+        });
         
         if (!apiResult.success) {
             throw new Error(apiResult.error);
         }
         
+        if (apiResult.timings) {
+            log(`Sunucu süreleri: ${formatServerTimings(apiResult.timings)}`, 'info');
+        }
+        
         showProgress(70, 'Altyazı oluşturuluyor...');
         
         // Step 3: Save subtitle file and import to Premiere Pro
@@ -299,6 +351,28 @@ function hideProgress() {
     progressFill.style.width = '0%';
 }
 
+/**
+ * Dışa aktarılan sesi oku ve kompakt formata (16 kHz mono 16 bit) dönüştür.
+ * Node.js erişimi yoksa (tarayıcıda test) test WAV'ı kullanılır.
+ */
+function prepareUploadAudio(audioPath) {
+    let audioData;
+    try {
+        audioData = window.audioUtils.readAudioFile(audioPath);
+    } catch (error) {
+        log(`Ses dosyası okunamadı, test verisi kullanılıyor: ${error.message}`, 'warning');
+        return createMockWavFile();
+    }
+    
+    const originalSize = audioData.byteLength;
+    const compactData = window.audioUtils.toCompactWav(audioData);
+    if (compactData !== audioData) {
+        log(`Ses 16 kHz mono'ya dönüştürüldü: ${(originalSize / (1024 * 1024)).toFixed(1)} MB → ` +
+            `${(compactData.byteLength / (1024 * 1024)).toFixed(1)} MB`, 'info');
+    }
+    return compactData;
+}
+
 /**
  * Create a mock WAV file for testing
  */
@@ -338,6 +412,29 @@ function createMockWavFile() {
     return wavFile.buffer;
 }
 
+/**
+ * Sunucu aşama sürelerini okunabilir metne çevir (örn. "Ses çözme 12 ms, Model 3.4 s")
+ */
+function formatServerTimings(timings) {
+    const labels = {
+        upload: 'Upload',
+        temp_write: 'Diske yazma',
+        decode: 'Ses çözme',
+        prepare: 'Dil/VAD',
+        model_decode: 'Model',
+        render: 'Render',
+        total: 'Toplam'
+    };
+    return Object.keys(timings)
+        .filter(name => labels[name] && timings[name] >= 0.5)
+        .map(name => {
+            const ms = timings[name];
+            const value = ms >= 1000 ? `${(ms / 1000).toFixed(1)} s` : `${Math.round(ms)} ms`;
+            return `${labels[name]} ${value}`;
+        })
+        .join(', ');
+}
+
 /**
  * Add log entry
  */
@@ -362,7 +459,9 @@ function log(message, type = 'info') {
 function saveSettings() {
     const settings = {
         apiEndpoint: apiEndpoint.value,
-        outputFormat: outputFormat.value
+        outputFormat: outputFormat.value,
+        language: languageSelect.value,
+        profile: profileSelect.value
     };
     
     localStorage.setItem('aiSubtitlesSettings', JSON.stringify(settings));
@@ -383,6 +482,14 @@ function loadSettings() {
             outputFormat.value = settings.outputFormat;
         }
         
+        if (settings.language) {
+            languageSelect.value = settings.language;
+        }
+        
+        if (settings.profile) {
+            profileSelect.value = settings.profile;
+        }
+        
         log('Ayarlar yüklendi', 'info');
     } catch (error) {
         log('Ayar yükleme hatası', 'warning');
@@ -51,6 +51,7 @@ class PremiereInterface {
                         var seq = project.activeSequence;
                         JSON.stringify({
                             success: true,
+                            id: seq.sequenceID,
                             name: seq.name,
                             duration: seq.end.ticks,
                             tracks: seq.videoTracks.numTracks + seq.audioTracks.numTracks,
@@ -114,8 +115,8 @@ class PremiereInterface {
                     
                     // Export settings
                     var exportSettings = new ExportWaveSettings();
-                    exportSettings.sampleRate = 44100;
-                    exportSettings.channels = 2;
+                    exportSettings.sampleRate = 16000; // Whisper 16 kHz mono kullanır
+                    exportSettings.channels = 1;
                     exportSettings.bitDepth = 16;
                     
                     // Create encoder
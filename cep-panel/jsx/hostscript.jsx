@@ -29,6 +29,7 @@ function getCurrentSequence() {
         var seq = project.activeSequence;
         return JSON.stringify({
             success: true,
+            id: seq.sequenceID,
             name: seq.name,
             duration: seq.end.ticks,
             tracks: seq.videoTracks.numTracks + seq.audioTracks.numTracks,
@@ -65,8 +66,8 @@ function exportSequenceAudio() {
         
         // Export settings
         var exportSettings = new ExportWaveSettings();
-        exportSettings.sampleRate = 44100;
-        exportSettings.channels = 2;
+        exportSettings.sampleRate = 16000; // Whisper 16 kHz mono kullanır
+        exportSettings.channels = 1;
         exportSettings.bitDepth = 16;
         
         // Create encoder
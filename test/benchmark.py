@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Transkripsiyon Benchmark Script
+Transkripsiyon hattının hızını ölçer ve sonuçları çalıştırmalar arasında karşılaştırılabilir
+JSON olarak yazar.
+
+Modlar:
+    inprocess  Backend modülleri ve Faster Whisper ile aynı process'te (sunucu gerekmez)
+    server     Çalışan bir backend'e karşı HTTP üzerinden
+    render     Sadece SRT/XML/VTT/JSON üretim süresi (sentetik segmentlerle)
+    compare    İki sonuç dosyasını karşılaştır
+
+Kullanım:
+    python benchmark.py inprocess --models tiny,small --compute-types int8 --threads 4,8 --lengths 30,120 -o sonuc.json
+    python benchmark.py server --url http://localhost:5000 --lengths 30,120 -o sonuc.json
+    python benchmark.py render --segments 10000 -o render.json
+    python benchmark.py compare onceki.json sonuc.json --threshold 10
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', 'backend'))
+
+from audio import SAMPLE_RATE, AudioDecodeError, decode_audio_bytes
+from models import current_rss_mb
+from segmentation import resegment
+from subtitles import create_premiere_xml, create_srt_subtitles, iter_document, subtitle_writer
+
+DEFAULT_AUDIO = os.path.join(TEST_DIR, "test_audio.wav")
+DECODE_OPTIONS = {"language": "tr", "beam_size": 5, "word_timestamps": True}
+
+# Karşılaştırmada düşük olması iyi olan metrikler (yüzde değişim hesaplanır)
+COMPARED_METRICS = [
+    "decode_seconds", "ttfs_seconds", "transcribe_seconds", "rtf", "peak_rss_mb",
+    "upload_seconds", "render_srt_seconds", "render_xml_seconds", "seconds"
+]
+
+
+# --- Ses hazırlama ---
+
+def synthetic_audio(seconds, seed=0):
+    """Konuşmaya benzer zarf ile modüle edilmiş harmonik tonlar ve sessizlikler (tekrarlanabilir)"""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.8, 3.0) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.2, 0.8) * SAMPLE_RATE)
+        t = np.arange(min(burst, total - position)) / SAMPLE_RATE
+        pitch = rng.uniform(110, 220)
+        tone = sum(np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)
+        audio[position:position + len(t)] = 0.1 * tone * envelope
+        position += burst + pause
+    return audio
+
+
+def bundled_audio(seconds, path):
+    """Paketteki test sesini istenen uzunluğa kadar tekrarla"""
+    with open(path, 'rb') as f:
+        source = decode_audio_bytes(f.read(), os.path.splitext(path)[1])
+    total = int(seconds * SAMPLE_RATE)
+    repeats = total // len(source) + 1
+    return np.tile(source, repeats)[:total]
+
+
+def make_audio(seconds, audio_path=None):
+    if audio_path and os.path.exists(audio_path):
+        try:
+            return bundled_audio(seconds, audio_path)
+        except AudioDecodeError as e:
+            print(f"⚠️  {audio_path} çözülemedi ({e}), sentetik ses kullanılıyor")
+    return synthetic_audio(seconds)
+
+
+def to_wav_bytes(audio):
+    """float32 sesi 16 kHz mono PCM16 WAV baytlarına çevir (upload edilen formatla aynı)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+def synthetic_segments(count, words_per_segment=8):
+    """Render ölçümü için kelime zamanlı sentetik segmentler"""
+    segments = []
+    for index in range(count):
+        start = index * 3.0
+        words = [
+            {"start": start + i * 0.3, "end": start + i * 0.3 + 0.25, "word": f" kelime{i}", "probability": 0.9}
+            for i in range(words_per_segment)
+        ]
+        segments.append({
+            "start": start,
+            "end": start + 2.5,
+            "text": "".join(word["word"] for word in words).strip(),
+            "words": words
+        })
+    return segments
+
+
+# --- Ölçüm yardımcıları ---
+
+class RssSampler:
+    """Ölçüm süresince process belleğini örnekleyip tepe değeri tutar"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_mb = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss_mb()
+            if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+                self.peak_mb = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def timed(func, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def median_run(runs):
+    """Tekrarlanan ölçümlerin her metriği için medyan"""
+    merged = dict(runs[0])
+    for key, value in runs[0].items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values = [run[key] for run in runs if run.get(key) is not None]
+            median = statistics.median(values) if values else None
+            merged[key] = round(median) if isinstance(value, int) and median is not None else (
+                round(median, 4) if median is not None else None)
+    return merged
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=TEST_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+# --- Render ---
+
+def benchmark_render(segment_counts, repeat):
+    """SRT / Premiere XML / WebVTT / JSON ve yeniden segmentleme + SRT üretim süreleri (en iyi tekrar)"""
+    renderers = {
+        "srt": create_srt_subtitles,
+        "xml": create_premiere_xml,
+        "vtt": lambda segments: "".join(iter_document(subtitle_writer("vtt"), segments)),
+        "json": lambda segments: "".join(iter_document(subtitle_writer("json"), segments)),
+        # Önbellekten yeniden render: kelime akışından cue'ları yeniden bölüp SRT yaz
+        "resegment_srt": lambda segments: create_srt_subtitles(resegment(segments))
+    }
+    results = []
+    for count in segment_counts:
+        segments = synthetic_segments(count)
+        for output_format, render in renderers.items():
+            with RssSampler() as sampler:
+                times = [timed(render, segments)[1] for _ in range(repeat)]
+            results.append({
+                "format": output_format,
+                "segments": count,
+                "seconds": round(min(times), 4),
+                "peak_rss_mb": round(sampler.peak_mb, 1) if sampler.peak_mb else None
+            })
+            print(f"   {output_format.upper():13} {count} segment: {min(times):.3f}s")
+    return results
+
+
+# --- In-process ---
+
+def transcribe_once(model, audio, wav_bytes):
+    """Tek ölçüm: çözme, ilk segmente kadar geçen süre, toplam süre, render"""
+    with RssSampler() as sampler:
+        decoded, decode_seconds = timed(decode_audio_bytes, wav_bytes, ".wav")
+
+        start_time = time.perf_counter()
+        ttfs_seconds = None
+        segments_iter, _ = model.transcribe(decoded, **DECODE_OPTIONS)
+        segments = []
+        for segment in segments_iter:
+            if ttfs_seconds is None:
+                ttfs_seconds = time.perf_counter() - start_time
+            segments.append({
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text.strip(),
+                "words": [
+                    {"start": w.start, "end": w.end, "word": w.word, "probability": w.probability}
+                    for w in (segment.words or [])
+                ]
+            })
+        transcribe_seconds = time.perf_counter() - start_time
+
+        _, render_srt_seconds = timed(create_srt_subtitles, segments)
+        _, render_xml_seconds = timed(create_premiere_xml, segments)
+
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        "decode_seconds": round(decode_seconds, 4),
+        "ttfs_seconds": round(ttfs_seconds, 4) if ttfs_seconds is not None else None,
+        "transcribe_seconds": round(transcribe_seconds, 4),
+        "rtf": round(transcribe_seconds / duration, 4),
+        "segments": len(segments),
+        "peak_rss_mb": round(sampler.peak_mb, 1) if sampler.peak_mb else None,
+        "render_srt_seconds": round(render_srt_seconds, 4),
+        "render_xml_seconds": round(render_xml_seconds, 4)
+    }
+
+
+def benchmark_inprocess(args):
+    from faster_whisper import WhisperModel
+
+    audio_by_length = {seconds: make_audio(seconds, args.audio) for seconds in args.lengths}
+    results = []
+    for model_name in args.models:
+        for compute_type in args.compute_types:
+            for threads in args.threads:
+                label = f"{model_name} / {compute_type} / {threads} thread"
+                print(f"\n🔍 Model yükleniyor: {label}")
+                model, load_seconds = timed(WhisperModel, model_name, device="cpu",
+                                            compute_type=compute_type, cpu_threads=threads)
+                # Isınma: ilk çağrıdaki tek seferlik maliyetler ölçüme girmesin
+                list(model.transcribe(audio_by_length[min(args.lengths)][:SAMPLE_RATE * 5], **DECODE_OPTIONS)[0])
+
+                for seconds, audio in audio_by_length.items():
+                    wav_bytes = to_wav_bytes(audio)
+                    runs = [transcribe_once(model, audio, wav_bytes) for _ in range(args.repeat)]
+                    row = {
+                        "mode": "inprocess",
+                        "model": model_name,
+                        "compute_type": compute_type,
+                        "cpu_threads": threads,
+                        "audio_seconds": seconds,
+                        "model_load_seconds": round(load_seconds, 2),
+                        **median_run(runs)
+                    }
+                    results.append(row)
+                    print(f"✅ {seconds}s ses: RTF {row['rtf']}, ilk segment {row['ttfs_seconds']}s, "
+                          f"{row['segments']} segment, tepe RSS {row['peak_rss_mb']} MB")
+                del model
+    return results
+
+
+# --- Sunucu ---
+
+def parse_server_timing(header):
+    """Server-Timing başlığını {ad: saniye} sözlüğüne çevir"""
+    stages = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                stages[name] = round(float(value) / 1000.0, 4)
+    return stages
+
+
+def upload_audio(base_url, wav_bytes, chunk_bytes):
+    """Parçalı upload API'si ile sesi gönder, upload_id döndür"""
+    import requests
+
+    response = requests.post(f"{base_url}/uploads", json={"filename": "benchmark.wav", "size": len(wav_bytes)}, timeout=30)
+    response.raise_for_status()
+    info = response.json()
+    chunk_bytes = info.get("chunk_bytes") or chunk_bytes
+    offset = 0
+    while offset < len(wav_bytes):
+        chunk = wav_bytes[offset:offset + chunk_bytes]
+        response = requests.patch(f"{base_url}/uploads/{info['upload_id']}", data=chunk,
+                                  headers={"Upload-Offset": str(offset)}, timeout=120)
+        response.raise_for_status()
+        offset += len(chunk)
+    return info["upload_id"]
+
+
+def server_once(base_url, audio, wav_bytes, model_name, output_format):
+    """Tek ölçüm: upload, stream ile ilk segment ve toplam süre"""
+    import requests
+
+    upload_id, upload_seconds = timed(upload_audio, base_url, wav_bytes, 8 * 1024 * 1024)
+
+    data = {"upload_id": upload_id, "format": output_format}
+    if model_name:
+        data["model"] = model_name
+    start_time = time.perf_counter()
+    ttfs_seconds = None
+    segments = 0
+    event = None
+    with requests.post(f"{base_url}/transcribe/stream", data=data, stream=True, timeout=3600) as response:
+        response.raise_for_status()
+        stages = parse_server_timing(response.headers.get("Server-Timing"))
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "segment":
+                segments += 1
+                if ttfs_seconds is None:
+                    ttfs_seconds = time.perf_counter() - start_time
+            elif line.startswith("data: ") and event == "error":
+                raise RuntimeError(json.loads(line[len("data: "):]).get("error"))
+    transcribe_seconds = time.perf_counter() - start_time
+
+    duration = len(audio) / SAMPLE_RATE
+    row = {
+        "upload_seconds": round(upload_seconds, 4),
+        "ttfs_seconds": round(ttfs_seconds, 4) if ttfs_seconds is not None else None,
+        "transcribe_seconds": round(transcribe_seconds, 4),
+        "rtf": round(transcribe_seconds / duration, 4),
+        "segments": segments
+    }
+    row.update({f"server_{name}_seconds": seconds for name, seconds in stages.items()})
+    return row
+
+
+def benchmark_server(args):
+    import requests
+
+    health = requests.get(f"{args.url}/health", timeout=10).json()
+    print(f"🔍 Sunucu: {args.url} (model: {health.get('model')}, durum: {health.get('status')})")
+
+    results = []
+    for model_name in args.models or [None]:
+        for seconds in args.lengths:
+            runs = []
+            for run_index in range(args.repeat):
+                # Her tekrarda sona farklı sayıda sessiz örnek eklenir: sunucu önbelleği devreye girmesin
+                audio = np.concatenate([make_audio(seconds, args.audio),
+                                        np.zeros(run_index + 1, dtype=np.float32)])
+                runs.append(server_once(args.url, audio, to_wav_bytes(audio), model_name, args.format))
+            row = {
+                "mode": "server",
+                "model": model_name or health.get("model"),
+                "compute_type": None,
+                "cpu_threads": None,
+                "audio_seconds": seconds,
+                **median_run(runs)
+            }
+            results.append(row)
+            print(f"✅ {seconds}s ses: RTF {row['rtf']}, upload {row['upload_seconds']}s, "
+                  f"ilk segment {row['ttfs_seconds']}s, {row['segments']} segment")
+    return results
+
+
+# --- Karşılaştırma ---
+
+def row_key(row):
+    if "format" in row:
+        return ("render", row["format"], row["segments"])
+    return (row["mode"], row["model"], row["compute_type"], row["cpu_threads"], row["audio_seconds"])
+
+
+def compare_results(baseline_path, current_path, threshold):
+    """İki sonuç dosyasını karşılaştır; threshold yüzdesinden fazla yavaşlama varsa 1 döndür"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(current_path, encoding="utf-8") as f:
+        current = json.load(f)
+
+    baseline_rows = {row_key(row): row for row in baseline.get("transcription", []) + baseline.get("render", [])}
+    regressions = 0
+    print(f"📊 {baseline_path} ({baseline['meta'].get('git_commit')}) → "
+          f"{current_path} ({current['meta'].get('git_commit')})")
+    for row in current.get("transcription", []) + current.get("render", []):
+        old = baseline_rows.get(row_key(row))
+        if old is None:
+            continue
+        print(f"\n   {' / '.join(str(part) for part in row_key(row) if part is not None)}")
+        for metric in COMPARED_METRICS:
+            if old.get(metric) is None or row.get(metric) is None:
+                continue
+            change = (row[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            marker = "⚠️ " if change > threshold else "   "
+            regressions += change > threshold
+            print(f"   {marker}{metric}: {old[metric]} → {row[metric]} ({change:+.1f}%)")
+
+    if regressions:
+        print(f"\n❌ {regressions} metrikte %{threshold} üzeri yavaşlama")
+        return 1
+    print(f"\n✅ %{threshold} üzeri yavaşlama yok")
+    return 0
+
+
+def write_results(results, output):
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"\n💾 Sonuçlar yazıldı: {output}")
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transkripsiyon hattı benchmark'ı")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--lengths", type=lambda value: parse_list(value, float), default=[30.0, 120.0],
+                        help="Ses uzunlukları (saniye, virgülle ayrılmış)")
+    common.add_argument("--audio", default=DEFAULT_AUDIO,
+                        help="Tekrarlanarak kullanılacak ses dosyası (yoksa sentetik ses üretilir)")
+    common.add_argument("--synthetic", action="store_true", help="Her zaman sentetik ses kullan")
+    common.add_argument("--repeat", type=int, default=1, help="Tekrar sayısı (medyan alınır)")
+    common.add_argument("--render-segments", type=lambda value: parse_list(value, int), default=[10000],
+                        help="Render ölçümü segment sayıları")
+    common.add_argument("-o", "--output", help="JSON sonuç dosyası")
+
+    inprocess = subparsers.add_parser("inprocess", parents=[common])
+    inprocess.add_argument("--models", type=parse_list, default=["small"])
+    inprocess.add_argument("--compute-types", type=parse_list, default=["int8"])
+    inprocess.add_argument("--threads", type=lambda value: parse_list(value, int), default=[0])
+
+    server = subparsers.add_parser("server", parents=[common])
+    server.add_argument("--url", default="http://localhost:5000")
+    server.add_argument("--models", type=parse_list, default=[])
+    server.add_argument("--format", default="srt")
+
+    render = subparsers.add_parser("render")
+    render.add_argument("--segments", type=lambda value: parse_list(value, int), default=[10000, 50000])
+    render.add_argument("--repeat", type=int, default=3)
+    render.add_argument("-o", "--output")
+
+    compare = subparsers.add_parser("compare")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=10.0, help="Uyarı eşiği (yüzde)")
+
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        return compare_results(args.baseline, args.current, args.threshold)
+
+    results = {"meta": environment_info(), "transcription": [], "render": []}
+    if args.mode == "render":
+        print("🚀 Render benchmark'ı...")
+        results["render"] = benchmark_render(args.segments, args.repeat)
+    else:
+        if args.synthetic:
+            args.audio = None
+        results["meta"]["audio"] = args.audio or "synthetic"
+        results["meta"]["decode_options"] = DECODE_OPTIONS
+        if args.mode == "inprocess":
+            results["transcription"] = benchmark_inprocess(args)
+        else:
+            results["transcription"] = benchmark_server(args)
+        print("\n🚀 Render benchmark'ı...")
+        results["render"] = benchmark_render(args.render_segments, max(1, args.repeat))
+
+    write_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
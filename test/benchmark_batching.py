@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Mikro-batch Benchmark Script
+Aynı klip setini eşzamanlı isteklerle önce batch kapalı (her istek kendi transcribe çağrısı),
+sonra batch açık (MicroBatcher) transkribe eder ve dakikadaki klip sayısını karşılaştırır.
+
+Kullanım:
+    python benchmark_batching.py [ses_dosyası_veya_klasör] [--model small] [--clips 32]
+        [--clip-seconds 20] [--concurrency 8] [--max-batch-size 8] [--max-wait-ms 50]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from audio import SAMPLE_RATE, decode_audio_bytes
+from batching import MicroBatcher
+from models import ModelRegistry
+
+DECODE_OPTIONS = {"language": "tr", "beam_size": 5, "word_timestamps": True}
+
+
+def load_clips(path, clip_count, clip_seconds):
+    """Klasördeki ses dosyalarını veya tek dosyadan kesilen parçaları klip listesi olarak döndür"""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path))
+    else:
+        files = [path]
+
+    sources = []
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            sources.append(decode_audio_bytes(f.read(), os.path.splitext(file_path)[1]))
+
+    clips = []
+    clip_samples = int(clip_seconds * SAMPLE_RATE)
+    while len(clips) < clip_count:
+        for audio in sources:
+            if os.path.isdir(path):
+                clips.append(audio)
+            else:
+                # Tek dosyadan sırayla clip_seconds uzunluğunda parçalar
+                start = (len(clips) * clip_samples) % max(1, len(audio) - clip_samples)
+                clips.append(audio[start:start + clip_samples])
+            if len(clips) >= clip_count:
+                break
+    return clips
+
+
+def run_concurrent(clips, concurrency, transcribe):
+    """Klipleri concurrency adet thread ile işle, (süre, segment sayısı) döndür"""
+    pending = list(range(len(clips)))
+    lock = threading.Lock()
+    segment_counts = [0] * len(clips)
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                index = pending.pop(0)
+            segment_counts[index] = len(transcribe(clips[index]))
+
+    start_time = time.time()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start_time, sum(segment_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mikro-batch throughput benchmark")
+    parser.add_argument("path", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_audio.wav"))
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--clip-seconds", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=int, default=50)
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"❌ Ses dosyası bulunamadı: {args.path}")
+        return 1
+
+    from faster_whisper import WhisperModel
+
+    print(f"🔍 Klipler hazırlanıyor: {args.path}")
+    clips = load_clips(args.path, args.clips, args.clip_seconds)
+    total_audio = sum(len(clip) for clip in clips) / SAMPLE_RATE
+    print(f"   {len(clips)} klip, toplam {total_audio:.0f} saniye ses")
+
+    print(f"🔍 Model yükleniyor: {args.model}")
+    model = WhisperModel(args.model, device="cpu", compute_type="int8",
+                         cpu_threads=args.cpu_threads, num_workers=args.concurrency)
+
+    # Isınma (ilk çağrıdaki tek seferlik maliyetler ölçüme girmesin)
+    list(model.transcribe(clips[0], **DECODE_OPTIONS)[0])
+
+    def transcribe_direct(audio):
+        segments, _ = model.transcribe(audio, **DECODE_OPTIONS)
+        return list(segments)
+
+    registry = ModelRegistry(lambda name, **_: model, [args.model], args.model, memory_budget_mb=1 << 20)
+    batcher = MicroBatcher(registry, args.model, DECODE_OPTIONS,
+                           max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    results = {}
+    for label, transcribe in (("batch kapalı", transcribe_direct), ("batch açık", batcher.transcribe)):
+        print(f"\n🚀 {label} ({args.concurrency} eşzamanlı istek)...")
+        elapsed, segment_count = run_concurrent(clips, args.concurrency, transcribe)
+        clips_per_minute = len(clips) / elapsed * 60
+        results[label] = clips_per_minute
+        print(f"✅ {elapsed:.1f}s, {segment_count} segment, {clips_per_minute:.1f} klip/dakika, "
+              f"RTF {elapsed / total_audio:.3f}")
+
+    print(f"\n📊 Batch istatistikleri: {batcher.stats()}")
+    speedup = results["batch açık"] / results["batch kapalı"]
+    print(f"📊 Throughput: {results['batch kapalı']:.1f} → {results['batch açık']:.1f} klip/dakika ({speedup:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Uzun Kayıt Bellek Testi
+Saatlerce süren sentetik WAV dosyalarını (varsayılan 1 ve 8 saat) diske parça parça yazar, her birini
+ayrı bir process'te uzun kayıt hattından (AudioFileReader -> longform.iter_windows -> model ->
+artımlı SRT writer) geçirir ve tepe belleği (RSS) karşılaştırır. En uzun dosyanın tepe belleği en
+kısanınkinden --tolerance-mb'den fazla yüksekse çıkış kodu 1 olur (bellek süreyle büyüyor demektir).
+
+Varsayılan olarak model yerine pencere enerjisinden segment üreten sahte bir transkriptör kullanılır
+(model belleği ölçümü gölgelemesin ve 8 saatlik test dakikalar içinde bitsin); --model ile gerçek
+Faster Whisper modeli kullanılır.
+
+Kullanım:
+    python benchmark_longform.py [--hours 1,8] [--tolerance-mb 64] [--window-seconds 300]
+        [--sample-rate 16000] [--model tiny] [--work-dir /tmp] [--keep] [-o sonuc.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from audio import SAMPLE_RATE, AudioFileReader
+from longform import carry_prompt, iter_windows
+from subtitles import SrtWriter
+
+DECODE_OPTIONS = {"language": "tr", "beam_size": 5, "word_timestamps": True}
+
+# Sentetik ses diske bu uzunlukta parçalar halinde yazılır (saniye)
+WRITE_CHUNK_SECONDS = 60
+
+# Sahte transkriptörde konuşma sayılan 100 ms çerçevelerin RMS eşiği
+VOICED_RMS = 0.01
+
+
+def write_synthetic_wav(path, seconds, sample_rate, seed=0):
+    """Konuşmaya benzer ton patlamaları ve sessizliklerden oluşan 16 bit mono WAV (bellekte tutulmadan)"""
+    rng = np.random.default_rng(seed)
+    chunk = WRITE_CHUNK_SECONDS * sample_rate
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        written = 0
+        total = int(seconds * sample_rate)
+        while written < total:
+            length = min(chunk, total - written)
+            audio = np.zeros(length, dtype=np.float32)
+            position = 0
+            while position < length:
+                burst = int(rng.uniform(0.8, 3.0) * sample_rate)
+                pause = int(rng.uniform(0.2, 0.8) * sample_rate)
+                t = np.arange(min(burst, length - position), dtype=np.float32) / sample_rate
+                pitch = rng.uniform(110, 220)
+                tone = sum(np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in range(1, 4))
+                audio[position:position + len(t)] = 0.1 * tone
+                position += burst + pause
+            wav.writeframes((audio * 32767).astype('<i2').tobytes())
+            written += length
+
+
+def fake_transcribe(window, prompt=None):
+    """Pencerenin konuşmalı (RMS eşiğini geçen) bölgelerinden segment sözlükleri üret"""
+    frame = SAMPLE_RATE // 10
+    frames = len(window) // frame
+    rms = np.sqrt(np.mean(np.square(window[:frames * frame].reshape(frames, frame)), axis=1))
+    voiced = rms >= VOICED_RMS
+    start = None
+    for index, is_voiced in enumerate(np.append(voiced, False)):
+        if is_voiced and start is None:
+            start = index
+        elif not is_voiced and start is not None:
+            yield {"start": start / 10, "end": index / 10, "text": f" Konuşma {start}-{index}", "words": []}
+            start = None
+
+
+def model_transcriber(model_name):
+    """Faster Whisper modeliyle pencere transkriptörü (önceki pencerenin metni initial_prompt olur)"""
+    from faster_whisper import WhisperModel
+    model = WhisperModel(model_name, device="cpu", compute_type="int8")
+
+    def transcribe(window, prompt=None):
+        segments, _ = model.transcribe(window, initial_prompt=prompt, **DECODE_OPTIONS)
+        for segment in segments:
+            yield {"start": segment.start, "end": segment.end, "text": segment.text, "words": []}
+    return transcribe
+
+
+def peak_rss_mb():
+    """Process'in tepe RSS'i (MB; Linux'ta ru_maxrss KB cinsindendir)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_pipeline(path, output_path, window_seconds, model_name=None):
+    """Uzun kayıt hattı: dosya -> pencereler -> transkriptör -> SRT (diske artımlı). Sonuç sözlüğü döndür"""
+    transcribe = model_transcriber(model_name) if model_name else fake_transcribe
+    baseline_rss = peak_rss_mb()
+    started = time.perf_counter()
+    reader = AudioFileReader(path)
+    writer = SrtWriter()
+    windows = segment_count = 0
+    prompt = None
+    with open(output_path, 'w', encoding='utf-8') as output:
+        output.write(writer.header())
+        for offset, window in iter_windows(reader.chunks(), window_seconds):
+            window_segments = []
+            for segment in transcribe(window, prompt):
+                segment = {**segment, "start": segment["start"] + offset, "end": segment["end"] + offset}
+                output.write(writer.write(segment))
+                # Sadece pencerenin segmentleri tutulur (sonraki pencerenin prompt'u için)
+                window_segments.append(segment)
+            prompt = carry_prompt(window_segments) or prompt
+            segment_count += len(window_segments)
+            windows += 1
+        output.write(writer.footer())
+    return {
+        "audio_seconds": round(reader.duration, 1),
+        "windows": windows,
+        "segments": segment_count,
+        "seconds": round(time.perf_counter() - started, 2),
+        "baseline_rss_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def measure(path, args):
+    """Hattı ayrı bir process'te çalıştır (tepe RSS diğer ölçümlerden etkilenmesin)"""
+    command = [sys.executable, os.path.abspath(__file__), "--child", path,
+               "--window-seconds", str(args.window_seconds)]
+    if args.model:
+        command += ["--model", args.model]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "Ölçüm process'i başarısız oldu")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uzun kayıt hattının sabit bellek testi")
+    parser.add_argument("--hours", default="1,8", help="Virgülle ayrılmış sentetik dosya süreleri (saat)")
+    parser.add_argument("--tolerance-mb", type=float, default=64,
+                        help="En uzun ve en kısa dosyanın tepe RSS farkı için izin verilen en fazla artış")
+    parser.add_argument("--window-seconds", type=float, default=300)
+    parser.add_argument("--sample-rate", type=int, default=SAMPLE_RATE,
+                        help="Sentetik WAV örnekleme hızı (16000'in katı; 48000 örnekleme düşürmeyi de test eder)")
+    parser.add_argument("--model", default=None, help="Gerçek Faster Whisper modeli (varsayılan: sahte transkriptör)")
+    parser.add_argument("--work-dir", default=tempfile.gettempdir(), help="Sentetik dosyaların yazılacağı klasör")
+    parser.add_argument("--keep", action="store_true", help="Sentetik dosyaları silme")
+    parser.add_argument("-o", "--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_pipeline(args.child, args.child + ".srt", args.window_seconds, args.model)
+        os.unlink(args.child + ".srt")
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for hours in [float(value) for value in args.hours.split(',')]:
+        path = os.path.join(args.work_dir, f"longform_{hours:g}h_{args.sample_rate}.wav")
+        if not os.path.exists(path):
+            print(f"{hours:g} saatlik sentetik WAV yazılıyor: {path}")
+            write_synthetic_wav(path, hours * 3600, args.sample_rate)
+        try:
+            result = {"hours": hours, "file_mb": round(os.path.getsize(path) / (1024 * 1024), 1),
+                      **measure(path, args)}
+        finally:
+            if not args.keep:
+                os.unlink(path)
+        results.append(result)
+        print(f"{hours:g} saat: {result['windows']} pencere, {result['segments']} segment, "
+              f"{result['seconds']}s, tepe RSS {result['peak_rss_mb']} MB (dosya {result['file_mb']} MB)")
+
+    shortest, longest = min(results, key=lambda r: r["hours"]), max(results, key=lambda r: r["hours"])
+    growth = longest["peak_rss_mb"] - shortest["peak_rss_mb"]
+    passed = growth <= args.tolerance_mb
+    print(f"Tepe RSS farkı ({shortest['hours']:g} saat -> {longest['hours']:g} saat): {growth:.1f} MB "
+          f"(izin verilen {args.tolerance_mb:g} MB): {'BAŞARILI' if passed else 'BAŞARISIZ'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"results": results, "rss_growth_mb": round(growth, 1), "passed": passed}, f, indent=2)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Premiere XML Writer Benchmark Script
+Artımlı PremiereXmlWriter çıktısının eski yöntemle (tüm ağacı ElementTree ile kurup minidom ile
+güzel formatlama) birebir aynı olduğunu doğrular, süre ve tepe bellek kullanımını karşılaştırır.
+
+Kullanım:
+    python benchmark_xml.py [--captions 50000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from subtitles import PREMIERE_TICKS_PER_SECOND, PremiereXmlWriter, create_premiere_xml, segment_value
+
+# Kaçış gerektiren karakterler ve Türkçe harfler
+SAMPLE_WORDS = ["merhaba", "dünya", "çalışma", "ığdır", "şöyle", "A&B", "<etiket>", '"alıntı"', "x > y", "'tek'", "ÖZEL"]
+
+
+def reference_premiere_xml(segments, sequence_name="AI Generated Subtitles"):
+    """Eski yöntem: tüm ağaç ElementTree ile kurulur, minidom ile tekrar parse edilip formatlanır"""
+    root = ET.Element("xmeml")
+    root.set("version", "4")
+    project = ET.SubElement(root, "project")
+    sequence = ET.SubElement(project, "sequence")
+    sequence.set("id", "sequence-1")
+    name = ET.SubElement(sequence, "name")
+    name.text = sequence_name
+    media = ET.SubElement(sequence, "media")
+    captions = ET.SubElement(media, "captions")
+    caption_track = ET.SubElement(captions, "caption_track")
+    caption_track.set("id", "caption-track-1")
+
+    for i, segment in enumerate(segments):
+        caption = ET.SubElement(caption_track, "caption")
+        caption.set("id", f"caption-{i+1}")
+        start = ET.SubElement(caption, "start")
+        start.text = str(int(segment_value(segment, 'start') * PREMIERE_TICKS_PER_SECOND))
+        end = ET.SubElement(caption, "end")
+        end.text = str(int(segment_value(segment, 'end') * PREMIERE_TICKS_PER_SECOND))
+        text = ET.SubElement(caption, "text")
+        text.text = segment_value(segment, 'text').strip()
+        properties = ET.SubElement(caption, "properties")
+        for prop_id, value in (("font", "Arial"), ("size", "24"), ("color", "FFFFFF")):
+            prop = ET.SubElement(properties, "property")
+            prop.set("id", prop_id)
+            prop.text = value
+
+    rough_string = ET.tostring(root, 'utf-8')
+    reparsed = minidom.parseString(rough_string)
+    return reparsed.toprettyxml(indent="  ")
+
+
+def make_segments(count, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    for index in range(count):
+        start = index * 2.5 + rng.random()
+        words = rng.choices(SAMPLE_WORDS, k=rng.randint(0, 10))
+        segments.append({"start": start, "end": start + rng.uniform(0.5, 2.0), "text": " " + " ".join(words) + " "})
+    return segments
+
+
+def measure(func, *args):
+    """(sonuç, süre, tepe bellek MB)"""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def check_equivalence():
+    """Farklı segment setlerinde iki çıktının aynı olduğunu doğrula"""
+    cases = {
+        "boş": [],
+        "tek segment": make_segments(1),
+        "boş metin": [{"start": 0.0, "end": 1.0, "text": "   "}],
+        "satır sonları": [{"start": 0.0, "end": 1.0, "text": "bir\r\niki\rüç\ndört"}],
+        "rastgele": make_segments(2000, seed=1)
+    }
+    ok = True
+    for label, segments in cases.items():
+        expected = reference_premiere_xml(segments, "Sequence & <Test>")
+        actual = create_premiere_xml(segments, "Sequence & <Test>")
+        if actual == expected:
+            print(f"✅ Aynı çıktı: {label}")
+        else:
+            ok = False
+            print(f"❌ Farklı çıktı: {label}")
+
+        # Girintisiz çıktı aynı ağaca parse edilmeli
+        writer = PremiereXmlWriter("Sequence & <Test>", indent=False)
+        compact = writer.header() + "".join(writer.write(segment) for segment in segments) + writer.footer()
+        if _tree_signature(ET.fromstring(compact)) != _tree_signature(ET.fromstring(expected.encode("utf-8"))):
+            ok = False
+            print(f"❌ Girintisiz çıktının ağacı farklı: {label}")
+    return ok
+
+
+def _tree_signature(element):
+    return (element.tag, sorted(element.attrib.items()), (element.text or "").strip(),
+            [_tree_signature(child) for child in element])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Premiere XML writer benchmark")
+    parser.add_argument("--captions", type=int, default=50000)
+    args = parser.parse_args()
+
+    print("🔍 Çıktı eşdeğerliği kontrol ediliyor...")
+    if not check_equivalence():
+        return 1
+
+    segments = make_segments(args.captions)
+    print(f"\n🚀 {args.captions} caption...")
+    expected, reference_seconds, reference_mb = measure(reference_premiere_xml, segments)
+    print(f"   Eski (ElementTree + minidom): {reference_seconds:.2f}s, tepe bellek {reference_mb:.0f} MB")
+
+    actual, writer_seconds, writer_mb = measure(create_premiere_xml, segments)
+    print(f"   Artımlı writer:               {writer_seconds:.2f}s, tepe bellek {writer_mb:.0f} MB")
+
+    def stream_only(segments):
+        # Yanıt akışında olduğu gibi: parçalar üretilip bırakılır, doküman bellekte birleştirilmez
+        writer = PremiereXmlWriter()
+        size = len(writer.header())
+        for segment in segments:
+            size += len(writer.write(segment))
+        return size + len(writer.footer())
+
+    streamed_size, stream_seconds, stream_mb = measure(stream_only, segments)
+    print(f"   Artımlı writer (akış):        {stream_seconds:.2f}s, tepe bellek {stream_mb:.2f} MB")
+
+    if actual != expected or streamed_size != len(expected):
+        print("❌ Çıktılar farklı")
+        return 1
+    print(f"\n📊 Aynı çıktı ({len(actual) / (1024 * 1024):.1f} MB), "
+          f"{reference_seconds / writer_seconds:.1f}x daha hızlı, "
+          f"tepe bellek {reference_mb / writer_mb:.1f}x daha az")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())